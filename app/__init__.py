@@ -4,6 +4,19 @@ from config import Config
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+
+    # Opt-in request timing, Server-Timing headers and /metrics
+    from app.utils.instrumentation import init_instrumentation, span
+    init_instrumentation(app)
+
+    # Fingerprint of templates and code, for page ETags and cache keys
+    from app.utils.build_version import compute_build_version
+    app.extensions['build_version'] = compute_build_version(app)
+
+    # Load unit data before any request (and, with --preload, before forking)
+    from app.utils.unit_converter import create_unit_registry
+    with app.app_context(), span('unit_registry_load'):
+        app.extensions['unit_registry'] = create_unit_registry(app)
     
     # Register blueprints
     from app.routes.main import main_bp
@@ -13,6 +26,7 @@ def create_app(config_class=Config):
     from app.routes.timezone import timezone_bp
     from app.routes.text_files import text_files_bp
     from app.routes.aviation import aviation
+    from app.routes.admin import admin_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(converter_bp, url_prefix='/convert')
@@ -21,5 +35,11 @@ def create_app(config_class=Config):
     app.register_blueprint(timezone_bp, url_prefix='/time')
     app.register_blueprint(text_files_bp, url_prefix='/text')
     app.register_blueprint(aviation, url_prefix='/aviation')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    
+    # CLI commands
+    from app.cli import build_snapshot_command, prerender_command
+    app.cli.add_command(prerender_command)
+    app.cli.add_command(build_snapshot_command)
     
     return app
\ No newline at end of file
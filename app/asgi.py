@@ -0,0 +1,389 @@
+# app/asgi.py
+"""ASGI front end for the Flask app.
+
+Under gunicorn sync workers, one slow DOCX export holds a whole worker and
+cheap ``/api/convert`` calls queue behind it. ``AsgiApp`` serves the same app
+on an event loop and routes each request by cost:
+
+- ``/api/convert`` and ``/convert/api/convert`` have native async handlers
+  built on ``convert_request``, so they finish in microseconds on the loop.
+- Markdown rendering, DOCX/HTML export, text file conversion and the
+  aviation batch, flight-plan and lookup-table endpoints go to a small
+  ``BoundedExecutor`` for CPU-heavy work.
+- Everything else (pages, search, the single aviation calculators, export
+  job polling, static files) runs through Flask on a separate page executor.
+
+No Flask code runs on the loop thread, so a slow handler never stalls other
+connections. When an executor is full, requests get a 503 with
+``Retry-After`` instead of queueing without limit.
+
+Bodies are streamed both ways. The request body reaches ``wsgi.input``
+through a bounded queue that the worker thread drains. Each chunk of the WSGI
+response is sent as soon as it is produced, and the worker waits for the send,
+so a slow client applies backpressure. Flask's ``MAX_CONTENT_LENGTH`` is
+enforced before dispatch when the client declares a length, and while reading
+otherwise.
+
+The Flask app stays the single implementation of every endpoint; only the
+convert handler bypasses it, and that shares ``convert_request`` with it.
+"""
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import ClientDisconnected, RequestEntityTooLarge
+
+from app.utils.conversion_service import NO_DATA, convert_request
+
+HEAVY, PAGE = 'heavy', 'page'
+
+# Path prefixes run on the heavy executor; anything else is a PAGE
+HEAVY_PREFIXES = (
+    '/api/convert/batch',
+    '/aviation/api/aviation/batch',
+    '/aviation/api/aviation/flight-plan',
+    '/aviation/api/aviation/tables.',
+    '/markdown/convert',
+    '/markdown/preview',
+    '/markdown/download/',
+    '/text/api/convert/',
+)
+CONVERT_PATHS = ('/api/convert', '/convert/api/convert')
+# Largest body the native convert handler reads; its JSON is a few dozen bytes
+CONVERT_MAX_BODY = 64 * 1024
+# Request body chunks buffered ahead of the worker thread reading them
+BODY_QUEUE_SIZE = 8
+
+_DISCONNECTED = object()
+_TOO_LARGE = object()
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a BoundedExecutor already has its maximum of jobs"""
+
+
+class BodyTooLarge(Exception):
+    """Raised when a request body exceeds its limit"""
+
+
+class BoundedExecutor:
+    """A thread pool that rejects work beyond ``max_pending`` queued or running jobs.
+
+    A job counts as pending until its thread finishes it, even when the task
+    awaiting it is cancelled. The count is only changed on the event loop
+    thread, so it needs no lock.
+    """
+
+    def __init__(self, max_workers, max_pending, name):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, function, *args):
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturated(f"{self.pending} jobs pending")
+        loop = asyncio.get_running_loop()
+        future = self._pool.submit(function, *args)
+        self.pending += 1
+        # Added before wrap_future's callback, so the count drops before the await returns
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self, loop):
+        # Done callbacks run on the worker thread; hand the decrement to the loop
+        try:
+            loop.call_soon_threadsafe(self._done)
+        except RuntimeError:  # the loop has already closed
+            pass
+
+    def _done(self):
+        self.pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def route_policy(path):
+    return HEAVY if path.startswith(HEAVY_PREFIXES) else PAGE
+
+
+class RequestBody:
+    """``wsgi.input`` fed from ASGI ``receive`` through a bounded queue.
+
+    ``pump`` runs on the event loop and stops receiving while the queue is
+    full. ``read`` and ``readline`` run on the worker thread and block until
+    the next chunk arrives. Once the body has ended with a disconnect or by
+    exceeding its limit, every later read raises the same error again.
+    """
+
+    def __init__(self, loop, limit=None, maxsize=BODY_QUEUE_SIZE):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize)
+        self._limit = limit
+        self._buf = b''
+        self._eof = False
+        self._error = None
+
+    async def pump(self, receive):
+        received = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                await self._queue.put(_DISCONNECTED)
+                return
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if self._limit is not None and received > self._limit:
+                await self._queue.put(_TOO_LARGE)
+                return
+            if chunk:
+                await self._queue.put(chunk)
+            if not message.get('more_body', False):
+                await self._queue.put(b'')
+                return
+
+    def _fill(self):
+        # pump has returned after a terminal item, so the queue stays empty
+        if self._error is not None:
+            raise self._error()
+        item = asyncio.run_coroutine_threadsafe(self._queue.get(), self._loop).result()
+        if item is _DISCONNECTED:
+            self._error = ClientDisconnected
+            raise ClientDisconnected()
+        if item is _TOO_LARGE:
+            self._error = RequestEntityTooLarge
+            raise RequestEntityTooLarge()
+        if item:
+            self._buf += item
+        else:
+            self._eof = True
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buf) < size):
+            self._fill()
+        if size is None or size < 0:
+            data, self._buf = self._buf, b''
+        else:
+            data, self._buf = self._buf[:size], self._buf[size:]
+        return data
+
+    def readline(self, size=-1):
+        while not self._eof and b'\n' not in self._buf and (size is None or size < 0 or len(self._buf) < size):
+            self._fill()
+        end = self._buf.find(b'\n') + 1 or len(self._buf)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data, self._buf = self._buf[:end], self._buf[end:]
+        return data
+
+    def readlines(self, hint=-1):
+        return list(self)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+def wsgi_environ(scope, body_stream):
+    """Build a WSGI environ for an ASGI HTTP scope reading its body from ``body_stream``"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body_stream,
+        # The stream ends with the body, so Werkzeug may read chunked uploads
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def serve_wsgi(wsgi_app, environ, send, loop):
+    """Run a WSGI app on a worker thread, streaming its response through ``send`` on ``loop``.
+
+    Headers go out with the first non-empty chunk, as WSGI requires. Each send
+    is awaited, so the worker produces no faster than the client reads.
+    """
+    response = []
+    headers_sent = False
+
+    def send_sync(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def write(body, more_body=True):
+        nonlocal headers_sent
+        if not response:
+            raise AssertionError("write() before start_response()")
+        if not headers_sent:
+            status, headers = response
+            send_sync({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+            headers_sent = True
+        if body or not more_body:
+            send_sync({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and headers_sent:
+            raise exc_info[1].with_traceback(exc_info[2])
+        response[:] = [status, headers]
+        return write
+
+    result = wsgi_app(environ, start_response)
+    try:
+        for chunk in result:
+            if chunk:
+                write(chunk)
+        write(b'', more_body=False)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+
+async def read_body(receive, limit):
+    """Read a whole request body; None if the client went away, BodyTooLarge past ``limit``"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            raise BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def send_response(send, status, headers, body):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value
+    return None
+
+
+def _is_json(scope):
+    content_type = _header(scope, b'content-type')
+    if content_type is None:
+        return False
+    mimetype = content_type.split(b';', 1)[0].strip().lower()
+    return mimetype == b'application/json' or (mimetype.startswith(b'application/') and mimetype.endswith(b'+json'))
+
+
+class AsgiApp:
+    """ASGI application serving a Flask app with cost-based dispatch"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        config = flask_app.config
+        self.heavy = BoundedExecutor(config.get('ASGI_HEAVY_WORKERS', 4),
+                                     config.get('ASGI_HEAVY_QUEUE', 32), 'asgi-heavy')
+        self.pages = BoundedExecutor(config.get('ASGI_PAGE_WORKERS', 16),
+                                     config.get('ASGI_PAGE_QUEUE', 256), 'asgi-page')
+        self.registry = flask_app.extensions['unit_registry']
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return  # no websockets
+
+        if scope['method'] == 'POST' and scope['path'] in CONVERT_PATHS:
+            await self.convert(scope, receive, send)
+            return
+
+        limit = self.flask_app.config.get('MAX_CONTENT_LENGTH')
+        declared = _header(scope, b'content-length')
+        if limit is not None and declared is not None and declared.isdigit() and int(declared) > limit:
+            await self.error(send, 413, 'Request body too large')
+            return
+
+        loop = asyncio.get_running_loop()
+        body = RequestBody(loop, limit)
+        environ = wsgi_environ(scope, body)
+        executor = self.heavy if route_policy(scope['path']) == HEAVY else self.pages
+        pump = asyncio.create_task(body.pump(receive))
+        try:
+            await executor.run(serve_wsgi, self.flask_app, environ, send, loop)
+        except ExecutorSaturated:
+            await self.error(send, 503, 'Server busy, retry shortly', [(b'retry-after', b'1')])
+        finally:
+            pump.cancel()
+
+    async def error(self, send, status, message, headers=()):
+        payload = self.flask_app.json.dumps({'success': False, 'error': message})
+        await send_response(send, status, [(b'content-type', b'application/json'), *headers],
+                            payload.encode('utf-8'))
+
+    async def convert(self, scope, receive, send):
+        """Native handler for both single-value convert endpoints"""
+        try:
+            body = await read_body(receive, CONVERT_MAX_BODY)
+        except BodyTooLarge:
+            await self.error(send, 413, 'Request body too large')
+            return
+        if body is None:
+            return  # client went away
+        data = None
+        if _is_json(scope):
+            try:
+                data = self.flask_app.json.loads(body)
+            except ValueError:
+                data = None
+        try:
+            payload, status = convert_request(data, self.registry) if data is not None else NO_DATA
+        except Exception as e:
+            self.flask_app.logger.error(f"Conversion error: {str(e)}")
+            payload, status = {'success': False, 'error': 'Internal server error'}, 500
+        await send_response(send, status, [(b'content-type', b'application/json')],
+                            (self.flask_app.json.dumps(payload) + '\n').encode('utf-8'))
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.heavy.shutdown()
+                self.pages.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(flask_app=None):
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    return AsgiApp(flask_app)
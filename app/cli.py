@@ -0,0 +1,146 @@
+# app/cli.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app, url_for
+from flask.cli import with_appcontext
+
+from app.utils.data_snapshot import build_snapshot, reset_snapshot_cache, write_snapshot
+from app.utils.unit_converter import get_unit_registry
+
+DEFAULT_BASE_URL = 'https://anyunit.com/'
+
+# Flask app used by each process-pool worker, created once per process
+_worker_app = None
+
+
+def collect_prerender_paths():
+    """Return every GET path whose response depends only on the data and templates.
+
+    Must be called inside a request context so url_for builds plain paths.
+    """
+    paths = [
+        url_for('main.index'),
+        url_for('main.privacy_policy'),
+        url_for('main.robots_txt'),
+        url_for('main.sitemap_xml'),
+        url_for('markdown.index'),
+        url_for('timezone.index'),
+        url_for('text_files.index'),
+        url_for('aviation.aviation_calculators'),
+    ]
+
+    sharded_sitemap = current_app.config.get('SITEMAP_ALL_CONVERSIONS', False)
+    if sharded_sitemap:
+        paths.append(url_for('main.sitemap_shard', name='pages'))
+
+    registry = get_unit_registry()
+    for cat_id, category in registry._units_data['categories'].items():
+        paths.append(url_for('converter.category', category=cat_id))
+        if sharded_sitemap:
+            paths.append(url_for('main.sitemap_shard', name=cat_id))
+        units = category.get('units', {})
+        for from_unit in units:
+            for to_unit in units:
+                if from_unit != to_unit:
+                    paths.append(url_for('converter.convert', category=cat_id,
+                                         from_unit=from_unit, to_unit=to_unit))
+    return paths
+
+
+def output_path(output_dir, path):
+    """Map a URL path to the file nginx should serve for it.
+
+    ``/convert/length/`` -> ``convert/length/index.html``,
+    ``/convert/length/m-to-ft`` -> ``convert/length/m-to-ft.html`` and paths
+    with an extension (``/sitemap.xml``) are written as-is, matching
+    ``try_files $uri $uri.html $uri/index.html``.
+    """
+    relative = path.lstrip('/')
+    if not relative or relative.endswith('/'):
+        relative += 'index.html'
+    elif '.' not in relative.rsplit('/', 1)[-1]:
+        relative += '.html'
+    return os.path.join(output_dir, *relative.split('/'))
+
+
+def render_paths(app, paths, output_dir, base_url):
+    """Render paths through the app's test client and write them to disk.
+
+    Returns a list of (path, status_code) for paths that did not return 200.
+    """
+    failures = []
+    client = app.test_client()
+    for path in paths:
+        response = client.get(path, base_url=base_url)
+        if response.status_code != 200:
+            failures.append((path, response.status_code))
+            continue
+        target = output_path(output_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(response.get_data())
+    return failures
+
+
+def _init_worker(config):
+    """Create the worker's app from the parent app's config settings"""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(type('PrerenderConfig', (), config))
+
+
+def _render_chunk(paths, output_dir, base_url):
+    return render_paths(_worker_app, paths, output_dir, base_url)
+
+
+@click.command('prerender')
+@click.option('--output', '-o', 'output_dir', default='prerendered', show_default=True,
+              type=click.Path(file_okay=False), help='Directory to write the static site to.')
+@click.option('--base-url', default=DEFAULT_BASE_URL, show_default=True,
+              help='Public URL root used for canonical links and the sitemap.')
+@click.option('--workers', '-w', default=os.cpu_count() or 1, show_default=True, type=click.IntRange(min=1),
+              help='Number of processes to render with.')
+@with_appcontext
+def prerender_command(output_dir, base_url, workers):
+    """Render every static page (converters, categories, index, sitemap) to disk."""
+    app = current_app._get_current_object()
+    # The sitemap and robots.txt link to the configured root, not the request's
+    app.config['SITEMAP_BASE_URL'] = base_url
+    with app.test_request_context(base_url=base_url):
+        paths = collect_prerender_paths()
+
+    if workers == 1:
+        failures = render_paths(app, paths, output_dir, base_url)
+    else:
+        chunk_size = max(1, len(paths) // (workers * 4))
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        failures = []
+        # Workers build their own app, so render them under this command's config
+        config = {key: value for key, value in app.config.items() if key.isupper()}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            for chunk_failures in pool.map(_render_chunk, chunks,
+                                           [output_dir] * len(chunks), [base_url] * len(chunks)):
+                failures.extend(chunk_failures)
+
+    for path, status in failures:
+        click.echo(f"Failed to render {path}: HTTP {status}", err=True)
+    click.echo(f"Rendered {len(paths) - len(failures)} of {len(paths)} pages to {output_dir}")
+    if failures:
+        raise SystemExit(1)
+
+
+@click.command('build-snapshot')
+@click.option('--output', '-o', 'snapshot_path', default=None, type=click.Path(dir_okay=False),
+              help='File to write; defaults to DATA_SNAPSHOT_PATH.')
+@with_appcontext
+def build_snapshot_command(snapshot_path):
+    """Compile static/data/*.json and their indexes into one versioned snapshot."""
+    path = snapshot_path or current_app.config.get('DATA_SNAPSHOT_PATH')
+    if not path:
+        raise click.UsageError('DATA_SNAPSHOT_PATH is not set; pass --output.')
+    snapshot = build_snapshot(os.path.join(current_app.static_folder, 'data'))
+    size = write_snapshot(snapshot, path)
+    reset_snapshot_cache()
+    click.echo(f"Wrote data snapshot {snapshot.version} ({len(snapshot.sources)} files, {size} bytes) to {path}")
@@ -0,0 +1,94 @@
+# app/routes/admin.py
+import hmac
+import math
+import os
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from app.utils.profiler import DEFAULT_INTERVAL, SamplerBusy, StackSampler
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.record_once
+def init_profiler(state):
+    """One stack sampler per app; it profiles whichever worker process serves the request"""
+    state.app.extensions['stack_sampler'] = StackSampler()
+
+
+@admin_bp.before_request
+def require_token():
+    """Hide the blueprint unless ADMIN_TOKEN is set, then require it as a bearer token"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        abort(404)
+    scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(supplied.strip().encode(), token.encode()):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401, {'WWW-Authenticate': 'Bearer'}
+
+
+def profiler_status(sampler):
+    status = sampler.summary()
+    status['pid'] = os.getpid()
+    return status
+
+
+@admin_bp.route('/profiler', methods=['GET'])
+def profiler():
+    """State and per-blueprint sample counts of this worker's current or last profile"""
+    return jsonify({'success': True, **profiler_status(current_app.extensions['stack_sampler'])})
+
+
+@admin_bp.route('/profiler/start', methods=['POST'])
+def profiler_start():
+    """Start sampling this worker for ``seconds``; returns at once.
+
+    Accepts JSON or form fields ``seconds`` (default 10), ``interval`` in
+    seconds (default 0.01) and ``mode`` (``signal`` or ``thread``).
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = request.form
+    elif not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'JSON body must be an object'}), 400
+    max_seconds = current_app.config.get('PROFILER_MAX_SECONDS', 60)
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval = float(data.get('interval', DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'seconds and interval must be numbers'}), 400
+    if not (math.isfinite(seconds) and 0 < seconds <= max_seconds):
+        return jsonify({'success': False, 'error': f'seconds must be between 0 and {max_seconds}'}), 400
+    if not (math.isfinite(interval) and 0.001 <= interval <= 1):
+        return jsonify({'success': False, 'error': 'interval must be between 0.001 and 1 second'}), 400
+
+    sampler = current_app.extensions['stack_sampler']
+    # Attribute samples to blueprints by the module their views live in
+    sampler.module_blueprints = {bp.import_name: name for name, bp in current_app.blueprints.items()}
+    try:
+        sampler.start(seconds, interval=interval, mode=data.get('mode') or None)
+    except SamplerBusy as e:
+        return jsonify({'success': False, 'error': str(e), **profiler_status(sampler)}), 409
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **profiler_status(sampler)}), 202
+
+
+@admin_bp.route('/profiler/stop', methods=['POST'])
+def profiler_stop():
+    sampler = current_app.extensions['stack_sampler']
+    sampler.stop()
+    return jsonify({'success': True, **profiler_status(sampler)})
+
+
+@admin_bp.route('/profiler/profile.collapsed', methods=['GET'])
+def profiler_collapsed():
+    """Samples as collapsed stacks for flamegraph.pl or speedscope; ``?blueprint=`` filters"""
+    sampler = current_app.extensions['stack_sampler']
+    status = profiler_status(sampler)
+    body = sampler.collapsed(request.args.get('blueprint') or None)
+    return body, 200, {
+        'Content-Type': 'text/plain; charset=utf-8',
+        'X-Profile-State': status['state'],
+        'X-Profile-Pid': str(status['pid']),
+    }
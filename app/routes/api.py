@@ -1,58 +1,140 @@
 # app/routes/api.py
-from flask import Blueprint, jsonify, request
-from app.utils.unit_converter import UnitManager
+import math
+from flask import Blueprint, jsonify, request, current_app
+from app.utils.unit_converter import get_unit_registry
+from app.utils.conversion_service import convert_request
+from app.utils.formatting import format_number
+from app.utils.cache import LRUCache
 
 api_bp = Blueprint('api', __name__)
 
+
+@api_bp.record_once
+def init_search_cache(state):
+    """Give each app its own LRU of search results keyed by query"""
+    state.app.extensions['search_cache'] = LRUCache(state.app.config.get('SEARCH_CACHE_SIZE', 1024))
+
+
 @api_bp.route('/api/convert', methods=['POST'])
 def convert():
     try:
-        data = request.get_json()
-        if not data:
+        payload, status = convert_request(request.get_json(silent=True))
+        return jsonify(payload), status
+    except Exception as e:
+        current_app.logger.error(f"Conversion error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+@api_bp.route('/api/convert/batch', methods=['POST'])
+def convert_batch():
+    """Convert many values in one request.
+
+    Accepts either a shared unit pair with a list of values::
+
+        {"category": "length", "fromUnit": "m", "toUnit": "ft", "values": [1, 2]}
+
+    or a list of independent conversions::
+
+        {"items": [{"category": "length", "fromUnit": "m", "toUnit": "ft", "value": 1}]}
+
+    Results are returned in request order; items that fail are null in
+    ``results`` and listed with their index in ``errors``.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data, dict):
             return jsonify({'success': False, 'error': 'No data provided'}), 400
-        
-        required_fields = ['category', 'fromUnit', 'toUnit', 'value']
-        if not all(field in data for field in required_fields):
-            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
-        
-        # Get the value and ensure it's a number
-        try:
-            value = float(data['value'])
-        except (TypeError, ValueError):
-            return jsonify({'success': False, 'error': 'Invalid value provided'}), 400
-        
-        # Perform conversion
-        unit_manager = UnitManager()
-        result = unit_manager.convert_value(
-            data['category'],
-            data['fromUnit'],
-            data['toUnit'],
-            value
-        )
-        
-        if result is None:
-            return jsonify({'success': False, 'error': 'Invalid conversion'}), 400
-        
-        # Format the result
-        formatted_result = format_number(result)
-        
+
+        if 'items' in data:
+            items = data['items']
+            if not isinstance(items, list):
+                return jsonify({'success': False, 'error': 'items must be a list'}), 400
+            count = len(items)
+        else:
+            required_fields = ['category', 'fromUnit', 'toUnit', 'values']
+            if not all(field in data for field in required_fields):
+                return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+            if not isinstance(data['values'], list):
+                return jsonify({'success': False, 'error': 'values must be a list'}), 400
+            count = len(data['values'])
+
+        max_items = current_app.config.get('BATCH_CONVERT_MAX_ITEMS', 10000)
+        if count > max_items:
+            return jsonify({
+                'success': False,
+                'error': f'Too many items (maximum {max_items})'
+            }), 413
+
+        registry = get_unit_registry()
+        results = [None] * count
+        errors = {}
+
+        if 'items' in data:
+            # Group indices by unit pair so each pair is converted in one pass
+            groups = {}
+            for index, item in enumerate(items):
+                try:
+                    key = (item['category'], item['fromUnit'], item['toUnit'])
+                    value = item['value']
+                    hash(key)
+                except (KeyError, TypeError):
+                    errors[index] = 'Missing required fields'
+                    continue
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = ([], [])
+                group[0].append(index)
+                group[1].append(value)
+            groups = [(key, indices, values) for key, (indices, values) in groups.items()]
+        else:
+            key = (data['category'], data['fromUnit'], data['toUnit'])
+            groups = [(key, range(count), data['values'])]
+
+        for key, indices, values in groups:
+            converted = registry.convert_values(*key, values)
+            if converted is None:
+                for index in indices:
+                    errors[index] = 'Invalid conversion'
+                continue
+            for index, result in zip(indices, converted):
+                if result is None or not math.isfinite(result):
+                    errors[index] = 'Invalid value provided'
+                else:
+                    results[index] = result
+
+        locale = data.get('locale')
+        if not isinstance(locale, str):
+            locale = None
         return jsonify({
             'success': True,
-            'result': result,
-            'formatted': formatted_result
+            'count': count,
+            'results': results,
+            'formatted': [None if r is None else format_number(r, locale) for r in results],
+            'errors': [{'index': i, 'error': errors[i]} for i in sorted(errors)]
         })
-    
+
     except Exception as e:
-        print(f"Conversion error: {str(e)}")  # For debugging
+        current_app.logger.error(f"Batch conversion error: {str(e)}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
-def format_number(value):
-    """Format number for display"""
+@api_bp.route('/api/search')
+def search():
+    """Search units by name, symbol, id or category title"""
+    query = request.args.get('q', '')[:100]
     try:
-        if abs(value) >= 1e6 or (abs(value) < 1e-6 and value != 0):
-            return f"{value:.6e}"
-        else:
-            # Remove trailing zeros and decimal point if not needed
-            return f"{value:.6f}".rstrip('0').rstrip('.')
-    except (TypeError, ValueError):
-        return str(value)
\ No newline at end of file
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    registry = get_unit_registry()
+    cache = current_app.extensions['search_cache']
+    cache_key = (registry.data_version, query.lower().strip(), limit)
+    results = cache.get(cache_key)
+    if results is None:
+        results = registry.search_index.search(query, limit=limit)
+        cache.set(cache_key, results)
+
+    response = jsonify(results)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    response.set_etag(registry.data_version)
+    return response.make_conditional(request)
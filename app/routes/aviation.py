@@ -1,14 +1,31 @@
-from flask import Blueprint, render_template, jsonify, request
+import math
+from flask import Blueprint, Response, current_app, render_template, jsonify, request
 from app.utils.aviation_calculations import (
     calculate_fuel_requirements,
     calculate_ground_speed,
     calculate_density_altitude,
     calculate_crosswind
 )
+from app.utils.aviation_tables import export_tables_binary, export_tables_json, tables_etag
+from app.utils.aviation_vectorized import BATCH_CALCULATIONS
+from app.utils.flight_plan import calculate_flight_plan, legs_from_waypoints
 from app.utils.seo import generate_meta_tags
 
 aviation = Blueprint('aviation', __name__)
 
+# Request field -> flight plan leg/waypoint key
+FLIGHT_PLAN_LEG_FIELDS = {
+    'name': 'name',
+    'distance': 'distance',
+    'course': 'course',
+    'windSpeed': 'wind_speed',
+    'windDirection': 'wind_direction',
+    'trueAirspeed': 'true_airspeed',
+    'fuelFlow': 'fuel_flow',
+    'lat': 'lat',
+    'lon': 'lon',
+}
+
 @aviation.route('/')
 def aviation_calculators():
     meta_tags = generate_meta_tags(base_url=request.url_root)
@@ -68,3 +85,104 @@ def density_altitude_calculator():
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
+
+
+@aviation.route('/api/aviation/batch', methods=['POST'])
+def batch_calculator():
+    """Evaluate one calculator over many input rows in a single NumPy pass.
+
+    ``inputs`` maps each request field of the chosen calculation to a scalar
+    or a list; lists must share one length and scalars apply to every row.
+    Results come back as columns, with NaN/invalid rows reported as null and
+    listed in ``errors``.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'No data provided'}), 400
+    entry = BATCH_CALCULATIONS.get(data.get('calculation'))
+    if entry is None:
+        return jsonify({
+            'error': f"calculation must be one of: {', '.join(BATCH_CALCULATIONS)}"
+        }), 400
+    inputs = data.get('inputs')
+    if not isinstance(inputs, dict):
+        return jsonify({'error': 'inputs must be an object'}), 400
+
+    function, fields = entry
+    kwargs = {}
+    for field, argument, default in fields:
+        if field in inputs:
+            kwargs[argument] = inputs[field]
+        elif default is None:
+            return jsonify({'error': f'Missing required input: {field}'}), 400
+        else:
+            kwargs[argument] = default
+
+    count = max((len(v) for v in kwargs.values() if isinstance(v, list)), default=1)
+    max_items = current_app.config.get('AVIATION_BATCH_MAX_ITEMS', 100000)
+    if count > max_items:
+        return jsonify({'error': f'Too many rows (maximum {max_items})'}), 413
+
+    try:
+        result = function(**kwargs)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    errors = result.pop('error').ravel().tolist()
+    columns = {
+        name: [v if math.isfinite(v) else None for v in column.ravel().tolist()]
+        for name, column in result.items()
+    }
+    return jsonify({
+        'count': len(errors),
+        'results': columns,
+        'errors': [{'index': i, 'error': error} for i, error in enumerate(errors) if error is not None]
+    })
+
+@aviation.route('/api/aviation/flight-plan', methods=['POST'])
+def flight_plan_calculator():
+    """Time and fuel for a multi-leg flight plan given as legs or waypoints"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'No data provided'}), 400
+    entries = data.get('legs', data.get('waypoints'))
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'legs or waypoints must be a non-empty list'}), 400
+    max_legs = current_app.config.get('FLIGHT_PLAN_MAX_LEGS', 1000)
+    if len(entries) > max_legs:
+        return jsonify({'error': f'Too many legs (maximum {max_legs})'}), 413
+
+    try:
+        entries = [
+            {key: entry[field] for field, key in FLIGHT_PLAN_LEG_FIELDS.items() if field in entry}
+            for entry in entries
+        ]
+    except TypeError:
+        return jsonify({'error': 'Each leg must be an object'}), 400
+
+    try:
+        legs = entries if 'legs' in data else legs_from_waypoints(entries)
+        fuel_on_board = data.get('fuelOnBoard')
+        result = calculate_flight_plan(
+            legs,
+            true_airspeed=data.get('trueAirspeed'),
+            fuel_flow=data.get('fuelFlow'),
+            reserve_time=float(data.get('reserveTime', 45)),
+            contingency_percent=float(data.get('contingencyPercent', 0)),
+            taxi_fuel=float(data.get('taxiFuel', 0)),
+            fuel_on_board=None if fuel_on_board is None else float(fuel_on_board)
+        )
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@aviation.route('/api/aviation/tables.<any(json, bin):fmt>')
+def lookup_tables(fmt):
+    """Precomputed density-altitude and crosswind grids for client-side lookups"""
+    if fmt == 'json':
+        response = Response(export_tables_json(), mimetype='application/json')
+    else:
+        response = Response(export_tables_binary(), mimetype='application/octet-stream')
+    response.set_etag(f'{tables_etag()}-{fmt}')
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response.make_conditional(request)
@@ -1,12 +1,31 @@
 # app/routes/converter.py
-from flask import Blueprint, render_template, jsonify, request, abort, current_app, redirect, url_for
-from app.utils.unit_converter import UnitManager
+from flask import Blueprint, render_template, jsonify, request, abort, current_app, redirect, url_for, make_response
+from app.utils.unit_converter import get_unit_registry
+from app.utils.conversion_service import convert_request
+from app.utils.formatting import format_number
 from app.utils.seo import generate_meta_tags
+from app.utils.cache import LRUCache
+from app.utils.instrumentation import span, traced
 
 converter_bp = Blueprint('converter', __name__)
 
+
+# Input column of the common values tables, formatted once at import
+TEMPERATURE_TABLE_VALUES = tuple((v, format_number(v)) for v in (-40, -20, 0, 20, 40, 60, 80, 100))
+DEFAULT_TABLE_VALUES = tuple((v, format_number(v)) for v in (0.001, 0.01, 0.1, 1, 10, 100, 1000))
+
+
+@converter_bp.record_once
+def init_page_cache(state):
+    """Give each app its own LRU of rendered conversion pages and formatted tables"""
+    maxsize = state.app.config.get('CONVERSION_PAGE_CACHE_SIZE', 512)
+    state.app.extensions['conversion_page_cache'] = LRUCache(maxsize)
+    table_maxsize = state.app.config.get('CONVERSION_TABLE_CACHE_SIZE', 4096)
+    state.app.extensions['conversion_table_cache'] = LRUCache(table_maxsize)
+
 # Updated get_related_conversions function that correctly handles the category parameter
 
+@traced('related_conversions')
 def get_related_conversions(category_id, category_info, current_from, current_to):
     """Get related conversions for the current conversion"""
     related = []
@@ -68,19 +87,43 @@ def convert(category, from_unit, to_unit):
                               from_unit=from_unit,
                               to_unit=to_unit))
     
-    unit_manager = UnitManager()
-    category_info = unit_manager.get_category(normalized_category)
+    registry = get_unit_registry()
+    category_info = registry.get_category(normalized_category)
     
     if not category_info or from_unit not in category_info['units'] or to_unit not in category_info['units']:
         abort(404)
     
+    # Pages are a pure function of units.json, the templates and code, and the
+    # URL, so they are rendered once per data and build version. Query strings
+    # (e.g. ?value=) prefill the form and bypass the cache.
+    build = current_app.extensions['build_version']
+    page_cache = current_app.extensions['conversion_page_cache']
+    cache_key = None
+    html = None
+    if not request.query_string:
+        cache_key = (registry.data_version, build.version, request.url_root, normalized_category, from_unit, to_unit)
+        html = page_cache.get(cache_key)
+    
+    if html is None:
+        html = render_conversion_page(registry, normalized_category, category_info, from_unit, to_unit)
+        if cache_key is not None:
+            page_cache.set(cache_key, html)
+    
+    response = make_response(html)
+    response.set_etag(f'{registry.data_version}-{build.version}')
+    response.last_modified = max(registry.data_last_modified, build.last_modified)
+    return response.make_conditional(request)
+
+
+def render_conversion_page(registry, category, category_info, from_unit, to_unit):
+    """Render the HTML for a single conversion page"""
     unit_info = {
         'from': category_info['units'][from_unit],
         'to': category_info['units'][to_unit]
     }
     
     # Generate common values table
-    common_values = generate_conversion_table(unit_manager, normalized_category, from_unit, to_unit)
+    common_values = get_conversion_table(registry, category, from_unit, to_unit)
     
     # Get conversion formula if applicable
     formula = None
@@ -89,17 +132,17 @@ def convert(category, from_unit, to_unit):
         formula = category_info['formulas'].get(formula_key)
     
     # Get related conversions - Note the category is explicitly passed here
-    related_conversions = get_related_conversions(normalized_category, category_info, from_unit, to_unit)
+    related_conversions = get_related_conversions(category, category_info, from_unit, to_unit)
     
     meta_tags = generate_meta_tags(
-        category=normalized_category, 
+        category=category, 
         from_unit=from_unit, 
         to_unit=to_unit,
         base_url=request.url_root
     )
     
     return render_template('pages/convert.html',
-                         category=normalized_category,
+                         category=category,
                          from_unit=from_unit,
                          to_unit=to_unit,
                          unit_info=unit_info,
@@ -108,49 +151,41 @@ def convert(category, from_unit, to_unit):
                          related_conversions=related_conversions,
                          meta_tags=meta_tags)
 
-
-def format_number(value):
-    """Format number for display"""
-    try:
-        # Handle None or empty values
-        if value is None:
-            return "0"
-            
-        # Convert to float if string
-        if isinstance(value, str):
-            value = float(value)
-            
-        # Use scientific notation for very large or small numbers
-        if abs(value) >= 1e6 or (abs(value) < 1e-6 and abs(value) > 0):
-            return f"{value:.6e}"
-            
-        # For "normal" numbers, use regular formatting with up to 6 decimal places
-        # Remove trailing zeros after decimal point
-        return f"{value:.6f}".rstrip('0').rstrip('.')
-    except (ValueError, TypeError):
-        return "0"
-
-def generate_conversion_table(unit_manager, category, from_unit, to_unit):
+def generate_conversion_table(registry, category, from_unit, to_unit):
     """Generate a table of common conversion values"""
     result = []
     
     # Define common values based on unit type
     if category == 'temperature':
-        base_values = [-40, -20, 0, 20, 40, 60, 80, 100]
+        base_values = TEMPERATURE_TABLE_VALUES
     else:
-        # Generate exponential values for other unit types
-        base_values = [0.001, 0.01, 0.1, 1, 10, 100, 1000]
+        # Exponential values for other unit types
+        base_values = DEFAULT_TABLE_VALUES
     
-    for value in base_values:
-        converted = unit_manager.convert_value(category, from_unit, to_unit, value)
+    for value, formatted in base_values:
+        converted = registry.convert_value(category, from_unit, to_unit, value)
         if converted is not None:
             result.append({
-                'from': format_number(value),
+                'from': formatted,
                 'to': format_number(converted)
             })
     
     return result
 
+def get_conversion_table(registry, category, from_unit, to_unit):
+    """Formatted common values table for a unit pair, memoised per data version.
+
+    The returned list is shared between requests and must not be modified.
+    """
+    cache = current_app.extensions['conversion_table_cache']
+    key = (registry.data_version, category, from_unit, to_unit)
+    table = cache.get(key)
+    if table is None:
+        with span('conversion_table'):
+            table = generate_conversion_table(registry, category, from_unit, to_unit)
+        cache.set(key, table)
+    return table
+
 def normalize_category(category):
     """Normalize category name to match our data structure"""
     return category.lower()
@@ -164,8 +199,8 @@ def category(category):
     if category != normalized_category:
         return redirect(url_for('converter.category', category=normalized_category))
     
-    unit_manager = UnitManager()
-    category_info = unit_manager.get_category(normalized_category)
+    registry = get_unit_registry()
+    category_info = registry.get_category(normalized_category)
     
     if not category_info:
         abort(404)
@@ -174,7 +209,7 @@ def category(category):
     conversion_tables = []
     if 'popular_conversions' in category_info:
         for conv in category_info['popular_conversions']:
-            table_values = generate_conversion_table(unit_manager, normalized_category, conv['from'], conv['to'])
+            table_values = get_conversion_table(registry, normalized_category, conv['from'], conv['to'])
             table = {
                 'title': f"{category_info['units'][conv['from']]['name']} to {category_info['units'][conv['to']]['name']}",
                 'from_unit': category_info['units'][conv['from']]['symbol'],
@@ -186,7 +221,7 @@ def category(category):
     # Get detailed conversion tables for special categories
     detailed_tables = []
     if normalized_category in ['length', 'temperature', 'weight', 'volume', 'speed', 'pressure', 'energy', 'power']:
-        detailed_tables = unit_manager.get_detailed_conversion_tables(normalized_category)
+        detailed_tables = registry.get_detailed_conversion_tables(normalized_category)
     
     meta_tags = generate_meta_tags(category=normalized_category, base_url=request.url_root)
     
@@ -202,31 +237,8 @@ def category(category):
 @converter_bp.route('/api/convert', methods=['POST'])
 def api_convert():
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'success': False, 'error': 'No data provided'}), 400
-        
-        required_fields = ['category', 'fromUnit', 'toUnit', 'value']
-        if not all(field in data for field in required_fields):
-            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
-        
-        unit_manager = UnitManager()
-        result = unit_manager.convert_value(
-            data['category'],
-            data['fromUnit'],
-            data['toUnit'],
-            data['value']
-        )
-        
-        if result is None:
-            return jsonify({'success': False, 'error': 'Invalid conversion'}), 400
-        
-        return jsonify({
-            'success': True,
-            'result': result,
-            'formatted': format_number(result)
-        })
-    
+        payload, status = convert_request(request.get_json(silent=True))
+        return jsonify(payload), status
     except Exception as e:
         current_app.logger.error(f"Conversion error: {str(e)}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
@@ -1,15 +1,23 @@
 # app/routes/main.py
-from flask import Blueprint, render_template, request, Response, url_for
-from app.utils.unit_converter import UnitManager
+from flask import Blueprint, render_template, request, Response, url_for, current_app, abort
+from app.utils.unit_converter import get_unit_registry
 from app.utils.seo import generate_meta_tags
+from app.utils.cache import LRUCache
+from app.utils.sitemap import CompressedDocument, render_urlset, render_sitemap_index
 
 main_bp = Blueprint('main', __name__)
 
+
+@main_bp.record_once
+def init_sitemap_cache(state):
+    """Sitemaps are cached per data version and SITEMAP_BASE_URL"""
+    state.app.extensions['sitemap_cache'] = LRUCache(16)
+
 @main_bp.route('/')
 def index():
-    # Get the complete unit data from UnitManager
-    unit_manager = UnitManager()
-    categories_data = unit_manager._units_data['categories']
+    # Get the complete unit data from the app's registry
+    registry = get_unit_registry()
+    categories_data = registry._units_data['categories']
     meta_tags = generate_meta_tags(base_url=request.url_root)
     
     return render_template('pages/index.html',
@@ -32,35 +40,38 @@ def robots_txt():
         'User-agent: *',
         'Allow: /',
         'Disallow: /static/',
-        f'Sitemap: {request.url_root.rstrip("/")}/sitemap.xml'
+        f'Sitemap: {sitemap_base_url()}/sitemap.xml'
     ]
     return Response("\n".join(lines), mimetype='text/plain')
 
-@main_bp.route('/sitemap.xml')
-def sitemap_xml():
-    unit_manager = UnitManager()
-    base = request.url_root.rstrip('/')
+def build_sitemap_documents(registry, base, all_conversions=False):
+    """Build every sitemap document for a base URL.
 
-    urls = []
+    Returns a dict of CompressedDocument keyed by shard name; 'sitemap' is the
+    document served at /sitemap.xml. With all_conversions the root becomes a
+    sitemap index and each category gets its own child sitemap listing every
+    unit pair; otherwise it is a single urlset with popular conversions.
+    """
+    pages = []
     # Home
-    urls.append({
+    pages.append({
         'loc': f"{base}{url_for('main.index')}",
         'changefreq': 'weekly',
         'priority': '1.0'
     })
 
     # Utility pages
-    urls.append({
+    pages.append({
         'loc': f"{base}{url_for('markdown.index')}",
         'changefreq': 'monthly',
         'priority': '0.6'
     })
-    urls.append({
+    pages.append({
         'loc': f"{base}{url_for('timezone.index')}",
         'changefreq': 'monthly',
         'priority': '0.5'
     })
-    urls.append({
+    pages.append({
         'loc': f"{base}{url_for('text_files.index')}",
         'changefreq': 'monthly',
         'priority': '0.5'
@@ -68,7 +79,7 @@ def sitemap_xml():
     # Aviation calculators landing
     try:
         from app.routes.aviation import aviation  # noqa: F401
-        urls.append({
+        pages.append({
             'loc': f"{base}{url_for('aviation.aviation_calculators')}",
             'changefreq': 'monthly',
             'priority': '0.5'
@@ -76,29 +87,84 @@ def sitemap_xml():
     except Exception:
         pass
 
-    # Categories and popular conversions
-    categories = unit_manager._units_data.get('categories', {})
+    # Categories and their conversions
+    shards = {}
+    categories = registry._units_data.get('categories', {})
     for cat_id, data in categories.items():
-        # Category page
-        urls.append({
+        urls = [{
             'loc': f"{base}{url_for('converter.category', category=cat_id)}",
             'changefreq': 'weekly',
             'priority': '0.8'
-        })
-        # Popular conversions
-        for conv in data.get('popular_conversions', []):
-            loc = f"{base}{url_for('converter.convert', category=cat_id, from_unit=conv['from'], to_unit=conv['to'])}"
+        }]
+        if all_conversions:
+            popular = {(conv['from'], conv['to']) for conv in data.get('popular_conversions', [])}
+            units = data.get('units', {})
+            pairs = [(f, t) for f in units for t in units if f != t]
+        else:
+            popular = None
+            pairs = [(conv['from'], conv['to']) for conv in data.get('popular_conversions', [])]
+        for from_unit, to_unit in pairs:
+            loc = f"{base}{url_for('converter.convert', category=cat_id, from_unit=from_unit, to_unit=to_unit)}"
             urls.append({
                 'loc': loc,
                 'changefreq': 'monthly',
-                'priority': '0.7'
+                'priority': '0.7' if popular is None or (from_unit, to_unit) in popular else '0.5'
             })
+        shards[cat_id] = urls
+
+    if not all_conversions:
+        urls = pages + [u for cat_urls in shards.values() for u in cat_urls]
+        return {'sitemap': CompressedDocument(render_urlset(urls))}
+
+    documents = {'pages': CompressedDocument(render_urlset(pages))}
+    for cat_id, urls in shards.items():
+        documents[cat_id] = CompressedDocument(render_urlset(urls))
+    locs = [f"{base}{url_for('main.sitemap_shard', name=name)}" for name in documents]
+    documents['sitemap'] = CompressedDocument(render_sitemap_index(locs))
+    return documents
+
+
+def sitemap_base_url():
+    """The configured public URL root, never the request's Host header"""
+    return current_app.config.get('SITEMAP_BASE_URL', 'https://anyunit.com/').rstrip('/')
+
+
+def get_sitemap_documents():
+    """Return the sitemap documents for SITEMAP_BASE_URL, built once per data version"""
+    registry = get_unit_registry()
+    base = sitemap_base_url()
+    all_conversions = current_app.config.get('SITEMAP_ALL_CONVERSIONS', False)
+    cache = current_app.extensions['sitemap_cache']
+    key = (registry.data_version, base, all_conversions)
+    documents = cache.get(key)
+    if documents is None:
+        documents = build_sitemap_documents(registry, base, all_conversions)
+        cache.set(key, documents)
+    return documents
+
+
+def send_sitemap(document):
+    """Serve a precompressed sitemap with conditional-GET support"""
+    body, encoding = document.negotiate(request.accept_encodings)
+    response = Response(body, mimetype='application/xml')
+    response.vary.add('Accept-Encoding')
+    etag = document.etag
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        etag = f"{etag}-{encoding}"
+    response.set_etag(etag)
+    response.last_modified = get_unit_registry().data_last_modified
+    return response.make_conditional(request)
+
+
+@main_bp.route('/sitemap.xml')
+def sitemap_xml():
+    return send_sitemap(get_sitemap_documents()['sitemap'])
+
 
-    # Build XML
-    items_xml = "".join([
-        f"<url><loc>{u['loc']}</loc><changefreq>{u['changefreq']}</changefreq>"
-        f"<priority>{u['priority']}</priority></url>" for u in urls
-    ])
-    xml = f"<?xml version='1.0' encoding='UTF-8'?>" \
-          f"<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>{items_xml}</urlset>"
-    return Response(xml, mimetype='application/xml')
\ No newline at end of file
+@main_bp.route('/sitemap-<name>.xml')
+def sitemap_shard(name):
+    document = get_sitemap_documents().get(name)
+    if name == 'sitemap' or document is None:
+        abort(404)
+    return send_sitemap(document)
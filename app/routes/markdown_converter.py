@@ -1,20 +1,44 @@
 # app/routes/markdown_converter.py
-from flask import Blueprint, render_template, request, jsonify, send_file
-import markdown
+from flask import Blueprint, current_app, render_template, request, jsonify, send_file, url_for
 import io
-import os
-import tempfile
-from docx import Document
-import html2docx
+from app.utils.docx_writer import html_to_docx
+from app.utils.export_jobs import DONE, FAILED, QueueFull, create_export_queue
+from app.utils.instrumentation import span
+from app.utils.markdown_preview import DocumentTooLarge, PreviewStore, RevisionMismatch
+from app.utils.markdown_renderer import MarkdownRenderer
 from app.utils.seo import generate_meta_tags
 
 markdown_bp = Blueprint('markdown', __name__)
 
+@markdown_bp.record_once
+def init_markdown_renderer(state):
+    """Give each app a pooled Markdown renderer with its own HTML cache"""
+    state.app.extensions['markdown_renderer'] = MarkdownRenderer(
+        cache_size=state.app.config.get('MARKDOWN_CACHE_SIZE', 256),
+        pool_size=state.app.config.get('MARKDOWN_POOL_SIZE', 8),
+        cache_max_bytes=state.app.config.get('MARKDOWN_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    )
+    state.app.extensions['markdown_previews'] = PreviewStore(
+        state.app.extensions['markdown_renderer'],
+        maxsize=state.app.config.get('MARKDOWN_PREVIEW_DOCUMENTS', 128),
+        max_bytes=state.app.config.get('MARKDOWN_PREVIEW_MAX_BYTES', 64 * 1024 * 1024),
+        max_document_bytes=state.app.config.get('MARKDOWN_PREVIEW_DOCUMENT_MAX_BYTES', 4 * 1024 * 1024)
+    )
+    state.app.extensions['export_jobs'] = create_export_queue(state.app.config)
+
+def render_markdown(md_text):
+    """Render markdown to HTML using the app's pooled, cached renderer"""
+    with span('markdown_render'):
+        return current_app.extensions['markdown_renderer'].render(md_text)
+
 @markdown_bp.route('/')
 def index():
     """Render the markdown converter page"""
     meta_tags = generate_meta_tags(base_url=request.url_root)
-    return render_template('pages/markdown.html', meta_tags=meta_tags)
+    # 0 keeps every download synchronous when background exports are off
+    threshold = current_app.config.get('EXPORT_ASYNC_THRESHOLD', 200000)
+    return render_template('pages/markdown.html', meta_tags=meta_tags,
+                           export_async_threshold=threshold if current_app.extensions['export_jobs'] else 0)
 
 @markdown_bp.route('/convert', methods=['POST'])
 def convert():
@@ -26,10 +50,7 @@ def convert():
         
         # Convert markdown to HTML
         md_text = data['markdown']
-        html_content = markdown.markdown(
-            md_text,
-            extensions=['extra', 'codehilite', 'tables']
-        )
+        html_content = render_markdown(md_text)
         
         return jsonify({
             'success': True,
@@ -39,22 +60,57 @@ def convert():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@markdown_bp.route('/download/html', methods=['POST'])
-def download_html():
-    """Download the converted HTML as a file"""
+@markdown_bp.route('/preview', methods=['POST'])
+def preview():
+    """Incrementally render the live preview.
+
+    ``{"documentId", "markdown"}`` (re)loads a document and returns the HTML of
+    every top-level block. ``{"documentId", "revision", "edit": {"start",
+    "end", "lines"}}`` replaces source lines ``start:end`` of that revision and
+    returns only the re-rendered blocks as a patch. Unknown documents and stale
+    revisions get a 409 with ``resync`` so the client reloads the full text.
+    """
     try:
-        md_text = request.form.get('markdown', '')
-        if not md_text:
-            return jsonify({'success': False, 'error': 'No markdown provided'}), 400
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(
-            md_text,
-            extensions=['extra', 'codehilite', 'tables']
-        )
-        
-        # Wrap the HTML content in a basic HTML document
-        full_html = f"""<!DOCTYPE html>
+        data = request.get_json(silent=True)
+        document_id = data.get('documentId') if isinstance(data, dict) else None
+        if not isinstance(document_id, str) or not document_id:
+            return jsonify({'success': False, 'error': 'No documentId provided'}), 400
+
+        store = current_app.extensions['markdown_previews']
+        if 'markdown' in data:
+            if not isinstance(data['markdown'], str):
+                return jsonify({'success': False, 'error': 'Invalid markdown'}), 400
+            try:
+                result = store.load(document_id, data['markdown'])
+            except DocumentTooLarge as e:
+                return jsonify({'success': False, 'error': str(e)}), 413
+            return jsonify({'success': True, **result})
+
+        edit = data.get('edit')
+        if not isinstance(edit, dict):
+            return jsonify({'success': False, 'error': 'No markdown or edit provided'}), 400
+        start, end, lines = edit.get('start'), edit.get('end'), edit.get('lines')
+        if (not isinstance(start, int) or not isinstance(end, int)
+                or not isinstance(lines, list) or not all(isinstance(line, str) for line in lines)):
+            return jsonify({'success': False, 'error': 'Invalid edit'}), 400
+
+        try:
+            result = store.apply(document_id, data.get('revision'), start, end, lines)
+        except RevisionMismatch:
+            return jsonify({'success': False, 'error': 'Stale revision', 'resync': True}), 409
+        except DocumentTooLarge as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if result is None:
+            return jsonify({'success': False, 'error': 'Unknown document', 'resync': True}), 409
+
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+HTML_DOCUMENT = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -74,19 +130,78 @@ def download_html():
 {html_content}
 </body>
 </html>"""
-        
-        # Create a memory file-like object
-        mem = io.BytesIO()
-        mem.write(full_html.encode('utf-8'))
-        mem.seek(0)
-        
-        return send_file(
-            mem,
-            as_attachment=True,
-            download_name='markdown_conversion.html',
-            mimetype='text/html'
-        )
-    
+
+def build_html(md_text, progress=None):
+    """Markdown as a standalone UTF-8 HTML document"""
+    html_content = render_markdown(md_text)
+    if progress:
+        progress(0.8)
+    return HTML_DOCUMENT.format(html_content=html_content).encode('utf-8')
+
+def build_docx(md_text, progress=None):
+    """Markdown as DOCX bytes, built in memory - no temp files or pandoc subprocess"""
+    html_content = render_markdown(md_text)
+    if progress:
+        progress(0.5)
+    with span('docx_export'):
+        return html_to_docx(html_content).getvalue()
+
+# format -> (builder, download name, mimetype)
+EXPORT_FORMATS = {
+    'html': (build_html, 'markdown_conversion.html', 'text/html'),
+    'docx': (build_docx, 'markdown_conversion.docx',
+             'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+}
+
+def send_export(kind, data):
+    _, download_name, mimetype = EXPORT_FORMATS[kind]
+    return send_file(io.BytesIO(data), as_attachment=True, download_name=download_name, mimetype=mimetype)
+
+def job_payload(job):
+    return {
+        'success': True,
+        **job.to_dict(),
+        'statusUrl': url_for('markdown.export_job', job_id=job.id),
+        'resultUrl': url_for('markdown.export_result', job_id=job.id),
+    }
+
+def export(kind):
+    """Build an export inline, or as a background job for large documents.
+
+    Documents of at least EXPORT_ASYNC_THRESHOLD characters, or any document
+    posted with ``async=1``, get a 202 with a job id to poll instead of the file.
+    Without a job queue (see create_export_queue) every export is synchronous.
+    """
+    md_text = request.form.get('markdown', '')
+    if not md_text:
+        return jsonify({'success': False, 'error': 'No markdown provided'}), 400
+
+    builder = EXPORT_FORMATS[kind][0]
+    queue = current_app.extensions['export_jobs']
+    threshold = current_app.config.get('EXPORT_ASYNC_THRESHOLD', 200000)
+    if queue is None or (request.form.get('async') not in ('1', 'true') and len(md_text) < threshold):
+        return send_export(kind, builder(md_text))
+
+    app = current_app._get_current_object()
+
+    def build(progress):
+        with app.app_context():
+            return builder(md_text, progress)
+
+    try:
+        job, created = queue.submit(kind, md_text, build)
+    except QueueFull:
+        return jsonify({'success': False, 'error': 'Too many exports in progress, retry shortly'}), 503, {
+            'Retry-After': '5'}
+    payload = job_payload(job)
+    payload['deduplicated'] = not created
+    return jsonify(payload), 202, {'Location': payload['statusUrl']}
+
+@markdown_bp.route('/download/html', methods=['POST'])
+def download_html():
+    """Download the converted HTML as a file"""
+    try:
+        return export('html')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -94,107 +209,31 @@ def download_html():
 def download_docx():
     """Download the converted markdown as a DOCX file"""
     try:
-        md_text = request.form.get('markdown', '')
-        if not md_text:
-            return jsonify({'success': False, 'error': 'No markdown provided'}), 400
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(
-            md_text,
-            extensions=['extra', 'codehilite', 'tables']
-        )
-        
-        # Create a temporary HTML file
-        with tempfile.NamedTemporaryFile(suffix='.html', delete=False) as temp_html:
-            temp_html_path = temp_html.name
-            temp_html.write(f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Markdown Conversion</title>
-</head>
-<body>
-{html_content}
-</body>
-</html>""".encode('utf-8'))
-        
-        # Create a temporary DOCX file
-        temp_docx_path = tempfile.NamedTemporaryFile(suffix='.docx', delete=False).name
-        
-        try:
-            # Use pandoc for conversion (must be installed on the system)
-            import subprocess
-            result = subprocess.run(
-                ['pandoc', temp_html_path, '-f', 'html', '-t', 'docx', '-o', temp_docx_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            # Return the file
-            return send_file(
-                temp_docx_path,
-                as_attachment=True,
-                download_name='markdown_conversion.docx',
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-        except subprocess.CalledProcessError as e:
-            return jsonify({'success': False, 'error': f"Pandoc conversion failed: {e.stderr}"}), 500
-        except FileNotFoundError:
-            # Fallback if pandoc is not available - use python-mammoth in reverse
-            from docx import Document
-            
-            # Create a Document
-            doc = Document()
-            
-            # Parse HTML and convert to DOCX
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Process headings
-            for i in range(1, 7):
-                for heading in soup.find_all(f'h{i}'):
-                    doc.add_heading(heading.get_text(), level=i)
-                    heading.decompose()  # Remove the heading from the soup
-            
-            # Process paragraphs
-            for para in soup.find_all('p'):
-                p = doc.add_paragraph()
-                for child in para.children:
-                    if child.name == 'strong' or child.name == 'b':
-                        p.add_run(child.get_text()).bold = True
-                    elif child.name == 'em' or child.name == 'i':
-                        p.add_run(child.get_text()).italic = True
-                    else:
-                        p.add_run(str(child))
-            
-            # Process lists
-            for ul in soup.find_all('ul'):
-                for li in ul.find_all('li'):
-                    doc.add_paragraph(li.get_text(), style='List Bullet')
-            
-            for ol in soup.find_all('ol'):
-                for i, li in enumerate(ol.find_all('li')):
-                    doc.add_paragraph(li.get_text(), style='List Number')
-            
-            # Save to a BytesIO object
-            docx_io = io.BytesIO()
-            doc.save(docx_io)
-            docx_io.seek(0)
-            
-            return send_file(
-                docx_io,
-                as_attachment=True,
-                download_name='markdown_conversion.docx',
-                mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-        finally:
-            # Clean up temporary files
-            try:
-                os.unlink(temp_html_path)
-                os.unlink(temp_docx_path)
-            except:
-                pass
-    
+        return export('docx')
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@markdown_bp.route('/jobs/<job_id>', methods=['GET'])
+def export_job(job_id):
+    """Status and progress of a background export"""
+    queue = current_app.extensions['export_jobs']
+    job = queue.get(job_id) if queue else None
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    return jsonify(job_payload(job))
+
+@markdown_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def export_result(job_id):
+    """The finished export file; 409 while the job is still queued or running"""
+    queue = current_app.extensions['export_jobs']
+    job = queue.get(job_id) if queue else None
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    if job.state == FAILED:
+        return jsonify({**job_payload(job), 'success': False}), 500
+    if job.state != DONE:
+        return jsonify({**job_payload(job), 'success': False, 'error': 'Export not ready'}), 409
+    data = queue.result(job_id)
+    if data is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    return send_export(job.kind, data)
@@ -1,19 +1,71 @@
-from flask import Blueprint, render_template
+import shutil
+import tempfile
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
+from app.utils.text_converters import CONVERTERS, CHUNK_SIZE, ConversionError, DocumentTooLarge
 
 text_files_bp = Blueprint('text_files', __name__)
 
+# Define the supported conversion formats
+CONVERSION_FORMATS = [
+    {"id": "json-to-xml", "name": "JSON to XML"},
+    {"id": "json-to-csv", "name": "JSON to CSV"},
+    {"id": "csv-to-json", "name": "CSV to JSON"},
+    {"id": "csv-to-xml", "name": "CSV to XML"},
+    {"id": "xml-to-json", "name": "XML to JSON"},
+    {"id": "xml-to-csv", "name": "XML to CSV"}
+]
+
 @text_files_bp.route('/')
 def index():
     """Render the text files converter page"""
-    
-    # Define the supported conversion formats
-    conversion_formats = [
-        {"id": "json-to-xml", "name": "JSON to XML"},
-        {"id": "json-to-csv", "name": "JSON to CSV"},
-        {"id": "csv-to-json", "name": "CSV to JSON"},
-        {"id": "csv-to-xml", "name": "CSV to XML"},
-        {"id": "xml-to-json", "name": "XML to JSON"},
-        {"id": "xml-to-csv", "name": "XML to CSV"}
-    ]
-    
-    return render_template('pages/text_files.html', conversion_formats=conversion_formats)
\ No newline at end of file
+    return render_template('pages/text_files.html', conversion_formats=CONVERSION_FORMATS)
+
+
+def _spool_request_body():
+    """Copy a raw request body to a spooled temp file without reading it all into memory"""
+    spool = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 16)
+    shutil.copyfileobj(request.stream, spool, CHUNK_SIZE)
+    spool.seek(0)
+    return spool
+
+
+@text_files_bp.route('/api/convert/<conversion>', methods=['POST'])
+def convert(conversion):
+    """Convert an uploaded file, streaming the result back chunk by chunk.
+
+    The input is either a multipart upload in the ``file`` field or the raw
+    request body.
+    """
+    entry = CONVERTERS.get(conversion)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'Invalid conversion type'}), 404
+    converter, extension, mimetype = entry
+
+    upload = request.files.get('file')
+    fp = upload.stream if upload is not None else _spool_request_body()
+    fp.seek(0, 2)
+    if fp.tell() == 0:
+        fp.close()
+        return jsonify({'success': False, 'error': 'No file provided'}), 400
+
+    chunks = converter(fp)
+    try:
+        # Run up to the first chunk so input errors still get a proper 400
+        first = next(chunks, '')
+    except DocumentTooLarge as e:
+        fp.close()
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except ConversionError as e:
+        fp.close()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def generate():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            fp.close()
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=converted.{extension}'
+    return response
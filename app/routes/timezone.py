@@ -1,10 +1,21 @@
-from flask import Blueprint, render_template, current_app, request
+from flask import Blueprint, render_template, current_app, request, jsonify
 import json
 import os
 from app.utils.seo import generate_meta_tags
+from app.utils.cache import LRUCache
+from app.utils.data_snapshot import get_snapshot
+from app.utils.instrumentation import span
+from app.utils.timezones import TimezoneIndex
 
 timezone_bp = Blueprint('timezone', __name__)
 
+
+@timezone_bp.record_once
+def init_timezone_cache(state):
+    """Rendered timezone pages, keyed by base URL"""
+    state.app.extensions['timezone_page_cache'] = LRUCache(16)
+
+
 def load_timezone_data():
     json_path = os.path.join(current_app.static_folder, 'data', 'timezones.json')
     try:
@@ -16,13 +27,65 @@ def load_timezone_data():
         # Return empty data as fallback
         return {"timezones": [], "cities_data": {}}
 
+
+def get_timezone_index():
+    """Return the app's TimezoneIndex, from the data snapshot or timezones.json on first use"""
+    index = current_app.extensions.get('timezone_index')
+    if index is None:
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            index = snapshot.timezone_index
+        else:
+            with span('timezone_load'):
+                index = TimezoneIndex(load_timezone_data())
+        if index.timezones:
+            # Don't pin the empty fallback if the file failed to load
+            current_app.extensions['timezone_index'] = index
+    return index
+
+
 @timezone_bp.route('/')
 def index():
-    
-    timezone_data = load_timezone_data()
-    meta_tags = generate_meta_tags(base_url=request.url_root)
-    
-    return render_template('pages/timezone.html', 
-                          timezone_data=timezone_data['timezones'],
-                          cities_data=timezone_data['cities_data'],
-                          meta_tags=meta_tags)
\ No newline at end of file
+    cache = current_app.extensions['timezone_page_cache']
+    html = cache.get(request.url_root)
+    if html is None:
+        timezone_index = get_timezone_index()
+        meta_tags = generate_meta_tags(base_url=request.url_root)
+        html = render_template('pages/timezone.html', 
+                              timezone_data=timezone_index.timezones,
+                              cities_data=timezone_index.cities_data,
+                              meta_tags=meta_tags)
+        if timezone_index.timezones:
+            # Don't pin a page rendered from the empty fallback
+            cache.set(request.url_root, html)
+    return html
+
+
+@timezone_bp.route('/api/lookup')
+def lookup():
+    """Resolve a city (?city=) or a UTC offset (?offset=+01:00) to its timezone"""
+    timezone_index = get_timezone_index()
+
+    city_name = request.args.get('city', '').strip()
+    if city_name:
+        city = timezone_index.lookup_city(city_name)
+        if city is None:
+            return jsonify({'success': False, 'error': 'City not found'}), 404
+        return jsonify({
+            'success': True,
+            'city': city,
+            'zone': timezone_index.zone_for_offset(city['offset'])
+        })
+
+    offset = request.args.get('offset', '').strip()
+    if offset:
+        # '+' in a query string decodes to a space
+        if offset[0] not in '+-':
+            offset = '+' + offset
+        zone = timezone_index.zone_for_offset(offset)
+        cities = timezone_index.cities_for_offset(offset)
+        if zone is None and not cities:
+            return jsonify({'success': False, 'error': 'Offset not found'}), 404
+        return jsonify({'success': True, 'zone': zone, 'cities': cities})
+
+    return jsonify({'success': False, 'error': 'Provide a city or offset'}), 400
@@ -1,16 +1,27 @@
 // static/js/text_file_converter.js
 
 document.addEventListener('DOMContentLoaded', function () {
+    // Conversions run on the server (/text/api/convert/<type>), which parses the
+    // input incrementally and streams the result back. The page only keeps a
+    // preview of the output, so large files no longer crash the tab.
+    const PREVIEW_CHARS = 256 * 1024;
+
     // DOM Elements
     const conversionFormatSelect = document.getElementById('conversion-format');
     const inputEditor = document.getElementById('input-editor');
+    const fileInput = document.getElementById('file-input');
     const outputContent = document.getElementById('output-content');
+    const outputNote = document.getElementById('output-note');
     const convertBtn = document.getElementById('convert-btn');
     const copyOutputBtn = document.getElementById('copy-output-btn');
     const downloadBtn = document.getElementById('download-btn');
     const loadSampleBtn = document.getElementById('load-sample-btn');
     const errorMessage = document.getElementById('error-message');
 
+    // Converted output: Blob parts for download, and whether the preview holds all of it
+    let outputParts = [];
+    let outputComplete = false;
+
     // Event Listeners
     convertBtn.addEventListener('click', convertContent);
     copyOutputBtn.addEventListener('click', copyOutput);
@@ -19,61 +30,92 @@ document.addEventListener('DOMContentLoaded', function () {
     conversionFormatSelect.addEventListener('change', function () {
         inputEditor.placeholder = getInputPlaceholder(conversionFormatSelect.value);
     });
+    fileInput.addEventListener('change', function () {
+        // A chosen file is uploaded as-is instead of the editor contents
+        inputEditor.value = '';
+        inputEditor.placeholder = getInputPlaceholder(conversionFormatSelect.value);
+    });
+    inputEditor.addEventListener('input', function () {
+        fileInput.value = '';
+    });
 
     // Initialize placeholder
     inputEditor.placeholder = getInputPlaceholder(conversionFormatSelect.value);
 
     // Conversion Functions
-    function convertContent() {
-        // Clear previous error messages
+    async function convertContent() {
+        // Clear previous error messages and output
         errorMessage.style.display = 'none';
         errorMessage.textContent = '';
+        resetOutput();
 
-        const inputValue = inputEditor.value.trim();
-        if (!inputValue) {
-            showError('Please enter some content to convert.');
+        const file = fileInput.files[0];
+        const body = file || inputEditor.value.trim();
+        if (!body) {
+            showError('Please enter some content or choose a file to convert.');
             return;
         }
 
         const conversionType = conversionFormatSelect.value;
+        convertBtn.disabled = true;
         try {
-            let result;
-            switch (conversionType) {
-                case 'json-to-xml':
-                    result = convertJsonToXml(inputValue);
-                    break;
-                case 'json-to-csv':
-                    result = convertJsonToCsv(inputValue);
-                    break;
-                case 'csv-to-json':
-                    result = convertCsvToJson(inputValue);
-                    break;
-                case 'csv-to-xml':
-                    result = convertCsvToXml(inputValue);
-                    break;
-                case 'xml-to-json':
-                    result = convertXmlToJson(inputValue);
-                    break;
-                case 'xml-to-csv':
-                    result = convertXmlToCsv(inputValue);
-                    break;
-                default:
-                    showError('Invalid conversion type.');
-                    return;
+            const response = await fetch(`/text/api/convert/${encodeURIComponent(conversionType)}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: body
+            });
+            if (!response.ok) {
+                const data = await response.json().catch(() => ({}));
+                throw new Error(data.error || `Server returned ${response.status}`);
             }
-
-            // Display the result
-            outputContent.textContent = result;
+            await readOutput(response);
 
             // Enable the copy and download buttons
-            copyOutputBtn.disabled = false;
+            copyOutputBtn.disabled = !outputComplete;
             downloadBtn.disabled = false;
         } catch (error) {
             showError(`Error during conversion: ${error.message}`);
-            outputContent.textContent = '';
-            copyOutputBtn.disabled = true;
-            downloadBtn.disabled = true;
+            resetOutput();
+        } finally {
+            convertBtn.disabled = false;
+        }
+    }
+
+    async function readOutput(response) {
+        // Keep every chunk for the download, but decode only the preview
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let preview = '';
+        let truncated = false;
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            outputParts.push(value);
+            if (!truncated) {
+                preview += decoder.decode(value, { stream: true });
+                if (preview.length > PREVIEW_CHARS) {
+                    preview = preview.slice(0, PREVIEW_CHARS);
+                    truncated = true;
+                }
+            }
         }
+        if (!truncated) {
+            preview += decoder.decode();
+        }
+        outputComplete = !truncated;
+        outputContent.textContent = preview;
+        outputNote.textContent = truncated
+            ? 'Showing the start of the output. Download the file for the full result.'
+            : '';
+    }
+
+    function resetOutput() {
+        outputParts = [];
+        outputComplete = false;
+        outputContent.textContent = '';
+        outputNote.textContent = '';
+        copyOutputBtn.disabled = true;
+        downloadBtn.disabled = true;
     }
 
     // Sample Data Functions
@@ -146,6 +188,7 @@ document.addEventListener('DOMContentLoaded', function () {
                 break;
         }
 
+        fileInput.value = '';
         inputEditor.value = sampleData;
     }
 
@@ -186,8 +229,7 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     function downloadOutput() {
-        const outputText = outputContent.textContent;
-        if (!outputText) return;
+        if (!outputParts.length) return;
 
         const conversionType = conversionFormatSelect.value;
         let fileExtension;
@@ -205,7 +247,7 @@ document.addEventListener('DOMContentLoaded', function () {
             mimeType = 'application/json';
         }
 
-        const blob = new Blob([outputText], { type: mimeType });
+        const blob = new Blob(outputParts, { type: mimeType });
         const url = URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
@@ -219,374 +261,4 @@ document.addEventListener('DOMContentLoaded', function () {
             URL.revokeObjectURL(url);
         }, 0);
     }
-
-    // Conversion Functions Implementation
-    function convertJsonToXml(jsonStr) {
-        try {
-            const data = JSON.parse(jsonStr);
-            return jsonToXml(data);
-        } catch (e) {
-            throw new Error('Invalid JSON: ' + e.message);
-        }
-    }
-
-    function jsonToXml(obj, rootName = 'root') {
-        let xml = '';
-
-        function toXml(obj, name) {
-            if (obj === null || obj === undefined) {
-                return `<${name}></${name}>`;
-            }
-
-            if (Array.isArray(obj)) {
-                return obj.map(item => {
-                    if (typeof item === 'object' && item !== null) {
-                        let singularName = name;
-                        // Try to singularize the name (very basic approach)
-                        if (name.endsWith('s')) {
-                            singularName = name.substring(0, name.length - 1);
-                        }
-                        return toXml(item, singularName);
-                    } else {
-                        return `<${name}>${escapeXml(String(item))}</${name}>`;
-                    }
-                }).join('');
-            }
-
-            if (typeof obj === 'object') {
-                let xmlContent = `<${name}>`;
-                for (const key in obj) {
-                    if (Object.prototype.hasOwnProperty.call(obj, key)) {
-                        xmlContent += toXml(obj[key], key);
-                    }
-                }
-                xmlContent += `</${name}>`;
-                return xmlContent;
-            }
-
-            return `<${name}>${escapeXml(String(obj))}</${name}>`;
-        }
-
-        // Add XML declaration
-        xml = '<?xml version="1.0" encoding="UTF-8"?>\n';
-
-        // Handle the root element based on input structure
-        if (typeof obj === 'object' && !Array.isArray(obj) && Object.keys(obj).length === 1) {
-            // Use the single property name as the root element
-            const key = Object.keys(obj)[0];
-            xml += toXml(obj[key], key);
-        } else {
-            // Use the provided root name
-            xml += toXml(obj, rootName);
-        }
-
-        return xml;
-    }
-
-    function escapeXml(unsafe) {
-        return unsafe
-            .replace(/&/g, '&amp;')
-            .replace(/</g, '&lt;')
-            .replace(/>/g, '&gt;')
-            .replace(/"/g, '&quot;')
-            .replace(/'/g, '&apos;');
-    }
-
-    function convertJsonToCsv(jsonStr) {
-        try {
-            const data = JSON.parse(jsonStr);
-            return jsonToCsv(data);
-        } catch (e) {
-            throw new Error('Invalid JSON: ' + e.message);
-        }
-    }
-
-    function jsonToCsv(data) {
-        // Find the array to convert
-        let arrayToConvert = data;
-
-        // If data is an object with a single property that is an array, use that
-        if (!Array.isArray(data) && typeof data === 'object') {
-            const keys = Object.keys(data);
-            if (keys.length === 1 && Array.isArray(data[keys[0]])) {
-                arrayToConvert = data[keys[0]];
-            } else {
-                // If it's just an object, wrap it in an array
-                arrayToConvert = [data];
-            }
-        }
-
-        if (!Array.isArray(arrayToConvert)) {
-            throw new Error('JSON must contain an array of objects to convert to CSV');
-        }
-
-        if (arrayToConvert.length === 0) {
-            return '';
-        }
-
-        // Get all possible column headers from all objects
-        const headers = new Set();
-        arrayToConvert.forEach(item => {
-            if (typeof item === 'object' && item !== null) {
-                Object.keys(item).forEach(key => headers.add(key));
-            }
-        });
-
-        // If there are no headers (array of primitives), handle differently
-        if (headers.size === 0) {
-            return arrayToConvert.map(item => String(item)).join('\n');
-        }
-
-        const headerRow = [...headers].join(',');
-        const rows = arrayToConvert.map(item => {
-            return [...headers].map(header => {
-                const value = item[header];
-                if (value === null || value === undefined) {
-                    return '';
-                }
-                // Handle cells that contain commas or quotes
-                if (typeof value === 'string' && (value.includes(',') || value.includes('"'))) {
-                    return `"${value.replace(/"/g, '""')}"`;
-                }
-                return String(value);
-            }).join(',');
-        });
-
-        return [headerRow, ...rows].join('\n');
-    }
-
-    function convertCsvToJson(csvStr) {
-        try {
-            return csvToJson(csvStr);
-        } catch (e) {
-            throw new Error('Invalid CSV: ' + e.message);
-        }
-    }
-
-    function csvToJson(csvStr) {
-        // Parse CSV (handling quoted fields that may contain commas)
-        const parseCSV = (text) => {
-            const lines = text.split(/\r\n|\n/);
-            return lines.map(line => {
-                const fields = [];
-                let field = '';
-                let inQuotes = false;
-
-                for (let i = 0; i < line.length; i++) {
-                    const char = line[i];
-
-                    if (char === '"') {
-                        if (i + 1 < line.length && line[i + 1] === '"') {
-                            // Handle escaped quotes (double double-quotes)
-                            field += '"';
-                            i++; // Skip the next quote
-                        } else {
-                            inQuotes = !inQuotes;
-                        }
-                    } else if (char === ',' && !inQuotes) {
-                        fields.push(field);
-                        field = '';
-                    } else {
-                        field += char;
-                    }
-                }
-
-                fields.push(field); // Don't forget the last field
-                return fields;
-            });
-        };
-
-        const rows = parseCSV(csvStr);
-        if (rows.length < 2) {
-            throw new Error('CSV must have headers and at least one data row');
-        }
-
-        const headers = rows[0];
-        const result = [];
-
-        for (let i = 1; i < rows.length; i++) {
-            if (rows[i].length === 0 || (rows[i].length === 1 && rows[i][0] === '')) {
-                continue; // Skip empty rows
-            }
-
-            const obj = {};
-            for (let j = 0; j < headers.length; j++) {
-                if (j < rows[i].length) {
-                    let value = rows[i][j];
-
-                    // Try to convert numeric values
-                    if (/^-?\d+$/.test(value)) {
-                        // Integer
-                        obj[headers[j]] = parseInt(value, 10);
-                    } else if (/^-?\d+\.\d+$/.test(value)) {
-                        // Float
-                        obj[headers[j]] = parseFloat(value);
-                    } else {
-                        obj[headers[j]] = value;
-                    }
-                } else {
-                    obj[headers[j]] = ''; // Handle missing fields
-                }
-            }
-            result.push(obj);
-        }
-
-        return JSON.stringify(result, null, 2);
-    }
-
-    function convertCsvToXml(csvStr) {
-        try {
-            // First convert CSV to JSON
-            const jsonStr = csvToJson(csvStr);
-            const data = JSON.parse(jsonStr);
-
-            // Then convert JSON to XML with a custom root name
-            return jsonToXml({ rows: data }, 'rows');
-        } catch (e) {
-            throw new Error('Invalid CSV or conversion error: ' + e.message);
-        }
-    }
-
-    function convertXmlToJson(xmlStr) {
-        try {
-            return xmlToJson(xmlStr);
-        } catch (e) {
-            throw new Error('Invalid XML: ' + e.message);
-        }
-    }
-
-    function xmlToJson(xmlStr) {
-        // Create a DOMParser
-        const parser = new DOMParser();
-        const xmlDoc = parser.parseFromString(xmlStr, "text/xml");
-
-        // Check for parsing errors
-        const parserError = xmlDoc.querySelector('parsererror');
-        if (parserError) {
-            throw new Error(parserError.textContent);
-        }
-
-        function elementToJson(element) {
-            const obj = {};
-
-            // Add attributes
-            for (const attr of element.attributes) {
-                obj[`@${attr.name}`] = attr.value;
-            }
-
-            // Process child nodes
-            for (const child of element.childNodes) {
-                if (child.nodeType === Node.ELEMENT_NODE) {
-                    // Check if we've seen this tag before
-                    if (obj[child.nodeName] !== undefined) {
-                        if (!Array.isArray(obj[child.nodeName])) {
-                            // Convert to array if this is the second occurrence
-                            obj[child.nodeName] = [obj[child.nodeName]];
-                        }
-                        obj[child.nodeName].push(elementToJson(child));
-                    } else {
-                        obj[child.nodeName] = elementToJson(child);
-                    }
-                } else if (child.nodeType === Node.TEXT_NODE) {
-                    const text = child.nodeValue.trim();
-                    if (text) {
-                        // If element has no other properties and only text, just use the text
-                        if (Object.keys(obj).length === 0 && element.childNodes.length === 1) {
-                            return text;
-                        } else {
-                            obj['#text'] = text;
-                        }
-                    }
-                }
-            }
-
-            // If the object is empty, return an empty string
-            if (Object.keys(obj).length === 0) {
-                return '';
-            }
-
-            return obj;
-        }
-
-        const rootElement = xmlDoc.documentElement;
-        const result = { [rootElement.nodeName]: elementToJson(rootElement) };
-
-        return JSON.stringify(result, null, 2);
-    }
-
-    function convertXmlToCsv(xmlStr) {
-        try {
-            // First convert XML to JSON
-            const jsonStr = xmlToJson(xmlStr);
-            const data = JSON.parse(jsonStr);
-
-            // We need to identify arrays in the JSON that can be converted to CSV
-            // Find the first array in the JSON structure
-            function findArrayInJson(obj) {
-                if (Array.isArray(obj)) {
-                    return obj;
-                }
-
-                if (typeof obj === 'object' && obj !== null) {
-                    for (const key in obj) {
-                        if (Object.prototype.hasOwnProperty.call(obj, key)) {
-                            const value = obj[key];
-                            if (Array.isArray(value)) {
-                                return value;
-                            }
-
-                            const nestedArray = findArrayInJson(value);
-                            if (nestedArray) {
-                                return nestedArray;
-                            }
-                        }
-                    }
-                }
-
-                return null;
-            }
-
-            // Try to find an array in the structure
-            let arrayData = findArrayInJson(data);
-
-            // If no array found, check if the root element contains similar child elements
-            if (!arrayData) {
-                // Get the root element name
-                const rootKey = Object.keys(data)[0];
-                const rootData = data[rootKey];
-
-                // Check if rootData has properties with the same name (a common XML pattern)
-                const childElementCounts = {};
-                for (const key in rootData) {
-                    if (Object.prototype.hasOwnProperty.call(rootData, key)) {
-                        if (childElementCounts[key]) {
-                            childElementCounts[key]++;
-                        } else {
-                            childElementCounts[key] = 1;
-                        }
-                    }
-                }
-
-                // Find element names that appear multiple times
-                const repeatingElements = Object.keys(childElementCounts).filter(key => childElementCounts[key] > 1);
-
-                if (repeatingElements.length > 0) {
-                    // Convert these repeating elements to an array
-                    arrayData = repeatingElements.map(elementName => rootData[elementName]);
-                } else {
-                    // If still no array found, wrap the entire root object in an array
-                    arrayData = [rootData];
-                }
-            }
-
-            // Once we have an array, convert it to CSV
-            if (arrayData) {
-                return jsonToCsv(arrayData);
-            } else {
-                throw new Error('Could not identify a suitable array structure in the XML for CSV conversion');
-            }
-        } catch (e) {
-            throw new Error('Invalid XML or conversion error: ' + e.message);
-        }
-    }
 });
\ No newline at end of file
@@ -0,0 +1,166 @@
+# app/utils/aviation_tables.py
+"""Precomputed density-altitude and crosswind grids with bilinear interpolation.
+
+Inputs to these calculators fall in narrow ranges, so each is tabulated once
+per process on a regular grid. Lookups interpolate bilinearly between the four
+surrounding grid points. The same grids are exported as a compact binary asset
+so the aviation page can compute results locally instead of calling the API.
+
+Interpolated results agree with the direct calculators within each grid's
+``tolerance``: density altitude is bilinear in pressure altitude and
+temperature, so it is reproduced exactly up to float32 storage; crosswind and
+headwind deviate by at most ``wind_speed × (1° in radians)² / 8`` ≈ 0.004 kt at
+the 100 kt table limit.
+"""
+import hashlib
+import json
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+from app.utils.aviation_vectorized import calculate_crosswind_batch, calculate_density_altitude_batch
+
+TABLE_FORMAT_VERSION = 1
+BINARY_MAGIC = b'AVTB'
+
+
+class LookupGrid:
+    """Values of a two-input function sampled on a regular grid.
+
+    Each axis is ``(name, start, step, count)``. ``values`` has shape
+    ``(x count, y count, channels)``.
+    """
+
+    def __init__(self, name, x_axis, y_axis, channels, function, tolerance):
+        self.name = name
+        self.x_axis = x_axis
+        self.y_axis = y_axis
+        self.channels = list(channels)
+        self.tolerance = tolerance
+        xs = x_axis[1] + x_axis[2] * np.arange(x_axis[3])
+        ys = y_axis[1] + y_axis[2] * np.arange(y_axis[3])
+        grid_x, grid_y = np.meshgrid(xs, ys, indexing='ij')
+        result = function(grid_x, grid_y)
+        self.values = np.stack([result[c] for c in self.channels], axis=-1)
+
+    def _position(self, value, axis):
+        _, start, step, count = axis
+        position = (np.asarray(value, dtype=np.float64) - start) / step
+        index = np.clip(np.floor(position), 0, count - 2).astype(np.intp)
+        return index, position - index
+
+    def contains(self, x, y):
+        """Boolean mask of inputs that fall inside the grid"""
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        (_, x0, dx, nx), (_, y0, dy, ny) = self.x_axis, self.y_axis
+        return ((x >= x0) & (x <= x0 + dx * (nx - 1)) &
+                (y >= y0) & (y <= y0 + dy * (ny - 1)))
+
+    def interpolate(self, x, y):
+        """Bilinearly interpolate every channel; returns ``{channel: array}``.
+
+        Inputs outside the grid are extrapolated from the edge cells, so callers
+        should check ``contains`` first.
+        """
+        i, tx = self._position(x, self.x_axis)
+        j, ty = self._position(y, self.y_axis)
+        tx, ty = tx[..., None], ty[..., None]
+        v = self.values
+        result = ((1 - tx) * (1 - ty) * v[i, j] + tx * (1 - ty) * v[i + 1, j] +
+                  (1 - tx) * ty * v[i, j + 1] + tx * ty * v[i + 1, j + 1])
+        return {name: result[..., k] for k, name in enumerate(self.channels)}
+
+    def describe(self):
+        axis = lambda a: {'name': a[0], 'start': a[1], 'step': a[2], 'count': a[3]}
+        return {
+            'x': axis(self.x_axis),
+            'y': axis(self.y_axis),
+            'channels': self.channels,
+            'tolerance': self.tolerance,
+        }
+
+
+def _density_altitude(pressure_altitude, temperature):
+    return calculate_density_altitude_batch(pressure_altitude, temperature, decimals=None)
+
+
+def _crosswind(wind_speed, wind_angle):
+    return calculate_crosswind_batch(wind_speed, wind_angle, decimals=None)
+
+
+@lru_cache(maxsize=1)
+def get_tables():
+    """Build the lookup grids once per process"""
+    return {
+        'densityAltitude': LookupGrid(
+            'densityAltitude',
+            ('pressureAltitude', 0, 500, 91),   # 0-45000 ft
+            ('temperature', -60, 1, 121),       # -60..+60 °C
+            ['density_altitude'], _density_altitude, tolerance=0.01,
+        ),
+        'crosswind': LookupGrid(
+            'crosswind',
+            ('windSpeed', 0, 5, 21),            # 0-100 kt
+            ('windAngle', 0, 1, 361),           # 0-360°
+            ['crosswind', 'headwind'], _crosswind, tolerance=0.01,
+        ),
+    }
+
+
+def lookup_density_altitude(pressure_altitude, temperature):
+    """Interpolated density altitude, or None outside the table range"""
+    grid = get_tables()['densityAltitude']
+    if not grid.contains(pressure_altitude, temperature):
+        return None
+    return float(grid.interpolate(pressure_altitude, temperature)['density_altitude'])
+
+
+def lookup_crosswind(wind_speed, wind_angle):
+    """Interpolated crosswind/headwind components, or None outside the table range"""
+    grid = get_tables()['crosswind']
+    wind_angle = wind_angle % 360
+    if not grid.contains(wind_speed, wind_angle):
+        return None
+    result = grid.interpolate(wind_speed, wind_angle)
+    return {'crosswind': float(result['crosswind']), 'headwind': float(result['headwind'])}
+
+
+@lru_cache(maxsize=1)
+def export_tables_json():
+    """All grids as a JSON document; values are flattened in x, y, channel order"""
+    document = {'version': TABLE_FORMAT_VERSION, 'tables': {}}
+    for name, grid in get_tables().items():
+        entry = grid.describe()
+        entry['values'] = np.round(grid.values, 3).ravel().tolist()
+        document['tables'][name] = entry
+    return json.dumps(document, separators=(',', ':'))
+
+
+@lru_cache(maxsize=1)
+def export_tables_binary():
+    """All grids as ``AVTB``, a uint32 header length, a JSON header and float32 values.
+
+    The header lists each table's axes, channels, tolerance and the byte
+    ``offset``/``length`` of its little-endian float32 values (x, y, channel
+    order) relative to the start of the value block.
+    """
+    header = {'version': TABLE_FORMAT_VERSION, 'tables': {}}
+    blocks = []
+    offset = 0
+    for name, grid in get_tables().items():
+        data = grid.values.astype('<f4').tobytes()
+        entry = grid.describe()
+        entry.update(offset=offset, length=len(data))
+        header['tables'][name] = entry
+        blocks.append(data)
+        offset += len(data)
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # Pad the header so the float32 block is 4-byte aligned for Float32Array views
+    header_bytes += b' ' * (-(len(BINARY_MAGIC) + 4 + len(header_bytes)) % 4)
+    return BINARY_MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes + b''.join(blocks)
+
+
+@lru_cache(maxsize=1)
+def tables_etag():
+    return hashlib.sha256(export_tables_binary()).hexdigest()[:16]
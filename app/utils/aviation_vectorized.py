@@ -0,0 +1,208 @@
+# app/utils/aviation_vectorized.py
+"""Array versions of the aviation calculators.
+
+Each function accepts scalars or array-likes for every input, broadcasts them
+together, validates with boolean masks instead of raising on the first bad
+value, and computes every row in one NumPy pass. Results are columnar: a dict
+mapping each output name (the same keys the scalar calculators return) to an
+ndarray, plus an ``error`` object array holding the validation message for
+each rejected row (None for valid rows). Numeric outputs of rejected rows are
+NaN.
+"""
+import numpy as np
+
+
+def as_float_array(values):
+    """Coerce a scalar or flat sequence to float64, mapping unparseable entries to NaN"""
+    if isinstance(values, (list, tuple)):
+        return np.array([_to_float(v) for v in values], dtype=np.float64)
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    return np.float64(_to_float(values))
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _broadcast(*columns):
+    try:
+        return np.broadcast_arrays(*(np.atleast_1d(as_float_array(c)) for c in columns))
+    except ValueError:
+        raise ValueError("Input columns must have the same length or be scalars") from None
+
+
+def _validate(inputs, rules):
+    """Return (invalid mask, error messages) for ``rules`` of (bad mask, message).
+
+    Rules are listed in the order the scalar calculators check them, so each
+    row reports the same message the scalar function would have raised.
+    """
+    shape = inputs[0].shape
+    nonfinite = np.zeros(shape, dtype=bool)
+    for column in inputs:
+        nonfinite |= ~np.isfinite(column)
+    rules = [(nonfinite, "Inputs must be finite numbers")] + rules
+
+    invalid = np.zeros(shape, dtype=bool)
+    error = np.full(shape, None, dtype=object)
+    for bad, message in reversed(rules):
+        error[bad] = message
+        invalid |= bad
+    return invalid, error
+
+
+def _finish(columns, invalid, error, decimals):
+    result = {}
+    for name, column in columns.items():
+        if decimals is not None:
+            column = np.round(column, decimals)
+        result[name] = np.where(invalid, np.nan, column)
+    result['error'] = error
+    return result
+
+
+def _wind_components(wind_speed, wind_direction, heading):
+    # Relative wind angle; wind direction is the FROM direction
+    angle_rad = np.radians(np.mod(wind_direction - heading, 360))
+    return wind_speed * np.cos(angle_rad), wind_speed * np.sin(angle_rad)
+
+
+def calculate_fuel_requirements_batch(distance, indicated_airspeed, fuel_consumption,
+                                      wind_speed=0, wind_direction=0, heading=0,
+                                      reserve_time=45, decimals=2):
+    """Array version of ``calculate_fuel_requirements``.
+
+    Returns columns ``ground_speed``, ``flight_time`` (minutes),
+    ``fuel_required``, ``reserve_fuel`` and ``error``.
+    """
+    inputs = _broadcast(distance, indicated_airspeed, fuel_consumption,
+                        wind_speed, wind_direction, heading, reserve_time)
+    distance, ias, consumption, wind_speed, wind_direction, heading, reserve_time = inputs
+    with np.errstate(invalid='ignore'):
+        invalid, error = _validate(inputs, [
+            (distance <= 0, "Distance must be greater than zero"),
+            (ias <= 0, "Indicated airspeed must be greater than zero"),
+            (consumption <= 0, "Fuel consumption must be greater than zero"),
+            (wind_speed < 0, "Wind speed cannot be negative"),
+            ((wind_direction < 0) | (wind_direction > 360), "Wind direction must be between 0 and 360 degrees"),
+            ((heading < 0) | (heading > 360), "Heading must be between 0 and 360 degrees"),
+            (reserve_time < 0, "Reserve time cannot be negative"),
+        ])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        headwind, _ = _wind_components(wind_speed, wind_direction, heading)
+        ground_speed = np.maximum(1.0, ias - headwind)  # ensure not below 1 kt
+        flight_time = distance / ground_speed
+        reserve_fuel = (reserve_time / 60) * consumption
+        total_fuel = flight_time * consumption + reserve_fuel
+
+    return _finish({
+        'ground_speed': ground_speed,
+        'flight_time': flight_time * 60,
+        'fuel_required': total_fuel,
+        'reserve_fuel': reserve_fuel,
+    }, invalid, error, decimals)
+
+
+def calculate_ground_speed_batch(indicated_airspeed, wind_speed, wind_direction, heading,
+                                 temperature, pressure_altitude=0, decimals=2):
+    """Array version of ``calculate_ground_speed``.
+
+    Returns columns ``ground_speed``, ``density_altitude``,
+    ``headwind_component``, ``crosswind_component`` and ``error``.
+    """
+    inputs = _broadcast(indicated_airspeed, wind_speed, wind_direction, heading,
+                        temperature, pressure_altitude)
+    ias, wind_speed, wind_direction, heading, temperature, pressure_altitude = inputs
+    with np.errstate(invalid='ignore'):
+        invalid, error = _validate(inputs, [
+            (ias <= 0, "Indicated airspeed must be greater than zero"),
+            (wind_speed < 0, "Wind speed cannot be negative"),
+            ((wind_direction < 0) | (wind_direction > 360), "Wind direction must be between 0 and 360 degrees"),
+            ((heading < 0) | (heading > 360), "Heading must be between 0 and 360 degrees"),
+        ])
+
+    with np.errstate(invalid='ignore'):
+        standard_temp = 15 - (pressure_altitude / 1000) * 2
+        density_alt = pressure_altitude + 120 * (temperature - standard_temp)
+        # Approximate TAS from IAS: ~2% per 1000 ft
+        tas = ias * (1 + 0.02 * (pressure_altitude / 1000.0))
+        headwind, crosswind = _wind_components(wind_speed, wind_direction, heading)
+        ground_speed = np.maximum(1.0, tas - headwind)
+
+    return _finish({
+        'ground_speed': ground_speed,
+        'density_altitude': density_alt,
+        'headwind_component': headwind,
+        'crosswind_component': crosswind,
+    }, invalid, error, decimals)
+
+
+def calculate_density_altitude_batch(pressure_altitude, temperature, decimals=2):
+    """Array version of ``calculate_density_altitude``.
+
+    Returns columns ``density_altitude`` and ``error``.
+    """
+    inputs = _broadcast(pressure_altitude, temperature)
+    pressure_altitude, temperature = inputs
+    with np.errstate(invalid='ignore'):
+        invalid, error = _validate(inputs, [
+            (pressure_altitude < 0, "Pressure altitude cannot be negative"),
+        ])
+        standard_temp = 15 - (pressure_altitude / 1000) * 2
+        density_alt = pressure_altitude + 120 * (temperature - standard_temp)
+
+    return _finish({'density_altitude': density_alt}, invalid, error, decimals)
+
+
+def calculate_crosswind_batch(wind_speed, wind_angle, decimals=2):
+    """Array version of ``calculate_crosswind``.
+
+    Returns columns ``crosswind``, ``headwind`` and ``error``.
+    """
+    inputs = _broadcast(wind_speed, wind_angle)
+    wind_speed, wind_angle = inputs
+    invalid, error = _validate(inputs, [])
+    with np.errstate(invalid='ignore'):
+        angle_rad = np.radians(wind_angle)
+        crosswind = wind_speed * np.sin(angle_rad)
+        headwind = wind_speed * np.cos(angle_rad)
+
+    return _finish({'crosswind': crosswind, 'headwind': headwind}, invalid, error, decimals)
+
+
+# Batch endpoint calculation id -> (function, [(request field, argument, default)])
+# A default of None marks the field as required.
+BATCH_CALCULATIONS = {
+    'fuel': (calculate_fuel_requirements_batch, [
+        ('distance', 'distance', None),
+        ('indicatedAirspeed', 'indicated_airspeed', None),
+        ('fuelConsumption', 'fuel_consumption', None),
+        ('windSpeed', 'wind_speed', 0),
+        ('windDirection', 'wind_direction', 0),
+        ('heading', 'heading', 0),
+        ('reserveTime', 'reserve_time', None),
+    ]),
+    'ground-speed': (calculate_ground_speed_batch, [
+        ('indicatedAirspeed', 'indicated_airspeed', None),
+        ('windSpeed', 'wind_speed', None),
+        ('windDirection', 'wind_direction', None),
+        ('heading', 'heading', None),
+        ('temperature', 'temperature', None),
+        ('pressureAltitude', 'pressure_altitude', 0),
+    ]),
+    'density-altitude': (calculate_density_altitude_batch, [
+        ('pressureAltitude', 'pressure_altitude', None),
+        ('temperature', 'temperature', None),
+    ]),
+    'crosswind': (calculate_crosswind_batch, [
+        ('windSpeed', 'wind_speed', None),
+        ('windAngle', 'wind_angle', None),
+    ]),
+}
@@ -0,0 +1,37 @@
+# app/utils/build_version.py
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+
+class BuildVersion(NamedTuple):
+    version: str             # Short sha256 of the templates and Python sources
+    last_modified: datetime  # Newest mtime among them, as an aware datetime
+
+
+def compute_build_version(app) -> BuildVersion:
+    """Fingerprint the code and templates that rendered pages depend on.
+
+    Combined with the data version in page ETags and cache keys, so a deploy
+    that only changes templates or code still invalidates cached HTML.
+    """
+    digest = hashlib.sha256()
+    newest = 0.0
+    template_folder = os.path.join(app.root_path, app.template_folder or 'templates')
+    for dirpath, dirnames, filenames in os.walk(app.root_path):
+        dirnames[:] = sorted(d for d in dirnames if d != '__pycache__')
+        in_templates = os.path.commonpath([dirpath, template_folder]) == template_folder
+        for name in sorted(filenames):
+            if not (in_templates or name.endswith('.py')):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                content = f.read()
+            digest.update(os.path.relpath(path, app.root_path).encode('utf-8') + b'\0')
+            digest.update(hashlib.sha256(content).digest())
+            newest = max(newest, os.path.getmtime(path))
+    return BuildVersion(
+        digest.hexdigest()[:16],
+        datetime.fromtimestamp(newest, tz=timezone.utc).replace(microsecond=0),
+    )
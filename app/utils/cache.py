@@ -0,0 +1,62 @@
+# app/utils/cache.py
+import sys
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Small thread-safe, size-bounded LRU mapping.
+
+    Used for memoising rendered pages and other derived data that is cheap to
+    keep in memory but expensive to rebuild per request. With ``max_bytes``
+    the values' total ``sizeof`` is bounded too; a value larger than the whole
+    budget is not stored.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=None, sizeof=sys.getsizeof):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        size = 0 if self.max_bytes is None else self.sizeof(value)
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self._data.pop(key, None)
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if size:
+                self._sizes[key] = size
+                self.nbytes += size
+            while len(self._data) > self.maxsize or \
+                    (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                evicted, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted, 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
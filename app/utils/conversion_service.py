@@ -0,0 +1,66 @@
+# app/utils/conversion_service.py
+"""The one implementation behind every single-value conversion endpoint.
+
+``/api/convert`` and ``/convert/api/convert`` both hand their parsed JSON body
+to ``convert_request`` and return whatever it gives back, so validation and
+error messages cannot drift between them. Formatting lives in
+``app.utils.formatting``.
+"""
+import math
+
+from app.utils.formatting import format_number
+from app.utils.unit_converter import get_unit_registry
+
+# Error payloads are built once and shared; they are only ever serialised,
+# never mutated.
+NO_DATA = ({'success': False, 'error': 'No data provided'}, 400)
+MISSING_FIELDS = ({'success': False, 'error': 'Missing required fields'}, 400)
+INVALID_VALUE = ({'success': False, 'error': 'Invalid value provided'}, 400)
+INVALID_CONVERSION = ({'success': False, 'error': 'Invalid conversion'}, 400)
+
+
+def convert_request(data, registry=None):
+    """Validate and run one conversion request.
+
+    Args:
+        data: the decoded JSON body, ``{"category", "fromUnit", "toUnit", "value"}``
+            plus an optional ``locale`` (e.g. ``"de"``) for the formatted result
+        registry: UnitRegistry to convert with (defaults to the current app's)
+
+    Returns:
+        ``(payload, status)`` ready for ``jsonify``
+    """
+    if not data or data.__class__ is not dict:
+        return NO_DATA
+    # Direct lookups; a missing field is the rare case, so no per-call lists
+    try:
+        category = data['category']
+        from_unit = data['fromUnit']
+        to_unit = data['toUnit']
+        value = data['value']
+    except KeyError:
+        return MISSING_FIELDS
+
+    if value.__class__ is not float and value.__class__ is not int:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return INVALID_VALUE
+    try:
+        if not math.isfinite(value):
+            return INVALID_VALUE
+    except OverflowError:  # ints too large for a float
+        return INVALID_VALUE
+
+    if registry is None:
+        registry = get_unit_registry()
+    result = registry.convert_value(category, from_unit, to_unit, value)
+    if result is None:
+        return INVALID_CONVERSION
+    if not math.isfinite(result):
+        return INVALID_VALUE
+
+    locale = data.get('locale')
+    if locale.__class__ is not str:
+        locale = None
+    return {'success': True, 'result': result, 'formatted': format_number(result, locale)}, 200
@@ -0,0 +1,173 @@
+# app/utils/data_snapshot.py
+"""Versioned binary snapshot of the files under ``static/data/``.
+
+``flask build-snapshot`` parses ``units.json``, every per-category detailed
+table and ``timezones.json`` once. It also compiles the conversion engine, the
+unit search index and the timezone index, then pickles the lot into a single
+file. At startup the app unpickles the prebuilt objects instead of parsing
+JSON and rebuilding indexes.
+
+The snapshot records the sha256 of every source file, and its header carries
+a fingerprint of the modules whose objects it pickles. It is only used when
+both still match, so neither an edited data file nor a code change can be
+shadowed by a stale snapshot; the JSON loaders remain the fallback. The
+snapshot is a local build artifact and is trusted like any other code in the
+slug.
+"""
+import functools
+import hashlib
+import json
+import os
+import pickle
+import struct
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from flask import current_app
+
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_MAGIC = b'AUDS'
+HEADER = struct.Struct('<4sI16s')  # magic, format version, code fingerprint
+# Modules (in app/utils) defining the pickled objects or how they are built
+CODE_MODULES = ('data_snapshot.py', 'unit_converter.py', 'search_index.py', 'timezones.py')
+UNITS_FILE = 'units.json'
+TIMEZONES_FILE = 'timezones.json'
+
+# (snapshot path, data dir) -> DataSnapshot, or None when missing or stale
+_loaded = {}
+
+
+class DataSnapshot:
+    """Everything derived from the data files, ready to use.
+
+    ``version`` is a short hash over all source hashes, so it changes whenever
+    any data file does. ``data_version`` is the short hash of ``units.json``
+    alone, matching ``UnitRegistry.data_version``.
+    """
+
+    def __init__(self, sources, units_data, engine, search_index,
+                 detailed_tables, timezone_index):
+        self.sources = sources                  # file name -> sha256 hex digest
+        self.units_data = units_data
+        self.engine = engine                    # ConversionEngine
+        self.search_index = search_index        # UnitSearchIndex
+        self.detailed_tables = detailed_tables  # category id -> list of tables
+        self.timezone_index = timezone_index    # TimezoneIndex
+        self.version = snapshot_version(sources)
+        self.data_version = sources[UNITS_FILE][:16]
+        self.mtimes = {}                        # file name -> st_mtime_ns when validated
+
+    def modified(self, name):
+        """mtime of a source file as an aware datetime, as seen when the snapshot was loaded"""
+        return datetime.fromtimestamp(self.mtimes[name] / 1e9, tz=timezone.utc).replace(microsecond=0)
+
+
+def snapshot_version(sources: Dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(f"{name}:{sources[name]}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=1)
+def code_fingerprint() -> bytes:
+    """Hash of the CODE_MODULES sources; a snapshot built by other code is stale"""
+    digest = hashlib.sha256()
+    utils_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in CODE_MODULES:
+        digest.update(name.encode('utf-8') + b'\0' + _read(utils_dir, name))
+    return digest.digest()[:16]
+
+
+def _read(data_dir, name):
+    with open(os.path.join(data_dir, name), 'rb') as f:
+        return f.read()
+
+
+def build_snapshot(data_dir: str) -> DataSnapshot:
+    """Parse and index every data file in ``data_dir``"""
+    # Imported here: unit_converter itself loads snapshots
+    from app.utils.search_index import UnitSearchIndex
+    from app.utils.timezones import TimezoneIndex
+    from app.utils.unit_converter import ConversionEngine
+
+    sources = {}
+
+    def load(name):
+        raw = _read(data_dir, name)
+        sources[name] = hashlib.sha256(raw).hexdigest()
+        return json.loads(raw)
+
+    units_data = load(UNITS_FILE)
+    detailed_tables = {}
+    for category_id in units_data.get('categories', {}):
+        name = category_id + '.json'
+        if os.path.exists(os.path.join(data_dir, name)):
+            detailed_tables[category_id] = load(name)
+    timezone_index = TimezoneIndex(load(TIMEZONES_FILE))
+
+    return DataSnapshot(sources, units_data, ConversionEngine(units_data),
+                        UnitSearchIndex(units_data), detailed_tables, timezone_index)
+
+
+def write_snapshot(snapshot: DataSnapshot, path: str) -> int:
+    """Write a snapshot atomically; returns its size in bytes"""
+    payload = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, code_fingerprint()) + \
+        pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(temp_path, path)
+    return len(payload)
+
+
+def load_snapshot(path: str, data_dir: str) -> Optional[DataSnapshot]:
+    """Unpickle a snapshot, or return None if it is missing, from another
+    format version or code, or no longer matches the files in ``data_dir``
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or \
+                    HEADER.unpack(header) != (SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, code_fingerprint()):
+                return None
+            snapshot = pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    for name, digest in snapshot.sources.items():
+        try:
+            raw = _read(data_dir, name)
+            mtime = os.stat(os.path.join(data_dir, name)).st_mtime_ns
+        except OSError:
+            return None
+        if hashlib.sha256(raw).hexdigest() != digest:
+            return None
+        snapshot.mtimes[name] = mtime
+    return snapshot
+
+
+def get_snapshot(app=None) -> Optional[DataSnapshot]:
+    """An app's snapshot (the current app by default), loaded once per process,
+    or None to fall back to JSON
+    """
+    if app is None:
+        app = current_app
+    path = app.config.get('DATA_SNAPSHOT_PATH')
+    if not path:
+        return None
+    data_dir = os.path.join(app.static_folder, 'data')
+    key = (path, data_dir)
+    if key not in _loaded:
+        snapshot = load_snapshot(path, data_dir)
+        if snapshot is None and os.path.exists(path):
+            app.logger.warning("Ignoring data snapshot %s: it does not match %s", path, data_dir)
+        _loaded[key] = snapshot
+    return _loaded[key]
+
+
+def reset_snapshot_cache():
+    """Forget loaded snapshots so the next ``get_snapshot`` reads the file again"""
+    _loaded.clear()
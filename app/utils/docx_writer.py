@@ -0,0 +1,199 @@
+# app/utils/docx_writer.py
+import io
+
+import lxml.html
+from docx import Document
+from docx.shared import Pt
+
+MONOSPACE_FONT = 'Courier New'
+BLOCK_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'pre', 'blockquote',
+              'table', 'hr', 'div', 'dl', 'dt', 'dd'}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+# Inline tag -> formatting flag it turns on for its runs
+INLINE_FORMATS = {
+    'strong': 'bold', 'b': 'bold',
+    'em': 'italic', 'i': 'italic',
+    'code': 'code', 'kbd': 'code', 'samp': 'code',
+    'del': 'strike', 's': 'strike',
+    'sup': 'superscript', 'sub': 'subscript',
+    'a': 'underline', 'u': 'underline', 'ins': 'underline',
+}
+
+
+class DocxWriter:
+    """Build a python-docx Document from rendered Markdown in a single tree walk.
+
+    The Markdown HTML is parsed once with lxml and every element is visited
+    exactly once, so headings, paragraphs, lists, code, quotes and tables keep
+    their document order.
+    """
+
+    def __init__(self):
+        self.document = Document()
+
+    def write_html(self, html: str) -> None:
+        if not html.strip():
+            return
+        root = lxml.html.fragment_fromstring(html, create_parent='div')
+        self._blocks(root, list_depth=0, style=None)
+
+    def save(self) -> io.BytesIO:
+        output = io.BytesIO()
+        self.document.save(output)
+        output.seek(0)
+        return output
+
+    # -- Block level --------------------------------------------------------
+
+    def _blocks(self, parent, list_depth, style):
+        """Write the children of a block container, wrapping loose inline content"""
+        paragraph = None
+        if parent.text and parent.text.strip():
+            paragraph = self.document.add_paragraph(style=style)
+            self._text(paragraph, parent.text, {})
+        for child in parent:
+            if not isinstance(child.tag, str):
+                continue  # comments
+            if child.tag in BLOCK_TAGS:
+                self._block(child, list_depth, style)
+                paragraph = None
+            else:
+                if paragraph is None:
+                    paragraph = self.document.add_paragraph(style=style)
+                self._inline(paragraph, child, {})
+            if child.tail and child.tail.strip():
+                if paragraph is None:
+                    paragraph = self.document.add_paragraph(style=style)
+                self._text(paragraph, child.tail, {})
+
+    def _block(self, element, list_depth, style):
+        tag = element.tag
+        if tag in HEADING_TAGS:
+            heading = self.document.add_heading(level=HEADING_TAGS[tag])
+            self._inline_children(heading, element, {})
+        elif tag == 'p':
+            paragraph = self.document.add_paragraph(style=style)
+            self._inline_children(paragraph, element, {})
+        elif tag in ('ul', 'ol'):
+            self._list(element, list_depth + 1)
+        elif tag == 'pre':
+            self._preformatted(element)
+        elif tag == 'blockquote':
+            self._blocks(element, list_depth, 'Quote')
+        elif tag == 'table':
+            self._table(element)
+        elif tag == 'hr':
+            self.document.add_paragraph()
+        elif tag == 'dt':
+            paragraph = self.document.add_paragraph(style=style)
+            self._inline_children(paragraph, element, {'bold': True})
+        elif tag == 'dd':
+            self._blocks(element, list_depth, 'List Continue')
+        else:
+            # div (e.g. codehilite wrappers), dl and other containers
+            self._blocks(element, list_depth, style)
+
+    def _list(self, element, depth):
+        base = 'List Number' if element.tag == 'ol' else 'List Bullet'
+        style = base if depth == 1 else f"{base} {min(depth, 3)}"
+        for item in element:
+            if item.tag != 'li':
+                continue
+            paragraph = self.document.add_paragraph(style=style)
+            # Loose items start with the newline before their first <p>
+            if item.text and item.text.strip():
+                self._text(paragraph, item.text.lstrip(), {})
+            for child in item:
+                if not isinstance(child.tag, str):
+                    pass
+                elif child.tag in ('ul', 'ol'):
+                    self._list(child, depth + 1)
+                elif child.tag == 'p':
+                    # Loose lists wrap item text in <p>
+                    self._inline_children(paragraph, child, {})
+                elif child.tag in BLOCK_TAGS:
+                    self._block(child, depth, None)
+                else:
+                    self._inline(paragraph, child, {})
+                if child.tail and child.tail.strip():
+                    self._text(paragraph, child.tail, {})
+
+    def _preformatted(self, element):
+        paragraph = self.document.add_paragraph()
+        lines = element.text_content().rstrip('\n').split('\n')
+        run = paragraph.add_run()
+        run.font.name = MONOSPACE_FONT
+        run.font.size = Pt(9)
+        for i, line in enumerate(lines):
+            if i:
+                run.add_break()
+            run.add_text(line)
+
+    def _table(self, element):
+        rows = [row for row in element.iter('tr')]
+        if not rows:
+            return
+        width = max(len([c for c in row if c.tag in ('td', 'th')]) for row in rows)
+        if width == 0:
+            return
+        table = self.document.add_table(rows=len(rows), cols=width)
+        table.style = 'Table Grid'
+        for r, row in enumerate(rows):
+            cells = [c for c in row if c.tag in ('td', 'th')]
+            for c, cell in enumerate(cells):
+                paragraph = table.cell(r, c).paragraphs[0]
+                self._inline_children(paragraph, cell, {'bold': cell.tag == 'th'})
+
+    # -- Inline level -------------------------------------------------------
+
+    def _inline_children(self, paragraph, element, formats):
+        if element.text:
+            self._text(paragraph, element.text, formats)
+        for child in element:
+            if isinstance(child.tag, str):
+                self._inline(paragraph, child, formats)
+            if child.tail:
+                self._text(paragraph, child.tail, formats)
+
+    def _inline(self, paragraph, element, formats):
+        tag = element.tag
+        if tag == 'br':
+            paragraph.add_run().add_break()
+            return
+        if tag == 'img':
+            alt = element.get('alt') or element.get('src', '')
+            if alt:
+                self._text(paragraph, alt, dict(formats, italic=True))
+            return
+        flag = INLINE_FORMATS.get(tag)
+        if flag:
+            formats = dict(formats, **{flag: True})
+        self._inline_children(paragraph, element, formats)
+
+    def _text(self, paragraph, text, formats):
+        text = ' '.join(text.split('\n')) if not formats.get('code') else text
+        if not text:
+            return
+        run = paragraph.add_run(text)
+        if formats.get('bold'):
+            run.bold = True
+        if formats.get('italic'):
+            run.italic = True
+        if formats.get('underline'):
+            run.underline = True
+        if formats.get('strike'):
+            run.font.strike = True
+        if formats.get('superscript'):
+            run.font.superscript = True
+        if formats.get('subscript'):
+            run.font.subscript = True
+        if formats.get('code'):
+            run.font.name = MONOSPACE_FONT
+
+
+def html_to_docx(html: str) -> io.BytesIO:
+    """Convert rendered Markdown HTML to a DOCX file held in memory"""
+    writer = DocxWriter()
+    writer.write_html(html)
+    return writer.save()
@@ -0,0 +1,331 @@
+# app/utils/export_jobs.py
+"""Background jobs for large Markdown exports.
+
+``ExportQueue`` runs export builds on a small thread pool. Clients poll a job
+id for progress and then fetch the file. Jobs are keyed by a hash of their
+format and source text. Submitting a document that is already queued, running
+or finished returns the existing job, so a popular document is converted
+once per TTL.
+
+Job state and results live in a backend:
+
+- ``MemoryBackend`` keeps them in this process, within a byte budget for
+  results. Polls must reach the same process, so it suits a single worker or
+  the ASGI server.
+- ``RedisBackend`` keeps them in Redis (or anything speaking its protocol and
+  Lua scripting), so any worker can answer a poll. It needs the optional
+  ``redis`` package, and its memory is bounded by the server's ``maxmemory``.
+  Builds still run in the process that accepted the job.
+
+Each process runs at most ``max_pending`` queued or running jobs; further
+submissions raise QueueFull. Every write renews the entry's TTL. Finished
+jobs and their files expire ``ttl`` seconds after completion, and abandoned
+jobs expire ``ttl`` seconds after their last progress update.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class QueueFull(RuntimeError):
+    """Raised when an ExportQueue already has its maximum of pending jobs"""
+
+
+class Job:
+    """State of one export; results are stored separately in the backend"""
+
+    def __init__(self, job_id, kind, content_hash, state=QUEUED, progress=0.0,
+                 created_at=None, finished_at=None, error=None):
+        self.id = job_id
+        self.kind = kind
+        self.content_hash = content_hash
+        self.state = state
+        self.progress = progress
+        self.created_at = time.time() if created_at is None else created_at
+        self.finished_at = finished_at
+        self.error = error
+
+    def to_dict(self):
+        return {
+            'jobId': self.id,
+            'format': self.kind,
+            'status': self.state,
+            'progress': round(self.progress, 3),
+            'createdAt': self.created_at,
+            'finishedAt': self.finished_at,
+            'error': self.error,
+        }
+
+    def dumps(self):
+        return json.dumps({**self.to_dict(), 'contentHash': self.content_hash})
+
+    @classmethod
+    def loads(cls, raw):
+        data = json.loads(raw)
+        return cls(data['jobId'], data['format'], data['contentHash'], data['status'], data['progress'],
+                   data['createdAt'], data['finishedAt'], data['error'])
+
+
+def content_hash(kind, text):
+    return hashlib.sha256(kind.encode('utf-8') + b'\0' + text.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    """Jobs and results in process memory, expired lazily on access.
+
+    Stored results never exceed ``max_bytes`` in total: the oldest are evicted,
+    with their jobs, to make room, and a result larger than the whole budget
+    fails its job instead.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._jobs = {}      # job id -> (Job, expires_at)
+        self._results = {}   # job id -> bytes, oldest first
+        self._result_bytes = 0
+        self._by_hash = {}   # content hash -> job id
+
+    def _drop(self, job_id):
+        job = self._jobs.pop(job_id)[0]
+        data = self._results.pop(job_id, None)
+        if data is not None:
+            self._result_bytes -= len(data)
+        if self._by_hash.get(job.content_hash) == job_id:
+            del self._by_hash[job.content_hash]
+
+    def _purge(self, now):
+        for job_id, (job, expires_at) in list(self._jobs.items()):
+            if expires_at <= now:
+                self._drop(job_id)
+
+    def claim(self, job, ttl):
+        """Store ``job`` unless a live job has the same hash; returns (job, created)"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            existing_id = self._by_hash.get(job.content_hash)
+            if existing_id is not None:
+                existing = self._jobs[existing_id][0]
+                if existing.state != FAILED:
+                    return _copy(existing), False
+            self._jobs[job.id] = (_copy(job), now + ttl)
+            self._by_hash[job.content_hash] = job.id
+            return job, True
+
+    def find(self, content_hash):
+        """The live, unfailed job for a content hash, or None"""
+        with self._lock:
+            self._purge(time.monotonic())
+            job_id = self._by_hash.get(content_hash)
+            job = self._jobs[job_id][0] if job_id is not None else None
+            return _copy(job) if job is not None and job.state != FAILED else None
+
+    def save(self, job, ttl):
+        with self._lock:
+            self._jobs[job.id] = (_copy(job), time.monotonic() + ttl)
+
+    def save_result(self, job, data, ttl):
+        with self._lock:
+            job = _copy(job)
+            if len(data) > self.max_bytes:
+                job.state, job.error = FAILED, 'Export is too large to keep'
+            else:
+                while self._result_bytes + len(data) > self.max_bytes:
+                    self._drop(next(iter(self._results)))
+                self._results[job.id] = data
+                self._result_bytes += len(data)
+            self._jobs[job.id] = (job, time.monotonic() + ttl)
+
+    def get(self, job_id):
+        with self._lock:
+            self._purge(time.monotonic())
+            entry = self._jobs.get(job_id)
+            return _copy(entry[0]) if entry else None
+
+    def result(self, job_id):
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._results.get(job_id)
+
+
+def _copy(job):
+    # Callers mutate their Job while a worker updates its own; never share one
+    return Job(job.id, job.kind, job.content_hash, job.state, job.progress,
+               job.created_at, job.finished_at, job.error)
+
+
+# Atomically return the live job holding a content hash, or store a new job
+# and point the hash at it. KEYS: hash key, new job key. ARGV: new job id,
+# new job JSON, ttl, job key prefix.
+CLAIM_SCRIPT = """
+local existing_id = redis.call('GET', KEYS[1])
+if existing_id then
+    local raw = redis.call('GET', ARGV[4] .. existing_id)
+    if raw and cjson.decode(raw)['status'] ~= 'failed' then
+        return raw
+    end
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return false
+"""
+
+
+class RedisBackend:
+    """Jobs and results in Redis, shared by every worker using the same URL"""
+
+    def __init__(self, url, prefix='anyunit:export:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("EXPORT_JOBS_REDIS_URL is set but the redis package is not installed") from e
+        self._redis = redis.Redis.from_url(url)
+        self._claim = self._redis.register_script(CLAIM_SCRIPT)
+        self.prefix = prefix
+
+    def _key(self, kind, name):
+        return f"{self.prefix}{kind}:{name}"
+
+    def claim(self, job, ttl):
+        """Check the hash and store the job in one script, so concurrent workers never both build"""
+        existing = self._claim(keys=[self._key('hash', job.content_hash), self._key('job', job.id)],
+                               args=[job.id, job.dumps(), ttl, self._key('job', '')])
+        if existing is not None:
+            return Job.loads(existing), False
+        return job, True
+
+    def find(self, content_hash):
+        job_id = self._redis.get(self._key('hash', content_hash))
+        job = self.get(job_id.decode()) if job_id else None
+        return job if job is not None and job.state != FAILED else None
+
+    def save(self, job, ttl):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key('job', job.id), job.dumps(), ex=ttl)
+        pipe.expire(self._key('hash', job.content_hash), ttl)
+        pipe.execute()
+
+    def save_result(self, job, data, ttl):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key('result', job.id), data, ex=ttl)
+        pipe.set(self._key('job', job.id), job.dumps(), ex=ttl)
+        pipe.expire(self._key('hash', job.content_hash), ttl)
+        pipe.execute()
+
+    def get(self, job_id):
+        raw = self._redis.get(self._key('job', job_id))
+        return Job.loads(raw) if raw else None
+
+    def result(self, job_id):
+        return self._redis.get(self._key('result', job_id))
+
+
+class ExportQueue:
+    """Runs export builds on a thread pool, deduplicated by content hash.
+
+    Args:
+        backend: MemoryBackend or RedisBackend holding job state and results
+        workers: build threads in this process
+        ttl: seconds a job and its result are kept after the last update
+        max_pending: queued or running jobs in this process before QueueFull
+    """
+
+    def __init__(self, backend, workers=2, ttl=600, max_pending=32):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export-job')
+
+    def submit(self, kind, text, build):
+        """Queue ``build(progress) -> bytes`` for ``text`` unless an equal job exists.
+
+        ``progress`` takes a fraction between 0 and 1. Returns (job, created).
+        Raises QueueFull when a new job would exceed ``max_pending``; existing
+        jobs for the same text are still returned.
+        """
+        with self._pending_lock:
+            if self.pending >= self.max_pending:
+                full = True
+            else:
+                full = False
+                self.pending += 1
+        job = Job(uuid.uuid4().hex, kind, content_hash(kind, text))
+        if full:
+            # Still answer with an equal job that exists; never start a new one
+            existing = self.backend.find(job.content_hash)
+            if existing is None:
+                raise QueueFull(f"{self.max_pending} export jobs pending")
+            return existing, False
+        try:
+            job, created = self.backend.claim(job, self.ttl)
+        except Exception:
+            self._release()
+            raise
+        if created:
+            self._pool.submit(self._run, _copy(job), build)
+        else:
+            self._release()
+        return job, created
+
+    def _release(self):
+        with self._pending_lock:
+            self.pending -= 1
+
+    def _run(self, job, build):
+        try:
+            self._build(job, build)
+        finally:
+            self._release()
+
+    def _build(self, job, build):
+        job.state = RUNNING
+        self.backend.save(job, self.ttl)
+
+        def progress(fraction):
+            job.progress = min(max(float(fraction), 0.0), 1.0)
+            self.backend.save(job, self.ttl)
+
+        try:
+            data = build(progress)
+        except Exception as e:
+            job.state, job.error, job.finished_at = FAILED, str(e), time.time()
+            self.backend.save(job, self.ttl)
+            return
+        job.state, job.progress, job.finished_at = DONE, 1.0, time.time()
+        self.backend.save_result(job, data, self.ttl)
+
+    def get(self, job_id):
+        return self.backend.get(job_id)
+
+    def result(self, job_id):
+        return self.backend.result(job_id)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+def create_export_queue(config):
+    """ExportQueue for an app config, or None when background exports are off.
+
+    Jobs use Redis when EXPORT_JOBS_REDIS_URL is set. Otherwise they stay in
+    process memory, but only if EXPORT_JOBS_LOCAL says a single process serves
+    every poll; with neither, exports stay synchronous.
+    """
+    url = config.get('EXPORT_JOBS_REDIS_URL')
+    if url:
+        backend = RedisBackend(url)
+    elif config.get('EXPORT_JOBS_LOCAL', False):
+        backend = MemoryBackend(max_bytes=config.get('EXPORT_RESULT_MAX_BYTES', 256 * 1024 * 1024))
+    else:
+        return None
+    return ExportQueue(backend, workers=config.get('EXPORT_JOB_WORKERS', 2),
+                       ttl=config.get('EXPORT_JOB_TTL', 600),
+                       max_pending=config.get('EXPORT_JOB_MAX_PENDING', 32))
@@ -0,0 +1,207 @@
+# app/utils/flight_plan.py
+"""Multi-leg flight plan fuel and time engine.
+
+A plan is an ordered list of legs, each with its own distance, true course,
+winds aloft, true airspeed and fuel flow. Every leg is solved with the wind
+triangle (wind correction angle, heading and ground speed) and cumulative
+distance, time and fuel are carried forward in a single pass.
+"""
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+EARTH_RADIUS_NM = 3440.065
+
+
+@lru_cache(maxsize=4096)
+def _relative_wind(wind_direction: float, course: float):
+    """sin and cos of the wind angle off the course, cached per (wind, course) pair"""
+    beta = math.radians((wind_direction - course) % 360)
+    return math.sin(beta), math.cos(beta)
+
+
+def solve_wind_triangle(true_airspeed: float, course: float,
+                        wind_speed: float, wind_direction: float) -> Dict[str, float]:
+    """Wind correction angle, heading and ground speed for one course.
+
+    Wind direction is the direction the wind blows FROM. Raises ValueError when
+    the crosswind exceeds the airspeed, so the course cannot be held.
+    """
+    sin_beta, cos_beta = _relative_wind(wind_direction, course)
+    ratio = wind_speed / true_airspeed * sin_beta
+    if abs(ratio) > 1:
+        raise ValueError("Crosswind exceeds true airspeed; course is untrackable")
+    wca = math.asin(ratio)
+    ground_speed = true_airspeed * math.cos(wca) - wind_speed * cos_beta
+    if ground_speed <= 0:
+        raise ValueError("Headwind exceeds true airspeed; ground speed is not positive")
+    return {
+        'wind_correction_angle': math.degrees(wca),
+        'heading': (course + math.degrees(wca)) % 360,
+        'ground_speed': ground_speed,
+    }
+
+
+def legs_from_waypoints(waypoints: List[Dict]) -> List[Dict]:
+    """Turn an ordered list of waypoints into legs using great-circle geometry.
+
+    Each waypoint needs ``lat`` and ``lon`` in degrees. Leg settings (winds,
+    airspeed, fuel flow) are taken from the waypoint that ends the leg, so the
+    first waypoint only marks the departure point.
+    """
+    if len(waypoints) < 2:
+        raise ValueError("At least two waypoints are required")
+    points = []
+    for i, waypoint in enumerate(waypoints):
+        try:
+            lat, lon = float(waypoint['lat']), float(waypoint['lon'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Waypoint {i}: lat and lon are required") from None
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Waypoint {i}: lat/lon out of range")
+        points.append((math.radians(lat), math.radians(lon)))
+
+    legs = []
+    for i in range(1, len(waypoints)):
+        (lat1, lon1), (lat2, lon2) = points[i - 1], points[i]
+        start, end = waypoints[i - 1], waypoints[i]
+        dlon = lon2 - lon1
+        # Haversine distance and initial great-circle course
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+        distance = 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(h)))
+        course = math.degrees(math.atan2(
+            math.sin(dlon) * math.cos(lat2),
+            math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(dlon)
+        )) % 360
+        leg = {k: v for k, v in end.items() if k not in ('lat', 'lon', 'name')}
+        leg.update(distance=distance, course=course,
+                   name=f"{start.get('name', i - 1)}-{end.get('name', i)}")
+        legs.append(leg)
+    return legs
+
+
+def _leg_value(leg, key, default, index):
+    value = leg.get(key, default)
+    if value is None:
+        raise ValueError(f"Leg {index}: {key} is required")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Leg {index}: {key} must be a number") from None
+    if not math.isfinite(value):
+        raise ValueError(f"Leg {index}: {key} must be a finite number")
+    return value
+
+
+def calculate_flight_plan(
+    legs: List[Dict],
+    true_airspeed: Optional[float] = None,
+    fuel_flow: Optional[float] = None,
+    reserve_time: float = 45,
+    contingency_percent: float = 0,
+    taxi_fuel: float = 0,
+    fuel_on_board: Optional[float] = None
+) -> Dict:
+    """
+    Calculate time and fuel for an ordered list of legs
+
+    Args:
+        legs: Leg dicts with ``distance`` (nm), ``course`` (°T), optional
+            ``wind_speed`` (kt), ``wind_direction`` (°, FROM), ``true_airspeed``
+            (kt), ``fuel_flow`` (gal/h) and ``name``
+        true_airspeed: Default true airspeed for legs that do not set one
+        fuel_flow: Default fuel flow for legs that do not set one
+        reserve_time: Final reserve in minutes, burned at the last leg's fuel flow
+        contingency_percent: Contingency fuel as a percentage of trip fuel
+        taxi_fuel: Fuel used before departure, in gallons
+        fuel_on_board: Optional fuel at engine start; adds per-leg fuel remaining
+
+    Returns:
+        Dictionary with per-leg results (including cumulative totals) and plan totals
+    """
+    if not legs:
+        raise ValueError("At least one leg is required")
+    for name, value in (('Reserve time', reserve_time), ('Contingency percentage', contingency_percent),
+                        ('Taxi fuel', taxi_fuel), ('Fuel on board', fuel_on_board)):
+        # NaN slips past the range checks below and is not valid JSON
+        if value is not None and not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+    if reserve_time < 0:
+        raise ValueError("Reserve time cannot be negative")
+    if contingency_percent < 0:
+        raise ValueError("Contingency percentage cannot be negative")
+    if taxi_fuel < 0:
+        raise ValueError("Taxi fuel cannot be negative")
+
+    results = []
+    total_distance = total_time = trip_fuel = 0.0
+    remaining = None if fuel_on_board is None else fuel_on_board - taxi_fuel
+    for index, leg in enumerate(legs):
+        if not isinstance(leg, dict):
+            raise ValueError(f"Leg {index}: must be an object")
+        distance = _leg_value(leg, 'distance', None, index)
+        course = _leg_value(leg, 'course', None, index)
+        tas = _leg_value(leg, 'true_airspeed', true_airspeed, index)
+        flow = _leg_value(leg, 'fuel_flow', fuel_flow, index)
+        wind_speed = _leg_value(leg, 'wind_speed', 0, index)
+        wind_direction = _leg_value(leg, 'wind_direction', 0, index)
+        if distance <= 0:
+            raise ValueError(f"Leg {index}: distance must be greater than zero")
+        if not 0 <= course <= 360:
+            raise ValueError(f"Leg {index}: course must be between 0 and 360 degrees")
+        if tas <= 0:
+            raise ValueError(f"Leg {index}: true airspeed must be greater than zero")
+        if flow <= 0:
+            raise ValueError(f"Leg {index}: fuel flow must be greater than zero")
+        if wind_speed < 0:
+            raise ValueError(f"Leg {index}: wind speed cannot be negative")
+        if not 0 <= wind_direction <= 360:
+            raise ValueError(f"Leg {index}: wind direction must be between 0 and 360 degrees")
+
+        try:
+            triangle = solve_wind_triangle(tas, course, wind_speed, wind_direction)
+        except ValueError as e:
+            raise ValueError(f"Leg {index}: {e}") from None
+
+        hours = distance / triangle['ground_speed']
+        fuel = hours * flow
+        total_distance += distance
+        total_time += hours
+        trip_fuel += fuel
+
+        result = {
+            'index': index,
+            'name': leg.get('name'),
+            'distance': round(distance, 2),
+            'course': round(course, 2),
+            'heading': round(triangle['heading'], 2),
+            'wind_correction_angle': round(triangle['wind_correction_angle'], 2),
+            'ground_speed': round(triangle['ground_speed'], 2),
+            'time': round(hours * 60, 2),
+            'fuel': round(fuel, 2),
+            'cumulative_distance': round(total_distance, 2),
+            'cumulative_time': round(total_time * 60, 2),
+            'cumulative_fuel': round(trip_fuel, 2),
+        }
+        if remaining is not None:
+            remaining -= fuel
+            result['fuel_remaining'] = round(remaining, 2)
+        results.append(result)
+
+    reserve_fuel = (reserve_time / 60) * flow
+    contingency_fuel = trip_fuel * contingency_percent / 100
+    total_fuel = taxi_fuel + trip_fuel + contingency_fuel + reserve_fuel
+    totals = {
+        'distance': round(total_distance, 2),
+        'time': round(total_time * 60, 2),
+        'trip_fuel': round(trip_fuel, 2),
+        'contingency_fuel': round(contingency_fuel, 2),
+        'reserve_fuel': round(reserve_fuel, 2),
+        'taxi_fuel': round(taxi_fuel, 2),
+        'total_fuel': round(total_fuel, 2),
+    }
+    if fuel_on_board is not None:
+        totals['extra_fuel'] = round(fuel_on_board - total_fuel, 2)
+        totals['sufficient_fuel'] = fuel_on_board >= total_fuel
+
+    return {'legs': results, 'totals': totals}
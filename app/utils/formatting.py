@@ -0,0 +1,100 @@
+# app/utils/formatting.py
+"""Number formatting for conversion results and tables.
+
+``format_number`` produces the site's canonical display string: up to six
+decimal places with trailing zeros removed, and scientific notation outside
+[1e-6, 1e6). Plain ints and floats take a fast path with no type coercion or
+exception handling; integral values skip float formatting entirely. Passing a
+``locale`` applies that locale's decimal and grouping separators to the
+canonical string, so the default path never pays for localisation.
+"""
+from typing import Optional, Tuple
+
+# locale -> (decimal separator, group separator); looked up by full tag, then language
+LOCALE_SEPARATORS = {
+    'en': ('.', ','),
+    'ja': ('.', ','),
+    'zh': ('.', ','),
+    'ko': ('.', ','),
+    'he': ('.', ','),
+    'th': ('.', ','),
+    'de': (',', '.'),
+    'es': (',', '.'),
+    'it': (',', '.'),
+    'nl': (',', '.'),
+    'pt': (',', '.'),
+    'pt-br': (',', '.'),
+    'id': (',', '.'),
+    'tr': (',', '.'),
+    'da': (',', '.'),
+    'el': (',', '.'),
+    'de-ch': ('.', '’'),
+    'fr': (',', ' '),
+    'fr-ch': (',', ' '),
+    'ru': (',', ' '),
+    'uk': (',', ' '),
+    'pl': (',', ' '),
+    'cs': (',', ' '),
+    'sk': (',', ' '),
+    'sv': (',', ' '),
+    'fi': (',', ' '),
+    'nb': (',', ' '),
+    'hu': (',', ' '),
+}
+
+
+def format_number(value, locale: Optional[str] = None) -> str:
+    """Format number for display, optionally with locale separators"""
+    cls = value.__class__
+    if cls is float or cls is int:
+        magnitude = abs(value)
+        if magnitude >= 1e6 or (magnitude < 1e-6 and value != 0):
+            text = f"{value:.6e}"
+        elif cls is int:
+            text = str(value)
+        elif value and value.is_integer():
+            text = str(int(value))
+        else:
+            text = f"{value:.6f}".rstrip('0').rstrip('.')
+    else:
+        text = _format_other(value)
+    if locale is None:
+        return text
+    return localize_number(text, locale)
+
+
+def _format_other(value):
+    """Slow path for None, numeric strings and other number types"""
+    if value is None:
+        return "0"
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return "0"
+    return format_number(value)
+
+
+def locale_separators(locale: str) -> Tuple[str, str]:
+    """Decimal and group separators for a locale tag like ``de`` or ``pt-BR``"""
+    tag = locale.replace('_', '-').lower()
+    separators = LOCALE_SEPARATORS.get(tag)
+    if separators is None:
+        separators = LOCALE_SEPARATORS.get(tag.split('-', 1)[0], LOCALE_SEPARATORS['en'])
+    return separators
+
+
+def localize_number(text: str, locale: str) -> str:
+    """Apply a locale's separators to a string produced by ``format_number``"""
+    decimal, group = locale_separators(locale)
+    if 'e' in text or text[-1] in 'fn':  # scientific notation, inf, nan
+        return text.replace('.', decimal)
+    sign = ''
+    if text[0] == '-':
+        sign, text = '-', text[1:]
+    integer, _, fraction = text.partition('.')
+    if len(integer) > 3:
+        head = len(integer) % 3 or 3
+        integer = integer[:head] + ''.join(
+            group + integer[i:i + 3] for i in range(head, len(integer), 3)
+        )
+    return sign + integer + (decimal + fraction if fraction else '')
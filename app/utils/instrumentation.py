@@ -0,0 +1,221 @@
+# app/utils/instrumentation.py
+"""Opt-in request timing, named spans, Server-Timing headers and /metrics.
+
+With ``INSTRUMENTATION_ENABLED`` off, ``init_instrumentation`` registers
+nothing. ``span()`` then returns a shared no-op context manager, and
+``traced`` functions make one extra call and one global check. When it is on,
+each app gets a ``Metrics`` registry in ``app.extensions['metrics']``, with:
+
+- a latency histogram per endpoint and method, and a request counter per status;
+- a duration histogram per span name (templates are timed through Flask's
+  template signals, other hot paths through ``span``/``traced``);
+- a ``Server-Timing`` header summing each span's time in the request;
+- ``GET /metrics`` in the Prometheus text format.
+
+Metrics are per process; with several gunicorn workers each one reports its own.
+"""
+import contextlib
+import functools
+import threading
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request, template_rendered
+from flask.signals import before_render_template
+
+# Upper bounds in seconds, the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_NULL_SPAN = contextlib.nullcontext()
+# True once any app has enabled instrumentation; spans are free until then
+_enabled = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers hold the registry lock"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+
+class Metrics:
+    """Request and span metrics for one app, safe to update from any thread"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.request_durations = {}  # (endpoint, method) -> Histogram
+        self.request_counts = {}     # (endpoint, method, status) -> int
+        self.span_durations = {}     # span name -> Histogram
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe_request(self, endpoint, method, status, seconds):
+        with self._lock:
+            self._histogram(self.request_durations, (endpoint, method)).observe(seconds)
+            key = (endpoint, method, status)
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def observe_span(self, name, seconds):
+        with self._lock:
+            self._histogram(self.span_durations, name).observe(seconds)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += _histogram_lines('anyunit_request_duration_seconds', 'Request latency by endpoint.',
+                                      ('endpoint', 'method'), self.request_durations)
+            lines += ['# HELP anyunit_requests_total Requests by endpoint and status.',
+                      '# TYPE anyunit_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.request_counts.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f'anyunit_requests_total{{{labels}}} {count}')
+            lines += _histogram_lines('anyunit_span_duration_seconds', 'Time spent in named spans.',
+                                      ('span',), {(name,): h for name, h in self.span_durations.items()})
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(name, help_text, label_names, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for key, histogram in sorted(histograms.items()):
+        labels = _labels(**dict(zip(label_names, key)))
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+def _record(name, seconds):
+    """Add a finished span to the app's metrics and the request's Server-Timing"""
+    if not has_app_context():
+        return
+    metrics = current_app.extensions.get('metrics')
+    if metrics is None:
+        return
+    metrics.observe_span(name, seconds)
+    if has_request_context():
+        timings = g.setdefault('server_timing', {})
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.name, time.perf_counter() - self.start)
+
+
+def span(name):
+    """Context manager timing a block as ``name`` when instrumentation is on"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def traced(name):
+    """Decorator timing every call of a function as the span ``name``"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def server_timing_header(timings):
+    return ', '.join(f'{_server_timing_name(name)};dur={seconds * 1000:.2f}' for name, seconds in timings.items())
+
+
+def _server_timing_name(name):
+    # Server-Timing metric names are HTTP tokens
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+
+
+def _before_request():
+    g.request_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    current_app.extensions['metrics'].observe_request(
+        request.endpoint or 'unmatched', request.method, response.status_code, elapsed
+    )
+    timings = g.pop('server_timing', {})
+    timings['total'] = elapsed
+    response.headers.add('Server-Timing', server_timing_header(timings))
+    return response
+
+
+def _template_started(sender, template, context, **extra):
+    g.setdefault('template_starts', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = g.get('template_starts')
+    if starts:
+        _record('render_template', time.perf_counter() - starts.pop())
+
+
+def metrics_view():
+    return current_app.extensions['metrics'].render(), 200, {'Content-Type': PROMETHEUS_CONTENT_TYPE}
+
+
+def init_instrumentation(app):
+    """Register request timing, template spans and /metrics if INSTRUMENTATION_ENABLED"""
+    global _enabled
+    if not app.config.get('INSTRUMENTATION_ENABLED', False):
+        return
+    _enabled = True
+    app.extensions['metrics'] = Metrics()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
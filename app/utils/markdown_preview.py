@@ -0,0 +1,209 @@
+# app/utils/markdown_preview.py
+import re
+import threading
+
+from app.utils.cache import LRUCache
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+LIST_ITEM_RE = re.compile(r'^ {0,3}([*+-]|\d+[.)])\s')
+# Constructs whose meaning spans the whole document: reference link
+# definitions, footnotes, abbreviations and raw HTML blocks. Documents using
+# any of them are rendered as a single block so output matches a full render.
+GLOBAL_CONSTRUCT_RE = re.compile(r'^ {0,3}(\[[^\]]+\]:|\*\[[^\]]+\]:|<)', re.MULTILINE)
+
+
+class RevisionMismatch(Exception):
+    """Raised when an edit is based on a revision the server no longer holds"""
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when a document's source plus HTML would exceed its size limit"""
+
+
+def split_blocks(lines):
+    """Split Markdown source lines into independently renderable top-level blocks.
+
+    Blocks are separated by blank lines. Fenced code keeps its blank lines, and
+    anything that may continue the previous block (indented lines, further list
+    items, blockquote lines, definition-list bodies) is merged into it, so each
+    block renders exactly as it would inside the whole document.
+    """
+    text = '\n'.join(lines)
+    if GLOBAL_CONSTRUCT_RE.search(text):
+        return [text] if text.strip() else []
+
+    blocks = []
+    current = []
+    blank_run = []
+    fence = None
+    for line in lines:
+        if fence:
+            current.append(line)
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped.strip(fence[0]) == '':
+                fence = None
+            continue
+
+        if not line.strip():
+            if current:
+                blank_run.append(line)
+            continue
+
+        if current and blank_run and not _continues(current, line):
+            blocks.append('\n'.join(current))
+            current = []
+        elif current:
+            current.extend(blank_run)
+        blank_run = []
+        current.append(line)
+
+        match = FENCE_RE.match(line)
+        if match:
+            fence = match.group(1)
+
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def _continues(block_lines, line):
+    """Whether a line after a blank line still belongs to the previous block"""
+    if line[0] in ' \t' or line.startswith(':'):
+        return True
+    first = block_lines[0]
+    if line.startswith('>') and first.lstrip().startswith('>'):
+        return True
+    return bool(LIST_ITEM_RE.match(line) and LIST_ITEM_RE.match(first))
+
+
+def _lines_size(lines):
+    return sum(len(line) + 1 for line in lines)
+
+
+class PreviewDocument:
+    """Server-side copy of one live-preview document and its rendered blocks.
+
+    ``size`` counts the characters of the source lines and rendered HTML;
+    a load or edit that would take it past ``max_size`` raises
+    DocumentTooLarge and leaves the document as it was.
+    """
+
+    def __init__(self, renderer, max_size=None):
+        self.renderer = renderer
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.revision = 0
+        self.lines = []
+        self.blocks = []
+        self.html = []
+        self.size = 0
+
+    def _check_size(self, size):
+        if self.max_size is not None and size > self.max_size:
+            raise DocumentTooLarge(f'Document is too large to preview '
+                                   f'(limit {self.max_size} characters of source and HTML)')
+
+    def load(self, text):
+        """Replace the whole document and return the HTML of every block"""
+        with self.lock:
+            lines = text.split('\n')
+            lines_size = _lines_size(lines)
+            self._check_size(lines_size)
+            blocks = split_blocks(lines)
+            html = [self.renderer.pool.convert(block) for block in blocks]
+            size = lines_size + sum(len(block) for block in html)
+            self._check_size(size)
+            self.lines, self.blocks, self.html, self.size = lines, blocks, html, size
+            self.revision += 1
+            return {'revision': self.revision, 'blocks': list(self.html)}
+
+    def apply(self, revision, start, end, new_lines):
+        """Replace ``lines[start:end]`` and return the block-level HTML patch.
+
+        The patch removes ``deleteCount`` rendered blocks at ``start`` and
+        inserts ``html`` in their place; only those blocks are re-rendered.
+        Nothing changes unless the edit renders and fits within ``max_size``.
+        """
+        with self.lock:
+            if revision != self.revision:
+                raise RevisionMismatch(revision)
+            if not 0 <= start <= end <= len(self.lines):
+                raise ValueError('Edit range is outside the document')
+            lines = self.lines[:start] + new_lines + self.lines[end:]
+            lines_size = _lines_size(lines)
+            self._check_size(lines_size)
+            blocks = split_blocks(lines)
+            prefix, delete_count, rendered = self._diff(blocks)
+            html = self.html[:prefix] + rendered + self.html[prefix + delete_count:]
+            size = lines_size + sum(len(block) for block in html)
+            self._check_size(size)
+
+            self.lines, self.blocks, self.html, self.size = lines, blocks, html, size
+            self.revision += 1
+            patch = {'start': prefix, 'deleteCount': delete_count, 'html': rendered}
+            return {'revision': self.revision, 'patch': patch, 'blockCount': len(self.blocks)}
+
+    def _diff(self, blocks):
+        """Render the blocks that differ from the current ones.
+
+        Returns ``(start, delete_count, html)`` without changing the document.
+        """
+        old = self.blocks
+        limit = min(len(old), len(blocks))
+        prefix = 0
+        while prefix < limit and old[prefix] == blocks[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == blocks[-1 - suffix]:
+            suffix += 1
+
+        changed = blocks[prefix:len(blocks) - suffix]
+        rendered = [self.renderer.pool.convert(block) for block in changed]
+        return prefix, len(old) - suffix - prefix, rendered
+
+
+class PreviewStore:
+    """Bounded set of live-preview documents keyed by client document id.
+
+    Documents live in process memory. Under several gunicorn workers an edit
+    that reaches a worker without the document gets a 409 and a full resync,
+    so incremental updates only pay off with one worker, ``asgi:app`` or
+    routing that keeps a client on the same worker.
+
+    Besides the document count, the documents' total ``size`` is bounded by
+    ``max_bytes`` and each one by ``max_document_bytes`` (both counted in
+    characters); least recently used documents are evicted first.
+    """
+
+    def __init__(self, renderer, maxsize=128, max_bytes=None, max_document_bytes=None):
+        self.renderer = renderer
+        self.max_document_bytes = max_document_bytes
+        self._documents = LRUCache(maxsize, max_bytes=max_bytes, sizeof=lambda document: document.size)
+        self._lock = threading.Lock()
+
+    def get(self, document_id):
+        return self._documents.get(document_id)
+
+    def open(self, document_id):
+        with self._lock:
+            document = self._documents.get(document_id)
+            if document is None:
+                document = PreviewDocument(self.renderer, self.max_document_bytes)
+                self._documents.set(document_id, document)
+            return document
+
+    def load(self, document_id, text):
+        """Load a document's full text; see PreviewDocument.load"""
+        document = self.open(document_id)
+        result = document.load(text)
+        self._documents.set(document_id, document)  # re-measure its size
+        return result
+
+    def apply(self, document_id, revision, start, end, new_lines):
+        """Apply an edit to a known document, or return None if it is not held"""
+        document = self.get(document_id)
+        if document is None:
+            return None
+        result = document.apply(revision, start, end, new_lines)
+        self._documents.set(document_id, document)  # re-measure its size
+        return result
@@ -0,0 +1,71 @@
+# app/utils/markdown_renderer.py
+import hashlib
+import queue
+from contextlib import contextmanager
+
+import markdown
+
+from app.utils.cache import LRUCache
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'tables']
+
+
+class MarkdownPool:
+    """Pool of pre-configured ``markdown.Markdown`` instances.
+
+    Building a Markdown instance loads every extension and its processors, so
+    instances are created once and reused. A ``Markdown`` object is not safe to
+    share between threads while converting; each caller borrows one for the
+    duration of a conversion and it is reset before going back in the pool.
+    """
+
+    def __init__(self, extensions=None, size=8):
+        self.extensions = list(extensions or MARKDOWN_EXTENSIONS)
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _create(self):
+        return markdown.Markdown(extensions=self.extensions)
+
+    @contextmanager
+    def acquire(self):
+        try:
+            md = self._idle.get_nowait()
+        except queue.Empty:
+            md = self._create()
+        try:
+            yield md
+        finally:
+            md.reset()
+            try:
+                self._idle.put_nowait(md)
+            except queue.Full:
+                pass  # more concurrent callers than pool slots; let it go
+
+    def convert(self, text):
+        with self.acquire() as md:
+            return md.convert(text)
+
+
+class MarkdownRenderer:
+    """Render Markdown to HTML through a pool, memoising by content hash.
+
+    The HTML cache is bounded by entry count and by ``cache_max_bytes``, so a
+    few very large documents cannot pin an unbounded amount of memory.
+    """
+
+    def __init__(self, cache_size=256, pool_size=8, extensions=None, cache_max_bytes=32 * 1024 * 1024):
+        self.pool = MarkdownPool(extensions, pool_size)
+        self.cache = LRUCache(cache_size, max_bytes=cache_max_bytes)
+
+    @staticmethod
+    def content_key(text):
+        return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def render(self, text):
+        key = self.content_key(text)
+        html = self.cache.get(key)
+        if html is None:
+            html = self.pool.convert(text)
+            self.cache.set(key, html)
+        return html
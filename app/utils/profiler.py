@@ -0,0 +1,208 @@
+# app/utils/profiler.py
+"""Low-overhead sampling profiler for a running worker.
+
+``StackSampler`` records the Python stack many times a second for a fixed
+number of seconds and counts identical stacks. The result is exported in the
+collapsed-stack format (``outer;inner;leaf count``), which flamegraph.pl,
+speedscope and inferno read directly. Every stack is also attributed to the
+blueprint whose view module it passes through, so a profile shows at a glance
+whether converter, markdown or aviation code is hot.
+
+Two sampling modes:
+
+- ``signal``: ``ITIMER_PROF`` delivers ``SIGPROF`` per ``interval`` of CPU time
+  and the handler records the interrupted frame. It needs the main thread,
+  which is where gunicorn's sync workers run requests, and samples only while
+  the process is burning CPU. A wall-clock timer disarms the itimer at the
+  deadline, so an idle worker is not left with it armed.
+- ``thread``: a daemon thread wakes every ``interval`` and records every other
+  thread's stack from ``sys._current_frames()``. It is used for threaded
+  workers, or when another handler already owns ``SIGPROF``.
+
+Neither mode takes a lock that request code could be holding, so sampling can
+never block a request thread. The recording cost is one stack walk per sample.
+"""
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+DEFAULT_INTERVAL = 0.01
+MAX_DEPTH = 128
+UNATTRIBUTED = '(none)'
+
+
+class SamplerBusy(RuntimeError):
+    """Raised when starting a sampler that is already running"""
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Collects stack samples for one profiling run at a time.
+
+    Args:
+        module_blueprints: view module name -> blueprint name, used to attribute
+            each stack to the outermost blueprint view it passes through
+        max_depth: innermost frames kept per stack
+    """
+
+    def __init__(self, module_blueprints: Optional[Dict[str, str]] = None, max_depth: int = MAX_DEPTH):
+        self.module_blueprints = dict(module_blueprints or {})
+        self.max_depth = max_depth
+        self.stacks = Counter()         # tuple of frame labels, outermost first -> samples
+        self.blueprints = Counter()     # blueprint name -> samples
+        self.mode = None
+        self.interval = None
+        self.seconds = None
+        self.started_at = None
+        self.finished_at = None
+        self._deadline = None
+        self._running = False
+        self._previous_handler = None
+        self._timer = None
+        self._run_id = 0
+        # Only start() takes this, and never blocking: the signal handler may
+        # run stop() on a thread that is inside start() or stop() already
+        self._start_lock = threading.Lock()
+
+    @property
+    def running(self):
+        if self._running and time.monotonic() >= self._deadline:
+            self.stop()
+        return self._running
+
+    def start(self, seconds: float, interval: float = DEFAULT_INTERVAL, mode: Optional[str] = None):
+        """Begin sampling for ``seconds``; returns immediately.
+
+        ``mode`` is ``'signal'``, ``'thread'`` or None to pick ``signal`` when
+        possible. Raises SamplerBusy if a run is in progress.
+        """
+        if not self._start_lock.acquire(blocking=False):
+            raise SamplerBusy("A profile is already starting")
+        try:
+            self._start(seconds, interval, mode)
+        finally:
+            self._start_lock.release()
+
+    def _start(self, seconds, interval, mode):
+        if self.running:
+            raise SamplerBusy("A profile is already running")
+        if mode is None:
+            mode = 'signal' if self._can_use_signal() else 'thread'
+        elif mode == 'signal' and not self._can_use_signal():
+            raise ValueError("Signal sampling needs the main thread and a free SIGPROF handler")
+        elif mode not in ('signal', 'thread'):
+            raise ValueError(f"Unknown sampling mode: {mode}")
+
+        self.stacks = Counter()
+        self.blueprints = Counter()
+        self.mode, self.interval, self.seconds = mode, interval, seconds
+        self.started_at, self.finished_at = time.time(), None
+        self._deadline = time.monotonic() + seconds
+        self._run_id += 1
+        self._running = True
+        if mode == 'signal':
+            previous = signal.signal(signal.SIGPROF, self._handle_signal)
+            if previous != self._handle_signal:
+                self._previous_handler = previous
+            signal.setitimer(signal.ITIMER_PROF, interval, interval)
+            # SIGPROF only fires while the process uses CPU, so the handler
+            # alone cannot be relied on to notice the deadline
+            self._timer = threading.Timer(seconds, self._expire, args=(self._run_id,))
+            self._timer.daemon = True
+            self._timer.start()
+        else:
+            threading.Thread(target=self._sample_threads, args=(self._run_id,),
+                             name='stack-sampler', daemon=True).start()
+
+    def stop(self):
+        """End the run early or after its deadline; safe to call from any thread"""
+        if not self._running:
+            return
+        self._running = False
+        self.finished_at = time.time()
+        if self.mode == 'signal':
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            if self._timer is not None:
+                self._timer.cancel()
+            try:
+                signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+            except ValueError:
+                pass  # Not the main thread; the handler stays installed but is inert
+
+    def _can_use_signal(self):
+        if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+            return False
+        # Our own handler is left installed when a run ended off the main thread
+        return signal.getsignal(signal.SIGPROF) in (signal.SIG_DFL, signal.SIG_IGN, None, self._handle_signal)
+
+    def _expire(self, run_id):
+        if self._running and self._run_id == run_id:
+            self.stop()
+
+    def _handle_signal(self, signum, frame):
+        if not self._running:
+            return
+        if time.monotonic() >= self._deadline:
+            self.stop()
+            return
+        self._record(frame)
+
+    def _sample_threads(self, run_id):
+        own_id = threading.get_ident()
+        # A newer run supersedes this thread even if it is still asleep
+        while self._running and self._run_id == run_id:
+            if time.monotonic() >= self._deadline:
+                self.stop()
+                break
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame):
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        labels.reverse()
+        stack = tuple(labels)
+        self.stacks[stack] += 1
+        self.blueprints[self._blueprint_for(stack)] += 1
+
+    def _blueprint_for(self, stack):
+        for label in stack:
+            blueprint = self.module_blueprints.get(label.partition(':')[0])
+            if blueprint is not None:
+                return blueprint
+        return UNATTRIBUTED
+
+    def collapsed(self, blueprint: Optional[str] = None) -> str:
+        """Samples as collapsed stacks, optionally only those attributed to ``blueprint``"""
+        lines = []
+        for stack, count in sorted(dict(self.stacks).items()):
+            if blueprint is not None and self._blueprint_for(stack) != blueprint:
+                continue
+            lines.append(f"{';'.join(stack)} {count}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def summary(self) -> Dict:
+        running = self.running
+        stacks = dict(self.stacks)
+        return {
+            'state': 'running' if running else ('finished' if self.started_at else 'idle'),
+            'mode': self.mode,
+            'seconds': self.seconds,
+            'interval': self.interval,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'samples': sum(stacks.values()),
+            'distinct_stacks': len(stacks),
+            'blueprints': dict(sorted(dict(self.blueprints).items(), key=lambda item: -item[1])),
+        }
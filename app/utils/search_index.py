@@ -0,0 +1,135 @@
+# app/utils/search_index.py
+import re
+from typing import Dict, List
+
+# Scores for each kind of match; a unit's rank is its best match plus a small
+# bonus for popular units.
+EXACT_SCORE = 100
+PREFIX_SCORE = 60
+WORD_PREFIX_SCORE = 40
+TRIGRAM_SCORE = 30
+POPULAR_BONUS = 5
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(_WORD_RE.sub(' ', text.lower()).split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def conversion_path(category_id: str, from_unit: str, to_unit: str) -> str:
+    return f"/convert/{category_id}/{from_unit}-to-{to_unit}"
+
+
+class UnitSearchIndex:
+    """Prebuilt search index over unit names, symbols, ids and category titles.
+
+    Built once from units.json. Lookups are dictionary hits on exact terms,
+    term and word prefixes, with a trigram fallback for misspellings.
+    """
+
+    def __init__(self, units_data: Dict):
+        self.docs = []           # doc id -> result dict
+        self._exact = {}         # term -> {doc id}
+        self._prefix = {}        # prefix of a whole term -> {doc id}
+        self._word_prefix = {}   # prefix of any word in a term -> {doc id}
+        self._trigram = {}       # trigram -> {doc id}
+        self._popular = {}       # category id -> [{title, url, from, to}]
+
+        for cat_id, category in units_data.get('categories', {}).items():
+            units = category.get('units', {})
+            self._popular[cat_id] = [
+                {
+                    'title': f"{units[conv['from']]['name']} to {units[conv['to']]['name']}",
+                    'url': conversion_path(cat_id, conv['from'], conv['to']),
+                    'from': conv['from'],
+                    'to': conv['to'],
+                }
+                for conv in category.get('popular_conversions', [])
+            ]
+            for unit_id, unit in units.items():
+                doc_id = len(self.docs)
+                self.docs.append({
+                    'id': unit_id,
+                    'name': unit['name'],
+                    'symbol': unit.get('symbol', unit_id),
+                    'category': category['title'],
+                    'category_id': cat_id,
+                    'popular': bool(unit.get('popular', False)),
+                    'url': conversion_path(cat_id, unit_id, self._default_target(unit_id, units)),
+                })
+                terms = {_normalize(t) for t in (unit['name'], unit.get('symbol', ''), unit_id,
+                                                 category['title'], cat_id)}
+                terms.discard('')
+                self._add_terms(doc_id, terms)
+
+    @staticmethod
+    def _default_target(unit_id: str, units: Dict) -> str:
+        """Pick the unit a search result links to: a popular one if possible"""
+        others = [u for u in units if u != unit_id]
+        for other in others:
+            if units[other].get('popular', False):
+                return other
+        return others[0] if others else unit_id
+
+    def _add_terms(self, doc_id: int, terms: set) -> None:
+        for term in terms:
+            self._exact.setdefault(term, set()).add(doc_id)
+            for i in range(1, len(term)):
+                self._prefix.setdefault(term[:i], set()).add(doc_id)
+            for word in term.split(' '):
+                for i in range(1, len(word) + 1):
+                    self._word_prefix.setdefault(word[:i], set()).add(doc_id)
+            for gram in _trigrams(term):
+                self._trigram.setdefault(gram, set()).add(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> Dict[str, List[Dict]]:
+        """Return ranked units and related popular conversions for a query"""
+        query = _normalize(query)
+        if not query:
+            return {'units': [], 'popularConversions': []}
+
+        scores = {}
+        for doc_id in self._exact.get(query, ()):
+            scores[doc_id] = EXACT_SCORE
+        for doc_id in self._prefix.get(query, ()):
+            scores.setdefault(doc_id, PREFIX_SCORE)
+        for doc_id in self._word_prefix.get(query, ()):
+            scores.setdefault(doc_id, WORD_PREFIX_SCORE)
+
+        if not scores and len(query) >= 3:
+            # Fuzzy fallback: share of the query's trigrams found in a unit's terms
+            query_grams = _trigrams(query)
+            hits = {}
+            for gram in query_grams:
+                for doc_id in self._trigram.get(gram, ()):
+                    hits[doc_id] = hits.get(doc_id, 0) + 1
+            for doc_id, shared in hits.items():
+                similarity = shared / len(query_grams)
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    scores[doc_id] = int(TRIGRAM_SCORE * similarity)
+
+        ranked = sorted(
+            scores,
+            key=lambda d: (-(scores[d] + (POPULAR_BONUS if self.docs[d]['popular'] else 0)),
+                           self.docs[d]['name'])
+        )[:limit]
+        units = [self.docs[d] for d in ranked]
+
+        conversions = []
+        seen = set()
+        matched = {(u['category_id'], u['id']) for u in units}
+        for cat_id in dict.fromkeys(u['category_id'] for u in units):
+            for conv in self._popular.get(cat_id, []):
+                if (cat_id, conv['from']) in matched or (cat_id, conv['to']) in matched:
+                    if conv['url'] not in seen:
+                        seen.add(conv['url'])
+                        conversions.append({'title': conv['title'], 'url': conv['url']})
+
+        return {'units': units, 'popularConversions': conversions[:limit]}
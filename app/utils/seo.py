@@ -2,6 +2,8 @@
 import json
 from typing import Optional, Dict
 
+from app.utils.instrumentation import traced
+
 
 def _absolute_url(base_url: str, path: str) -> str:
     base = base_url.rstrip('/')
@@ -69,6 +71,7 @@ def _json_ld_conversion(base_url: str, category: str, from_unit: str, to_unit: s
     return json.dumps(data)
 
 
+@traced('generate_meta_tags')
 def generate_meta_tags(category: Optional[str] = None,
                        from_unit: Optional[str] = None,
                        to_unit: Optional[str] = None,
@@ -0,0 +1,50 @@
+# app/utils/sitemap.py
+import gzip
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always served
+    brotli = None
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def render_urlset(urls: Iterable[Dict[str, str]]) -> str:
+    """Render a <urlset> sitemap from dicts with loc, changefreq and priority"""
+    items_xml = "".join([
+        f"<url><loc>{u['loc']}</loc><changefreq>{u['changefreq']}</changefreq>"
+        f"<priority>{u['priority']}</priority></url>" for u in urls
+    ])
+    return f"<?xml version='1.0' encoding='UTF-8'?>" \
+           f"<urlset xmlns='{SITEMAP_NS}'>{items_xml}</urlset>"
+
+
+def render_sitemap_index(locs: Iterable[str]) -> str:
+    """Render a <sitemapindex> pointing at child sitemaps"""
+    items_xml = "".join([f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs])
+    return f"<?xml version='1.0' encoding='UTF-8'?>" \
+           f"<sitemapindex xmlns='{SITEMAP_NS}'>{items_xml}</sitemapindex>"
+
+
+class CompressedDocument:
+    """A rendered document kept alongside its precompressed variants.
+
+    Compression happens once when the document is built; serving only picks
+    the variant the client accepts.
+    """
+
+    def __init__(self, text: str):
+        self.body = text.encode('utf-8')
+        self.gzip = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.brotli = brotli.compress(self.body) if brotli is not None else None
+        self.etag = hashlib.sha256(self.body).hexdigest()[:16]
+
+    def negotiate(self, accept_encodings) -> Tuple[bytes, Optional[str]]:
+        """Return (body, content_encoding) for a request's Accept-Encoding"""
+        if self.brotli is not None and accept_encodings['br']:
+            return self.brotli, 'br'
+        if accept_encodings['gzip']:
+            return self.gzip, 'gzip'
+        return self.body, None
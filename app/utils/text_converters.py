@@ -0,0 +1,632 @@
+# app/utils/text_converters.py
+"""Streaming JSON/CSV/XML converters for the text files tool.
+
+Every converter takes a seekable binary file object (an upload spooled by
+Werkzeug) and is a generator of output text chunks, so memory stays bounded
+by the size of a single record rather than the whole file. Conversions that
+need to know every CSV column up front read the input twice.
+
+Invalid input raises ConversionError. Two-pass conversions find every
+problem before the first chunk is yielded; single-pass ones only catch what
+precedes it, so callers should prime the generator before starting a
+response and accept that a late error ends the stream early.
+"""
+import codecs
+import csv
+import functools
+import json
+import re
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+CHUNK_SIZE = 64 * 1024
+# Largest single JSON array item, in characters; a syntax error is reported
+# once this much text fails to decode instead of reading on to the end
+MAX_ITEM_SIZE = 16 * 1024 * 1024
+# Largest JSON document, in bytes, that is parsed whole because it is not an
+# array (or a single-key object wrapping one)
+MAX_DOCUMENT_SIZE = 64 * 1024 * 1024
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_INT_RE = re.compile(r'-?\d+')
+_FLOAT_RE = re.compile(r'-?\d+\.\d+')
+_XML_NAME_INVALID = re.compile(r'[^\w.\-]')
+
+
+class ConversionError(ValueError):
+    """Input could not be converted; the message is safe to show to users"""
+
+
+class DocumentTooLarge(ConversionError):
+    """Input that has to be parsed whole is over MAX_DOCUMENT_SIZE"""
+
+
+class _NotStreamable(Exception):
+    """JSON document is not an array (or a single-key object wrapping one)"""
+
+
+def read_text(fp: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded UTF-8 text chunks from a binary stream without closing it"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        while True:
+            data = fp.read(chunk_size)
+            if not data:
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield tail
+                return
+            text = decoder.decode(data)
+            if text:
+                yield text
+    except UnicodeDecodeError as e:
+        raise ConversionError(f"Input is not valid UTF-8: {e}")
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Split text chunks into lines that keep their newline, for csv.reader"""
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+class JsonArrayReader:
+    """Incrementally read the items of a JSON array from text chunks.
+
+    Accepts a top-level array or an object with a single key whose value is
+    an array (``{"employees": [...]}``); ``root_key`` is that key or None.
+    Any other shape raises _NotStreamable.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self.root_key = None
+
+        char = self._peek()
+        if char == '[':
+            self._pos += 1
+        elif char == '{':
+            self._pos += 1
+            if self._peek() != '"':
+                raise _NotStreamable()
+            self.root_key = self._decode()
+            if self._peek() != ':':
+                raise ConversionError("Invalid JSON: expected ':' after object key")
+            self._pos += 1
+            if self._peek() != '[':
+                raise _NotStreamable()
+            self._pos += 1
+        elif char == '':
+            raise ConversionError("Invalid JSON: document is empty")
+        else:
+            raise _NotStreamable()
+
+    def _fill(self, min_pending: int = 0) -> bool:
+        """Read at least one chunk, and keep reading until ``min_pending``
+        unconsumed characters are buffered; False if nothing could be read"""
+        if self._eof:
+            return False
+        # Drop consumed text so the buffer only ever holds the current item
+        pieces = [self._buf[self._pos:]]
+        pending = len(pieces[0])
+        while True:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                break
+            pieces.append(chunk)
+            pending += len(chunk)
+            if pending >= min_pending:
+                break
+        if len(pieces) == 1:
+            return False
+        self._buf = ''.join(pieces)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, or '' at EOF"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                pending = len(self._buf) - self._pos
+                if pending > MAX_ITEM_SIZE:
+                    raise ConversionError(f"Invalid JSON: {e.msg} (or an array item over "
+                                          f"{MAX_ITEM_SIZE // (1024 * 1024)} MB)")
+                # Retry only once the pending text has doubled, so an item
+                # spanning many chunks is decoded O(log n) times, not per chunk
+                if self._fill(2 * pending):
+                    continue
+                raise ConversionError(f"Invalid JSON: {e.msg}")
+            # A value that runs to the end of the buffer (e.g. a number) may
+            # continue in the next chunk
+            if end < len(self._buf) or not self._fill():
+                self._pos = end
+                return value
+
+    def __iter__(self):
+        if self._peek() == ']':
+            self._pos += 1
+        else:
+            while True:
+                yield self._decode()
+                char = self._peek()
+                self._pos += 1
+                if char == ']':
+                    break
+                if char != ',':
+                    raise ConversionError("Invalid JSON: expected ',' or ']' in array")
+
+        if self.root_key is not None:
+            char = self._peek()
+            if char == ',':
+                raise _NotStreamable()
+            if char != '}':
+                raise ConversionError("Invalid JSON: expected '}' after array")
+            self._pos += 1
+        if self._peek() != '':
+            raise ConversionError("Invalid JSON: unexpected data after document")
+
+
+def _load_json(fp: IO[bytes]):
+    fp.seek(0, 2)
+    if fp.tell() > MAX_DOCUMENT_SIZE:
+        raise DocumentTooLarge(f"JSON that is not an array can be at most "
+                               f"{MAX_DOCUMENT_SIZE // (1024 * 1024)} MB")
+    fp.seek(0)
+    try:
+        return json.loads(''.join(read_text(fp)))
+    except json.JSONDecodeError as e:
+        raise ConversionError(f"Invalid JSON: {e.msg}")
+
+
+def _json_records(fp: IO[bytes], visit: Optional[Callable] = None):
+    """Validate a JSON upload in one streaming pass.
+
+    Returns (root_key, records, document): for streamable arrays ``records``
+    is a callable that re-reads the items from the start and ``document`` is
+    None; otherwise ``records`` is None and ``document`` is the parsed JSON.
+    ``visit`` is called with each item during the validation pass, including
+    items read before a document turns out not to be streamable.
+    """
+    fp.seek(0)
+    try:
+        reader = JsonArrayReader(read_text(fp))
+        for item in reader:
+            if visit is not None:
+                visit(item)
+    except _NotStreamable:
+        return None, None, _load_json(fp)
+
+    def records():
+        fp.seek(0)
+        return iter(JsonArrayReader(read_text(fp)))
+
+    return reader.root_key, records, None
+
+
+def _buffered(pieces: Iterable[str]) -> Iterator[str]:
+    """Coalesce many small strings into roughly CHUNK_SIZE chunks"""
+    buf = []
+    size = 0
+    for piece in pieces:
+        buf.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield ''.join(buf)
+
+
+def _scalar_text(value) -> str:
+    if value is None:
+        return ''
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _indent_json(value, indent: str) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + indent)
+
+
+# -- CSV output ---------------------------------------------------------------
+
+class _Pieces(list):
+    """List that csv.writer can write into"""
+    write = list.append
+
+
+def _csv_chunks(rows: Iterable[List[str]], header: Optional[List[str]] = None) -> Iterator[str]:
+    pieces = _Pieces()
+    writer = csv.writer(pieces, lineterminator='\n')
+    if header is not None:
+        writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if len(pieces) >= 1024:
+            yield ''.join(pieces)
+            pieces.clear()
+    if pieces:
+        yield ''.join(pieces)
+
+
+def _records_to_csv(records: Callable[[], Iterable], headers: Dict[str, None]) -> Iterator[str]:
+    """Write records as CSV; objects become rows under ``headers``, scalars single cells"""
+    if not headers:
+        rows = ([_scalar_text(item)] for item in records())
+        yield from _csv_chunks(rows)
+        return
+    columns = list(headers)
+    rows = (
+        [_scalar_text(item.get(column)) if isinstance(item, dict) else '' for column in columns]
+        for item in records()
+    )
+    yield from _csv_chunks(rows, header=columns)
+
+
+def _collect_headers(headers: Dict[str, None]) -> Callable:
+    def visit(item):
+        if isinstance(item, dict):
+            for key in item:
+                headers.setdefault(key, None)
+    return visit
+
+
+# -- XML output ---------------------------------------------------------------
+
+def _xml_name(name: str) -> str:
+    """Coerce a JSON key or CSV header into a valid XML element name"""
+    name = _XML_NAME_INVALID.sub('_', str(name)) or '_'
+    if not (name[0].isalpha() or name[0] == '_'):
+        name = '_' + name
+    return name
+
+
+def _singular(name: str) -> str:
+    return name[:-1] if len(name) > 1 and name.endswith('s') else name
+
+
+def _xml_text(value) -> str:
+    return escape(_scalar_text(value), {'"': '&quot;', "'": '&apos;'})
+
+
+def _to_xml(value, name: str, pieces: List[str]) -> None:
+    """Serialise a JSON value the way the browser converter does"""
+    tag = _xml_name(name)
+    if value is None:
+        pieces.append(f'<{tag}></{tag}>')
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                _to_xml(item, _singular(name), pieces)
+            else:
+                pieces.append(f'<{tag}>{_xml_text(item)}</{tag}>')
+    elif isinstance(value, dict):
+        pieces.append(f'<{tag}>')
+        for key, child in value.items():
+            _to_xml(child, key, pieces)
+        pieces.append(f'</{tag}>')
+    else:
+        pieces.append(f'<{tag}>{_xml_text(value)}</{tag}>')
+
+
+def _xml_records(records: Iterable, root: str, item: str) -> Iterator[str]:
+    """Wrap a stream of records in a single root element"""
+    root_tag = _xml_name(root)
+    yield XML_DECLARATION + f'<{root_tag}>'
+    for record in records:
+        pieces = []
+        _to_xml(record, item, pieces)
+        yield ''.join(pieces)
+    yield f'</{root_tag}>'
+
+
+# -- XML input ----------------------------------------------------------------
+
+def _local_name(tag: str) -> str:
+    return etree.QName(tag).localname if tag.startswith('{') else tag
+
+
+def _json_frame(element):
+    obj = {'@' + _local_name(name): value for name, value in element.attrib.items()}
+    texts = [element.text.strip()] if element.text and element.text.strip() else []
+    return element, iter(element), obj, texts
+
+
+def element_to_json(element) -> object:
+    """Convert an element to the JSON shape used by the browser converter.
+
+    The walk keeps its own stack, so arbitrarily deep documents (the parser
+    runs with ``huge_tree``) cannot exhaust the interpreter's recursion limit.
+    """
+    stack = [_json_frame(element)]
+    while True:
+        node, children, obj, texts = stack[-1]
+        for child in children:
+            if child.tail and child.tail.strip():
+                texts.append(child.tail.strip())
+            if isinstance(child.tag, str):  # skip comments and processing instructions
+                stack.append(_json_frame(child))
+                break
+        else:
+            stack.pop()
+            if texts:
+                text = ' '.join(texts)
+                value = text if not obj else {**obj, '#text': text}
+            else:
+                value = obj if obj else ''
+            if not stack:
+                return value
+            parent = stack[-1][2]
+            key = _local_name(node.tag)
+            if key in parent:
+                if not isinstance(parent[key], list):
+                    parent[key] = [parent[key]]
+                parent[key].append(value)
+            else:
+                parent[key] = value
+
+
+def _iter_xml(fp: IO[bytes]) -> Iterator[Tuple[str, object]]:
+    """Stream an XML document as events for its root and the root's children.
+
+    Yields ('root', element) once the root opens, ('child', element) for each
+    complete direct child of the root and ('end', element) when the root
+    closes. Children are cleared after use so memory stays flat.
+    """
+    fp.seek(0)
+    depth = 0
+    try:
+        for event, element in etree.iterparse(fp, events=('start', 'end'),
+                                              resolve_entities=False, no_network=True,
+                                              huge_tree=True):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    yield 'root', element
+                continue
+            depth -= 1
+            if depth == 1:
+                if isinstance(element.tag, str):
+                    yield 'child', element
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            elif depth == 0:
+                yield 'end', element
+    except etree.XMLSyntaxError as e:
+        raise ConversionError(f"Invalid XML: {e}")
+    if depth != 0:
+        raise ConversionError("Invalid XML: document is incomplete")
+
+
+def _xml_child_tags(fp: IO[bytes]) -> Dict[str, int]:
+    """Count the root's children per tag, in order of first appearance"""
+    counts = {}
+    for event, element in _iter_xml(fp):
+        if event == 'child':
+            tag = _local_name(element.tag)
+            counts[tag] = counts.get(tag, 0) + 1
+    return counts
+
+
+def _xml_child_records(fp: IO[bytes]) -> Iterator[object]:
+    for event, element in _iter_xml(fp):
+        if event == 'child':
+            yield element_to_json(element)
+
+
+# -- Conversions --------------------------------------------------------------
+
+def _nesting_guard(converter: Callable) -> Callable:
+    """Report input nested past the recursion limit as ConversionError, not a 500"""
+    @functools.wraps(converter)
+    def wrapper(fp: IO[bytes]) -> Iterator[str]:
+        try:
+            yield from converter(fp)
+        except RecursionError:
+            raise ConversionError("Input is nested too deeply to convert")
+    return wrapper
+
+
+@_nesting_guard
+def convert_json_to_csv(fp: IO[bytes]) -> Iterator[str]:
+    headers = {}
+    root_key, records, document = _json_records(fp, visit=_collect_headers(headers))
+    if records is None:
+        # Only a lone object can get here; arrays are always streamed. Drop
+        # columns seen in items read before the document stopped streaming
+        if not isinstance(document, dict):
+            raise ConversionError("JSON must contain an array of objects to convert to CSV")
+        headers = {}
+        _collect_headers(headers)(document)
+        records = lambda: iter([document])  # noqa: E731
+    yield from _records_to_csv(records, headers)
+
+
+@_nesting_guard
+def convert_json_to_xml(fp: IO[bytes]) -> Iterator[str]:
+    root_key, records, document = _json_records(fp)
+    if records is not None:
+        root = root_key if root_key is not None else 'root'
+        item = _singular(root) if root_key is not None else 'item'
+        yield from _buffered(_xml_records(records(), root, item))
+        return
+
+    pieces = [XML_DECLARATION]
+    if isinstance(document, dict) and len(document) == 1 and not isinstance(next(iter(document.values())), list):
+        key, value = next(iter(document.items()))
+        _to_xml(value, key, pieces)
+    else:
+        _to_xml(document if isinstance(document, dict) else {'value': document}, 'root', pieces)
+    yield ''.join(pieces)
+
+
+def _csv_records(fp: IO[bytes]) -> Iterator[Dict]:
+    """Read CSV rows as dicts, converting numeric-looking values like the browser tool"""
+    fp.seek(0)
+    reader = csv.reader(iter_lines(read_text(fp)))
+    try:
+        headers = next(reader, None)
+        if headers is None:
+            raise ConversionError("CSV must have headers and at least one data row")
+        found = False
+        for row in reader:
+            if not row or row == ['']:
+                continue  # Skip empty rows
+            found = True
+            record = {}
+            for j, header in enumerate(headers):
+                value = row[j] if j < len(row) else ''
+                if _INT_RE.fullmatch(value):
+                    record[header] = int(value)
+                elif _FLOAT_RE.fullmatch(value):
+                    record[header] = float(value)
+                else:
+                    record[header] = value
+            yield record
+        if not found:
+            raise ConversionError("CSV must have headers and at least one data row")
+    except csv.Error as e:
+        raise ConversionError(f"Invalid CSV: {e}")
+
+
+@_nesting_guard
+def convert_csv_to_json(fp: IO[bytes]) -> Iterator[str]:
+    def pieces():
+        first = True
+        for record in _csv_records(fp):
+            yield ('[\n  ' if first else ',\n  ') + _indent_json(record, '  ')
+            first = False
+        yield '\n]'
+    yield from _buffered(pieces())
+
+
+@_nesting_guard
+def convert_csv_to_xml(fp: IO[bytes]) -> Iterator[str]:
+    yield from _buffered(_xml_records(_csv_records(fp), 'rows', 'row'))
+
+
+@_nesting_guard
+def convert_xml_to_json(fp: IO[bytes]) -> Iterator[str]:
+    """Convert XML to JSON, grouping every repeated child tag of the root into one array.
+
+    A first pass counts the root's children per tag. The second pass writes
+    each tag's values as they arrive while children stay grouped, and only
+    buffers values whose tag interleaves with another one.
+    """
+    counts = _xml_child_tags(fp)
+    order = list(counts)
+
+    def key_start(tag, first):
+        return ('' if first else ',') + '\n    ' + json.dumps(tag, ensure_ascii=False) + ': ' + (
+            '[' if counts[tag] > 1 else '')
+
+    def key_value(tag, index, value):
+        if counts[tag] == 1:
+            return _indent_json(value, '    ')
+        return (',' if index else '') + '\n      ' + _indent_json(value, '      ')
+
+    def key_end(tag):
+        return '\n    ]' if counts[tag] > 1 else ''
+
+    def pieces():
+        root = None
+        current = 0    # index in order of the tag being written
+        written = 0    # values written for that tag
+        buffered = {}  # tag -> values that arrived before their tag's turn
+
+        for event, element in _iter_xml(fp):
+            if event == 'root':
+                root = element
+                if order:
+                    yield '{\n  ' + json.dumps(_local_name(root.tag), ensure_ascii=False) + ': {'
+                    for name, attr in root.attrib.items():
+                        yield '\n    ' + json.dumps('@' + _local_name(name), ensure_ascii=False) + ': ' + json.dumps(attr, ensure_ascii=False) + ','
+                    yield key_start(order[0], first=True)
+                continue
+            if event == 'child':
+                tag = _local_name(element.tag)
+                value = element_to_json(element)
+                if tag != order[current]:
+                    buffered.setdefault(tag, []).append(value)
+                    continue
+                yield key_value(tag, written, value)
+                written += 1
+                # Finish every tag that is now complete, flushing values held for the next
+                while current < len(order) and written == counts[order[current]]:
+                    yield key_end(order[current])
+                    current += 1
+                    written = 0
+                    if current < len(order):
+                        tag = order[current]
+                        yield key_start(tag, first=False)
+                        for value in buffered.pop(tag, ()):
+                            yield key_value(tag, written, value)
+                            written += 1
+                continue
+
+            # Root closed
+            if not order:
+                value = element_to_json(root)
+                yield '{\n  ' + json.dumps(_local_name(root.tag), ensure_ascii=False) + ': ' + _indent_json(value, '  ') + '\n}'
+                return
+            text = (root.text or '').strip()
+            if text:
+                yield ',\n    "#text": ' + json.dumps(text, ensure_ascii=False)
+            yield '\n  }\n}'
+
+    yield from _buffered(pieces())
+
+
+@_nesting_guard
+def convert_xml_to_csv(fp: IO[bytes]) -> Iterator[str]:
+    headers = {}
+    visit = _collect_headers(headers)
+    for record in _xml_child_records(fp):
+        visit(record)
+    yield from _records_to_csv(lambda: _xml_child_records(fp), headers)
+
+
+# conversion id -> (converter, file extension, mimetype)
+CONVERTERS = {
+    'json-to-xml': (convert_json_to_xml, 'xml', 'application/xml'),
+    'json-to-csv': (convert_json_to_csv, 'csv', 'text/csv'),
+    'csv-to-json': (convert_csv_to_json, 'json', 'application/json'),
+    'csv-to-xml': (convert_csv_to_xml, 'xml', 'application/xml'),
+    'xml-to-json': (convert_xml_to_json, 'json', 'application/json'),
+    'xml-to-csv': (convert_xml_to_csv, 'csv', 'text/csv'),
+}
@@ -0,0 +1,58 @@
+# app/utils/timezones.py
+import bisect
+import unicodedata
+from typing import Dict, List, Optional
+
+
+def normalize_city(name: str) -> str:
+    """Case- and accent-insensitive key for city lookups"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().replace('-', ' ').split())
+
+
+class TimezoneIndex:
+    """timezones.json indexed by city name and by UTC offset.
+
+    Built once per app so lookups are dictionary hits instead of scans over
+    the raw data.
+    """
+
+    def __init__(self, data: Dict):
+        self.timezones = data.get('timezones', [])
+        self.cities_data = data.get('cities_data', {})
+
+        self._by_city = {}
+        for city_key, city in self.cities_data.items():
+            self._by_city[normalize_city(city_key)] = city
+            self._by_city[normalize_city(city['name'])] = city
+        self._sorted_cities = sorted(self._by_city)
+
+        self._by_offset = {}
+        for zone in self.timezones:
+            self._by_offset[zone['offset']] = {'zone': zone, 'cities': []}
+        for city in self.cities_data.values():
+            entry = self._by_offset.setdefault(city['offset'], {'zone': None, 'cities': []})
+            entry['cities'].append(city)
+
+    def lookup_city(self, name: str) -> Optional[Dict]:
+        """Find a city by exact name, falling back to the first name it prefixes"""
+        key = normalize_city(name)
+        if not key:
+            return None
+        city = self._by_city.get(key)
+        if city is not None:
+            return city
+        # The first name >= key is the first one key can prefix
+        i = bisect.bisect_left(self._sorted_cities, key)
+        if i < len(self._sorted_cities) and self._sorted_cities[i].startswith(key):
+            return self._by_city[self._sorted_cities[i]]
+        return None
+
+    def zone_for_offset(self, offset: str) -> Optional[Dict]:
+        entry = self._by_offset.get(offset)
+        return entry['zone'] if entry else None
+
+    def cities_for_offset(self, offset: str) -> List[Dict]:
+        entry = self._by_offset.get(offset)
+        return entry['cities'] if entry else []
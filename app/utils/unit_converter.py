@@ -1,25 +1,107 @@
+import hashlib
 import json
 import os
+from datetime import datetime, timezone
 from flask import current_app
+from app.utils.data_snapshot import UNITS_FILE, get_snapshot
+from app.utils.search_index import UnitSearchIndex
 
-class UnitManager:
-    _instance = None
-    _units_data = None
+# Temperature units have no plain factor in units.json; each is described as an
+# affine map (scale, offset) onto Celsius instead: base = value * scale + offset.
+TEMPERATURE_AFFINE = {
+    'c': (1.0, 0.0),
+    'f': (5 / 9, -32 * 5 / 9),
+    'k': (1.0, -273.15),
+}
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(UnitManager, cls).__new__(cls)
-        return cls._instance
 
-    def __init__(self):
-        if self._units_data is None:
-            self.load_units_data()
+class ConversionEngine:
+    """Conversion tables compiled once from units.json.
 
-    def load_units_data(self):
-        """Load units data from JSON file"""
-        json_path = os.path.join(current_app.static_folder, 'data', 'units.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            self._units_data = json.load(f)
+    Every unit is described as an affine (scale, offset) pair relative to its
+    category base. The (scale, offset) for every pair of units in a category
+    is precomputed, so any conversion, temperature included, is a single
+    ``value * scale + offset``.
+    """
+
+    def __init__(self, units_data):
+        self.pairs = {}       # (category_id, from_unit, to_unit) -> (scale, offset)
+
+        for category_id, category in units_data.get('categories', {}).items():
+            affines = {}
+            for unit_id, unit in category.get('units', {}).items():
+                affine = self._unit_affine(category_id, unit_id, unit)
+                if affine is not None:
+                    affines[unit_id] = affine
+            for from_unit, (from_scale, from_offset) in affines.items():
+                for to_unit, (to_scale, to_offset) in affines.items():
+                    self.pairs[(category_id, from_unit, to_unit)] = (
+                        from_scale / to_scale, (from_offset - to_offset) / to_scale)
+
+    @staticmethod
+    def _unit_affine(category_id, unit_id, unit):
+        if category_id == 'temperature':
+            return TEMPERATURE_AFFINE.get(unit_id)
+        factor = unit.get('factor')
+        if not factor:
+            return None
+        return (float(factor), 0.0)
+
+    def get_pair(self, category_id, from_unit, to_unit):
+        """Return the (scale, offset) converting from_unit to to_unit, or None"""
+        return self.pairs.get((category_id, from_unit, to_unit))
+
+
+class UnitRegistry:
+    """units.json, its compiled engine and search index, and the detailed tables.
+
+    Built once, eagerly. The unit data, engine and search index are read-only
+    afterwards, so one registry can be shared by threads and, with gunicorn
+    ``--preload``, inherited copy-on-write by every worker. The detailed-table
+    cache is the one mutable part: an entry is replaced when its file's mtime
+    changes or ``reload_detailed_tables()`` drops it. Needs no Flask app:
+    ``UnitRegistry.from_path()`` works in scripts and batch jobs, and
+    ``create_app`` attaches one as ``app.extensions['unit_registry']``.
+    """
+
+    def __init__(self, units_data, data_version, data_last_modified, data_dir,
+                 engine=None, search_index=None, detailed_tables=None):
+        self._units_data = units_data
+        self.data_version = data_version              # Short sha256 of units.json, for ETags and cache keys
+        self.data_last_modified = data_last_modified  # mtime of units.json as an aware datetime
+        self.data_dir = data_dir
+        self._engine = engine if engine is not None else ConversionEngine(units_data)
+        self._pairs = self._engine.pairs
+        self.search_index = search_index if search_index is not None else UnitSearchIndex(units_data)
+        self._detailed_tables = detailed_tables or {}  # category_id -> (json_path, mtime_ns, tables)
+
+    @classmethod
+    def from_path(cls, data_dir):
+        """Parse units.json and every detailed table in ``data_dir``"""
+        json_path = os.path.join(data_dir, UNITS_FILE)
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        registry = cls(
+            json.loads(raw),
+            hashlib.sha256(raw).hexdigest()[:16],
+            datetime.fromtimestamp(os.path.getmtime(json_path), tz=timezone.utc).replace(microsecond=0),
+            data_dir,
+        )
+        for category_id in registry._units_data.get('categories', {}):
+            registry.get_detailed_conversion_tables(category_id)
+        return registry
+
+    @classmethod
+    def from_snapshot(cls, snapshot, data_dir):
+        """Wrap the prebuilt objects of a validated DataSnapshot"""
+        detailed_tables = {}
+        for category_id, tables in snapshot.detailed_tables.items():
+            name = category_id + '.json'
+            # Seed the cache; the usual mtime check still picks up edits
+            detailed_tables[category_id] = (os.path.join(data_dir, name), snapshot.mtimes[name], tables)
+        return cls(snapshot.units_data, snapshot.data_version, snapshot.modified(UNITS_FILE), data_dir,
+                   engine=snapshot.engine, search_index=snapshot.search_index,
+                   detailed_tables=detailed_tables)
 
     def get_categories(self):
         """Return all categories with their basic info"""
@@ -42,54 +124,141 @@ class UnitManager:
         return None
 
     def get_conversion_factor(self, category_id, from_unit, to_unit):
-        category = self.get_category(category_id)
-        if not category or 'units' not in category:
-            return None
-            
-        units = category['units']
-        if from_unit not in units or to_unit not in units:
-            return None
-
         if category_id == 'temperature':
             return None  # Temperature requires special conversion formulas
-            
-        from_factor = units[from_unit]['factor']
-        to_factor = units[to_unit]['factor']
-        
-        return from_factor / to_factor
+        pair = self._pairs.get((category_id, from_unit, to_unit))
+        if pair is None:
+            return None
+        return pair[0]
 
     def convert_value(self, category_id, from_unit, to_unit, value):
+        # Hot path: one tuple-keyed lookup and one multiply-add per conversion
         try:
-            value = float(value)
-        except (TypeError, ValueError):
+            scale, offset = self._pairs[category_id, from_unit, to_unit]
+        except (KeyError, TypeError):
             return None
 
-        if category_id == 'temperature':
-            return self._convert_temperature(from_unit, to_unit, value)
+        if value.__class__ is not float and value.__class__ is not int:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return None
+
+        return value * scale + offset
+
+    def convert_values(self, category_id, from_unit, to_unit, values):
+        """Convert a sequence of values in one pass over a single unit pair.
 
-        factor = self.get_conversion_factor(category_id, from_unit, to_unit)
-        if factor is None:
+        Returns a list aligned with ``values`` where entries that are not
+        numbers are None, or None if the conversion itself is invalid.
+        """
+        try:
+            scale, offset = self._pairs[category_id, from_unit, to_unit]
+        except (KeyError, TypeError):
             return None
 
-        return value * factor
+        try:
+            # Fast path: every value is already an int or float
+            return [value * scale + offset for value in values]
+        except (TypeError, OverflowError):
+            pass
+
+        results = []
+        for value in values:
+            try:
+                if value.__class__ is not float and value.__class__ is not int:
+                    value = float(value)
+                results.append(value * scale + offset)
+            except (TypeError, ValueError, OverflowError):  # ints too large for a float
+                results.append(None)
+        return results
+
+    def convert_array(self, category_id, from_unit, to_unit, values,
+                      dtype='float64', nonfinite='propagate'):
+        """Convert a NumPy array (or any buffer-protocol object) in one pass.
+
+        Args:
+            values: array-like of numbers; converted with ``numpy.asarray``
+            dtype: floating-point dtype of the returned array
+            nonfinite: how NaN/inf inputs are handled: 'propagate' passes them
+                through the formula, 'nan' turns +/-inf into NaN and 'raise'
+                raises ValueError if any input is not finite
+        Returns:
+            A new ndarray with the converted values, or None if the
+            conversion itself is invalid
+        """
+        import numpy as np
+
+        if nonfinite not in ('propagate', 'nan', 'raise'):
+            raise ValueError(f"Unknown nonfinite mode: {nonfinite}")
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'f':
+            raise ValueError("Output dtype must be a floating-point type")
+
+        try:
+            scale, offset = self._pairs[category_id, from_unit, to_unit]
+        except (KeyError, TypeError):
+            return None
+
+        values = np.asarray(values, dtype=np.float64)
+        if nonfinite != 'propagate':
+            finite = np.isfinite(values)
+            if not finite.all():
+                if nonfinite == 'raise':
+                    raise ValueError("Input contains NaN or infinite values")
+                values = np.where(finite, values, np.nan)
+
+        result = values * scale
+        if offset:
+            result += offset
+        return result.astype(dtype, copy=False)
 
     def _convert_temperature(self, from_unit, to_unit, value):
-        conversions = {
-            'c_to_f': lambda c: (c * 9/5) + 32,
-            'f_to_c': lambda f: (f - 32) * 5/9,
-            'c_to_k': lambda c: c + 273.15,
-            'k_to_c': lambda k: k - 273.15,
-            'f_to_k': lambda f: (f - 32) * 5/9 + 273.15,
-            'k_to_f': lambda k: (k - 273.15) * 9/5 + 32
-        }
-        
-        conversion_key = f"{from_unit}_to_{to_unit}"
-        if conversion_key in conversions:
-            return conversions[conversion_key](value)
-        
-        return None
+        return self.convert_value('temperature', from_unit, to_unit, value)
 
     def get_detailed_conversion_tables(self, category_id):
-        json_path = os.path.join(current_app.static_folder, 'data', category_id + '.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
\ No newline at end of file
+        """Return the detailed tables for a category, cached per process.
+
+        Entries are reloaded when the file's mtime changes. A missing file is
+        cached as an empty list rather than raising.
+        """
+        json_path = os.path.join(self.data_dir, category_id + '.json')
+        try:
+            mtime = os.stat(json_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        cached = self._detailed_tables.get(category_id)
+        if cached is not None and cached[0] == json_path and cached[1] == mtime:
+            return cached[2]
+
+        tables = []
+        if mtime is not None:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                tables = json.load(f)
+        self._detailed_tables[category_id] = (json_path, mtime, tables)
+        return tables
+
+    def reload_detailed_tables(self, category_id=None):
+        """Drop cached detailed tables for one category, or all of them"""
+        if category_id is None:
+            self._detailed_tables.clear()
+        else:
+            self._detailed_tables.pop(category_id, None)
+
+
+def create_unit_registry(app):
+    """Build the registry for an app, from its data snapshot when that is current"""
+    data_dir = os.path.join(app.static_folder, 'data')
+    snapshot = get_snapshot(app)
+    if snapshot is not None:
+        return UnitRegistry.from_snapshot(snapshot, data_dir)
+    return UnitRegistry.from_path(data_dir)
+
+
+def get_unit_registry():
+    """Return the current app's UnitRegistry.
+
+    Outside an app, use ``UnitRegistry.from_path()``.
+    """
+    return current_app.extensions['unit_registry']
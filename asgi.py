@@ -0,0 +1,5 @@
+from app import create_app
+from app.asgi import AsgiApp
+
+flask_app = create_app()
+app = AsgiApp(flask_app)
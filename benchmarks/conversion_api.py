@@ -0,0 +1,80 @@
+"""Latency benchmark for the unified single-value conversion path.
+
+Runs a seeded mix of valid and invalid requests through ``convert_request``
+directly and through both HTTP endpoints via the Flask test client, and prints
+p50/p95/p99 latencies as JSON::
+
+    python -m benchmarks.conversion_api --requests 20000 --max-p99-us 500
+"""
+import argparse
+import json
+import random
+import sys
+
+from app import create_app
+from app.utils.conversion_service import convert_request
+from app.utils.unit_converter import get_unit_registry
+from benchmarks.harness import percentiles, time_each
+
+
+def build_requests(registry, count, seed):
+    """Seeded request bodies: mostly valid pairs, with some invalid values and units"""
+    rng = random.Random(seed)
+    pairs = [
+        (cat_id, from_unit, to_unit)
+        for cat_id, category in sorted(registry._units_data['categories'].items())
+        for from_unit in sorted(category['units'])
+        for to_unit in sorted(category['units'])
+    ]
+    requests = []
+    for _ in range(count):
+        category, from_unit, to_unit = rng.choice(pairs)
+        roll = rng.random()
+        if roll < 0.05:
+            value = 'not a number'
+        elif roll < 0.1:
+            to_unit = 'unknown'
+            value = 1
+        elif roll < 0.3:
+            value = f'{rng.uniform(-1000, 1000):.3f}'
+        else:
+            value = rng.uniform(-1e6, 1e6)
+        requests.append({'category': category, 'fromUnit': from_unit, 'toUnit': to_unit, 'value': value})
+    return requests
+
+
+def run(count, seed):
+    app = create_app()
+    app.config['TESTING'] = True
+    client = app.test_client()
+    with app.app_context():
+        registry = get_unit_registry()
+        requests = build_requests(registry, count, seed)
+        results = {
+            'convert_request': percentiles(time_each(lambda body: convert_request(body, registry), requests)),
+        }
+    http_requests = requests[:max(1, count // 10)]
+    for path in ('/api/convert', '/convert/api/convert'):
+        results[path] = percentiles(time_each(lambda body: client.post(path, json=body), http_requests))
+    return {'seed': seed, 'python': sys.version.split()[0], 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000, help='service-level calls (HTTP runs use a tenth)')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--max-p99-us', type=float, default=None,
+                        help='fail if convert_request p99 exceeds this many microseconds')
+    args = parser.parse_args(argv)
+
+    report = run(args.requests, args.seed)
+    print(json.dumps(report, indent=2))
+    p99 = report['results']['convert_request']['p99_us']
+    if args.max_p99_us is not None and p99 > args.max_p99_us:
+        print(f'convert_request p99 {p99}us exceeds {args.max_p99_us}us', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Timing, reporting and threshold checks shared by the benchmark scripts.
+
+Results are plain dicts so a run serialises to JSON and two runs can be
+compared key by key: ``{name: {count, p50_us, p95_us, p99_us, max_us,
+ops_per_sec}}``.
+"""
+import json
+import platform
+import subprocess
+import sys
+import time
+
+
+def time_each(function, items):
+    """Call ``function`` once per item; returns per-call wall times in seconds"""
+    timer = time.perf_counter
+    samples = []
+    for item in items:
+        start = timer()
+        function(item)
+        samples.append(timer() - start)
+    return samples
+
+
+def percentiles(samples):
+    total = sum(samples)
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        'count': len(samples),
+        'p50_us': round(pick(0.50) * 1e6, 2),
+        'p95_us': round(pick(0.95) * 1e6, 2),
+        'p99_us': round(pick(0.99) * 1e6, 2),
+        'max_us': round(samples[-1] * 1e6, 2),
+        'ops_per_sec': round(len(samples) / total, 1) if total else None,
+    }
+
+
+def environment(seed):
+    """Run metadata so reports from different commits and machines can be told apart"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'seed': seed,
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+    }
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_thresholds(results, thresholds):
+    """Compare results with absolute limits.
+
+    ``thresholds`` maps a benchmark name to limits: ``*_us`` keys are maxima
+    for that percentile and ``min_ops_per_sec`` is a minimum throughput.
+    Benchmarks without an entry, or not run, are skipped. Returns a list of
+    failure messages.
+    """
+    failures = []
+    for name, limits in sorted(thresholds.items()):
+        result = results.get(name)
+        if result is None:
+            continue
+        for key, limit in limits.items():
+            if key == 'min_ops_per_sec':
+                if result['ops_per_sec'] < limit:
+                    failures.append(f"{name}: {result['ops_per_sec']} ops/s is below {limit} ops/s")
+            elif result[key] > limit:
+                failures.append(f"{name}: {key} {result[key]} exceeds {limit}")
+    return failures
+
+
+def check_regressions(results, baseline, max_ratio, metric='p50_us'):
+    """Compare results with an earlier run of the same benchmarks.
+
+    Fails any benchmark whose ``metric`` grew by more than ``max_ratio``
+    (0.25 = 25% slower). Returns a list of failure messages.
+    """
+    failures = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if not previous or not previous.get(metric):
+            continue
+        ratio = result[metric] / previous[metric] - 1
+        if ratio > max_ratio:
+            failures.append(f"{name}: {metric} {previous[metric]} -> {result[metric]} (+{ratio:.0%})")
+    return failures
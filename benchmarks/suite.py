@@ -0,0 +1,292 @@
+"""Benchmark suite for the core utilities and the main routes.
+
+Every benchmark draws its inputs from ``random.Random(f"{seed}:{name}")``, so
+a run is reproducible and running a subset does not change the inputs of the
+others. Results are printed (and optionally written) as JSON. The run fails
+when a benchmark breaks a limit in ``thresholds.json`` or, given
+``--baseline``, regresses against an earlier report::
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --max-regression 0.25
+    python -m benchmarks.suite --filter aviation --iterations 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+from app import create_app
+from app.routes.converter import generate_conversion_table, get_related_conversions
+from app.utils.aviation_calculations import (
+    calculate_crosswind, calculate_density_altitude, calculate_fuel_requirements, calculate_ground_speed
+)
+from app.utils.flight_plan import calculate_flight_plan
+from app.utils.formatting import format_number
+from app.utils.seo import generate_meta_tags
+from benchmarks.harness import (
+    check_regressions, check_thresholds, environment, load_json, percentiles, time_each
+)
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+
+# name -> (build, scale); build(context, rng, count) returns (function, items)
+# and scale shrinks the iteration count for expensive benchmarks.
+BENCHMARKS = {}
+
+
+def benchmark(name, scale=1.0):
+    def register(build):
+        BENCHMARKS[name] = (build, scale)
+        return build
+    return register
+
+
+class Context:
+    """The app, its test client and its unit registry, shared by every benchmark"""
+
+    def __init__(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.registry = self.app.extensions['unit_registry']
+        categories = self.registry._units_data['categories']
+        self.categories = sorted(categories)
+        self.pairs = [
+            (cat_id, from_unit, to_unit)
+            for cat_id in self.categories
+            for from_unit in sorted(categories[cat_id]['units'])
+            for to_unit in sorted(categories[cat_id]['units'])
+            if from_unit != to_unit
+        ]
+
+
+def markdown_document(rng, size):
+    """A mixed Markdown document of roughly ``size`` characters"""
+    words = ['fuel', 'wind', 'meter', 'pressure', 'heading', '**bold**', '*italic*',
+             '`code`', '[link](https://example.com)', 'altitude', 'knots', 'table']
+    sentence = lambda n: ' '.join(rng.choice(words) for _ in range(n)).capitalize() + '.'
+    parts = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.15:
+            block = f"## {sentence(4)}"
+        elif kind < 0.3:
+            block = '\n'.join(f"- {sentence(6)}" for _ in range(rng.randint(2, 6)))
+        elif kind < 0.4:
+            block = '```python\n' + '\n'.join(f"x_{i} = {rng.random():.4f}" for i in range(5)) + '\n```'
+        elif kind < 0.5:
+            rows = '\n'.join(f"| {rng.randint(0, 999)} | {sentence(2)} |" for _ in range(5))
+            block = f"| Value | Note |\n| --- | --- |\n{rows}"
+        else:
+            block = ' '.join(sentence(rng.randint(6, 14)) for _ in range(rng.randint(2, 5)))
+        parts.append(block)
+        length += len(block) + 2
+    return '\n\n'.join(parts)
+
+
+@benchmark('unit.convert_value')
+def bench_convert_value(context, rng, count):
+    items = [(*rng.choice(context.pairs), rng.uniform(-1e6, 1e6)) for _ in range(count)]
+    convert = context.registry.convert_value
+    return (lambda item: convert(*item)), items
+
+
+@benchmark('formatting.format_number')
+def bench_format_number(context, rng, count):
+    makers = [
+        lambda: rng.uniform(-1000, 1000),
+        lambda: rng.uniform(-1e9, 1e9),
+        lambda: rng.uniform(-1e-7, 1e-7),
+        lambda: float(rng.randint(-10000, 10000)),
+        lambda: rng.randint(-10 ** 7, 10 ** 7),
+    ]
+    return format_number, [rng.choice(makers)() for _ in range(count)]
+
+
+@benchmark('converter.generate_conversion_table', scale=0.1)
+def bench_generate_conversion_table(context, rng, count):
+    registry = context.registry
+    return (lambda pair: generate_conversion_table(registry, *pair)), [rng.choice(context.pairs) for _ in range(count)]
+
+
+@benchmark('converter.get_related_conversions', scale=0.1)
+def bench_get_related_conversions(context, rng, count):
+    registry = context.registry
+    items = []
+    for _ in range(count):
+        cat_id, from_unit, to_unit = rng.choice(context.pairs)
+        items.append((cat_id, registry.get_category(cat_id), from_unit, to_unit))
+    return (lambda item: get_related_conversions(*item)), items
+
+
+@benchmark('seo.generate_meta_tags', scale=0.1)
+def bench_generate_meta_tags(context, rng, count):
+    items = []
+    for _ in range(count):
+        cat_id, from_unit, to_unit = rng.choice(context.pairs)
+        kind = rng.random()
+        if kind < 0.2:
+            items.append({'base_url': 'https://anyunit.com/'})
+        elif kind < 0.4:
+            items.append({'category': cat_id, 'base_url': 'https://anyunit.com/'})
+        else:
+            items.append({'category': cat_id, 'from_unit': from_unit, 'to_unit': to_unit,
+                          'base_url': 'https://anyunit.com/'})
+    return (lambda kwargs: generate_meta_tags(**kwargs)), items
+
+
+@benchmark('aviation.fuel_requirements')
+def bench_fuel_requirements(context, rng, count):
+    items = [(rng.uniform(10, 1500), rng.uniform(60, 250), rng.uniform(5, 40),
+              rng.uniform(0, 50), rng.uniform(0, 360), rng.uniform(0, 360), 45) for _ in range(count)]
+    return (lambda args: calculate_fuel_requirements(*args)), items
+
+
+@benchmark('aviation.ground_speed')
+def bench_ground_speed(context, rng, count):
+    items = [(rng.uniform(60, 250), rng.uniform(0, 50), rng.uniform(0, 360), rng.uniform(0, 360),
+              rng.uniform(-30, 40), rng.uniform(0, 15000)) for _ in range(count)]
+    return (lambda args: calculate_ground_speed(*args)), items
+
+
+@benchmark('aviation.density_altitude')
+def bench_density_altitude(context, rng, count):
+    items = [(rng.uniform(0, 15000), rng.uniform(-30, 40)) for _ in range(count)]
+    return (lambda args: calculate_density_altitude(*args)), items
+
+
+@benchmark('aviation.crosswind')
+def bench_crosswind(context, rng, count):
+    items = [(rng.uniform(0, 50), rng.uniform(0, 360)) for _ in range(count)]
+    return (lambda args: calculate_crosswind(*args)), items
+
+
+@benchmark('aviation.flight_plan', scale=0.05)
+def bench_flight_plan(context, rng, count):
+    plans = []
+    for _ in range(count):
+        legs = [{'distance': rng.uniform(10, 200), 'course': rng.uniform(0, 360),
+                 'wind_speed': rng.uniform(0, 30), 'wind_direction': rng.uniform(0, 360)}
+                for _ in range(rng.randint(2, 20))]
+        plans.append(legs)
+    return (lambda legs: calculate_flight_plan(legs, true_airspeed=120, fuel_flow=9)), plans
+
+
+def _markdown_benchmark(name, size, scale):
+    @benchmark(name, scale=scale)
+    def build(context, rng, count):
+        # The pool renders every call; the content-hash cache would hide the work
+        pool = context.app.extensions['markdown_renderer'].pool
+        documents = [markdown_document(rng, size) for _ in range(min(count, 20))]
+        return pool.convert, [documents[i % len(documents)] for i in range(count)]
+
+
+_markdown_benchmark('markdown.render_1kb', 1_000, 0.02)
+_markdown_benchmark('markdown.render_10kb', 10_000, 0.005)
+_markdown_benchmark('markdown.render_100kb', 100_000, 0.0005)
+
+
+@benchmark('http.api_convert', scale=0.05)
+def bench_http_api_convert(context, rng, count):
+    items = [{'category': cat_id, 'fromUnit': from_unit, 'toUnit': to_unit, 'value': rng.uniform(-1e6, 1e6)}
+             for cat_id, from_unit, to_unit in (rng.choice(context.pairs) for _ in range(count))]
+    return (lambda body: context.client.post('/api/convert', json=body)), items
+
+
+@benchmark('http.category_page', scale=0.01)
+def bench_http_category_page(context, rng, count):
+    paths = [f"/convert/{rng.choice(context.categories)}/" for _ in range(count)]
+    return context.client.get, paths
+
+
+@benchmark('http.conversion_page', scale=0.01)
+def bench_http_conversion_page(context, rng, count):
+    page_cache = context.app.extensions['conversion_page_cache']
+
+    def get(path):
+        # Empty the page LRU first so every request renders the page
+        page_cache.clear()
+        return context.client.get(path)
+
+    paths = [f"/convert/{cat_id}/{from_unit}-to-{to_unit}"
+             for cat_id, from_unit, to_unit in (rng.choice(context.pairs) for _ in range(count))]
+    return get, paths
+
+
+@benchmark('http.sitemap', scale=0.01)
+def bench_http_sitemap(context, rng, count):
+    return context.client.get, ['/sitemap.xml'] * count
+
+
+def check_responses(function):
+    """Wrap an HTTP benchmark so a failing route fails the run instead of timing an error page"""
+    def run(item):
+        response = function(item)
+        if getattr(response, 'status_code', 200) != 200:
+            raise RuntimeError(f"HTTP {response.status_code} for {item!r}")
+    return run
+
+
+def run(iterations, seed, names=None):
+    context = Context()
+    results = {}
+    # One request context for helpers that call url_for; the test client pushes its own
+    with context.app.test_request_context(base_url='https://anyunit.com/'):
+        for name, (build, scale) in BENCHMARKS.items():
+            if names is not None and name not in names:
+                continue
+            count = max(1, int(iterations * scale))
+            function, items = build(context, random.Random(f"{seed}:{name}"), count)
+            if name.startswith('http.'):
+                function = check_responses(function)
+            function(items[0])  # warm up imports and per-process caches
+            results[name] = percentiles(time_each(function, items))
+    return {**environment(seed), 'iterations': iterations, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000,
+                        help='calls per micro-benchmark; heavier benchmarks run a fixed fraction')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--filter', action='append', default=None, metavar='TEXT',
+                        help='only run benchmarks whose name contains TEXT (repeatable)')
+    parser.add_argument('--list', action='store_true', help='list benchmark names and exit')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS,
+                        help='JSON file of absolute limits; pass an empty string to skip')
+    parser.add_argument('--baseline', help='earlier JSON report to check for regressions against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='allowed p50 slowdown against --baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+    names = None
+    if args.filter:
+        names = {name for name in BENCHMARKS if any(text in name for text in args.filter)}
+
+    report = run(args.iterations, args.seed, names)
+    failures = []
+    if args.thresholds:
+        failures += check_thresholds(report['results'], load_json(args.thresholds))
+    if args.baseline:
+        failures += check_regressions(report['results'], load_json(args.baseline)['results'],
+                                      args.max_regression)
+    report['failures'] = failures
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
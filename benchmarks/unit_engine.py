@@ -0,0 +1,136 @@
+"""Before/after benchmark for the compiled unit conversion engine.
+
+Times the per-call conversion that units.json was served with before the
+engine (``LegacyConverter``, kept here verbatim as the baseline) against
+``UnitRegistry.convert_value`` and the per-item cost of
+``UnitRegistry.convert_values``, separately for factor and temperature pairs,
+and prints the speedups as JSON. ``call_floor_ns`` is a method with the same
+signature that does nothing; it is the cost no single-value implementation
+can remove::
+
+    python -m benchmarks.unit_engine --iterations 200000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+from app.utils.unit_converter import UnitRegistry
+from benchmarks.harness import environment
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'static', 'data')
+
+
+class LegacyConverter:
+    """The dictionary-walking conversion used before ConversionEngine"""
+
+    def __init__(self, units_data):
+        self._units_data = units_data
+
+    def get_category(self, category_id):
+        return self._units_data['categories'].get(category_id)
+
+    def get_conversion_factor(self, category_id, from_unit, to_unit):
+        category = self.get_category(category_id)
+        if not category or 'units' not in category:
+            return None
+        units = category['units']
+        if from_unit not in units or to_unit not in units:
+            return None
+        if category_id == 'temperature':
+            return None
+        return units[from_unit]['factor'] / units[to_unit]['factor']
+
+    def convert_value(self, category_id, from_unit, to_unit, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if category_id == 'temperature':
+            return self._convert_temperature(from_unit, to_unit, value)
+        factor = self.get_conversion_factor(category_id, from_unit, to_unit)
+        if factor is None:
+            return None
+        return value * factor
+
+    def _convert_temperature(self, from_unit, to_unit, value):
+        conversions = {
+            'c_to_f': lambda c: (c * 9/5) + 32,
+            'f_to_c': lambda f: (f - 32) * 5/9,
+            'c_to_k': lambda c: c + 273.15,
+            'k_to_c': lambda k: k - 273.15,
+            'f_to_k': lambda f: (f - 32) * 5/9 + 273.15,
+            'k_to_f': lambda k: (k - 273.15) * 9/5 + 32
+        }
+        conversion_key = f"{from_unit}_to_{to_unit}"
+        if conversion_key in conversions:
+            return conversions[conversion_key](value)
+        return None
+
+
+class _NoOp:
+    """Same call shape as convert_value, doing nothing: the per-call floor"""
+
+    def convert_value(self, category_id, from_unit, to_unit, value):
+        return value
+
+
+def _ns_per_call(function, items, repeat):
+    """Best-of-``repeat`` nanoseconds per call of ``function(*item)`` over ``items``"""
+    def loop():
+        for item in items:
+            function(*item)
+    return min(timeit.repeat(loop, number=1, repeat=repeat)) / len(items) * 1e9
+
+
+def _ns_per_item(function, key, values, repeat):
+    """Best-of-``repeat`` nanoseconds per value of one ``function(*key, values)`` batch call"""
+    return min(timeit.repeat(lambda: function(*key, values), number=1, repeat=repeat)) / len(values) * 1e9
+
+
+def run(iterations, seed, repeat=5):
+    """Time the legacy and compiled converters on seeded factor and temperature pairs"""
+    registry = UnitRegistry.from_path(DATA_DIR)
+    legacy = LegacyConverter(registry._units_data)
+    rng = random.Random(seed)
+    categories = registry._units_data['categories']
+    pairs = {
+        'factor': [(cat_id, a, b) for cat_id in sorted(categories) if cat_id != 'temperature'
+                   for a in sorted(categories[cat_id]['units']) for b in sorted(categories[cat_id]['units']) if a != b],
+        'temperature': [('temperature', a, b) for a in 'cfk' for b in 'cfk' if a != b],
+    }
+
+    results = {}
+    for kind, kind_pairs in pairs.items():
+        items = [(*rng.choice(kind_pairs), rng.uniform(-1e6, 1e6)) for _ in range(iterations)]
+        floor = _ns_per_call(_NoOp().convert_value, items, repeat)
+        before = _ns_per_call(legacy.convert_value, items, repeat)
+        after = _ns_per_call(registry.convert_value, items, repeat)
+        key = kind_pairs[0]
+        batch = _ns_per_item(registry.convert_values, key, [item[3] for item in items], repeat)
+        results[kind] = {
+            'call_floor_ns': round(floor, 1),
+            'before_ns': round(before, 1),
+            'convert_value_ns': round(after, 1),
+            'convert_values_ns_per_item': round(batch, 1),
+            'convert_value_speedup': round(before / after, 2),
+            'convert_values_speedup': round(before / batch, 2),
+            # Speedup of the work done inside the call, with the loop and call cost removed
+            'convert_value_body_speedup': round((before - floor) / max(after - floor, 1e-9), 2),
+        }
+    return {**environment(seed), 'iterations': iterations, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200000, help='conversions per timing loop')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.iterations, args.seed), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,8 +3,71 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'change-me')
     DEBUG = os.environ.get('DEBUG', 'false').lower() in ('1', 'true', 'yes', 'on')
     STATIC_FOLDER = 'static'
-    TEMPLATES_FOLDER = 'templates'
\ No newline at end of file
+    TEMPLATES_FOLDER = 'templates'
+    # Maximum number of values accepted by /api/convert/batch in one request
+    BATCH_CONVERT_MAX_ITEMS = int(os.environ.get('BATCH_CONVERT_MAX_ITEMS', 10000))
+    # Number of rendered /convert/<category>/<from>-to-<to> pages kept in memory
+    CONVERSION_PAGE_CACHE_SIZE = int(os.environ.get('CONVERSION_PAGE_CACHE_SIZE', 512))
+    # Number of formatted common-values tables (one per unit pair) kept in memory
+    CONVERSION_TABLE_CACHE_SIZE = int(os.environ.get('CONVERSION_TABLE_CACHE_SIZE', 4096))
+    # Maximum number of rows accepted by /aviation/api/aviation/batch in one request
+    AVIATION_BATCH_MAX_ITEMS = int(os.environ.get('AVIATION_BATCH_MAX_ITEMS', 100000))
+    # Maximum number of legs or waypoints accepted by /aviation/api/aviation/flight-plan
+    FLIGHT_PLAN_MAX_LEGS = int(os.environ.get('FLIGHT_PLAN_MAX_LEGS', 1000))
+    # Number of /api/search results kept in memory, keyed by query
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', 1024))
+    # Number of rendered Markdown documents kept in memory, keyed by content hash
+    MARKDOWN_CACHE_SIZE = int(os.environ.get('MARKDOWN_CACHE_SIZE', 256))
+    # Total size of that rendered HTML; the oldest documents are evicted first
+    MARKDOWN_CACHE_MAX_BYTES = int(os.environ.get('MARKDOWN_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    # Idle markdown.Markdown instances kept for reuse by the Markdown converter
+    MARKDOWN_POOL_SIZE = int(os.environ.get('MARKDOWN_POOL_SIZE', 8))
+    # Live-preview documents whose rendered blocks are kept for incremental updates. They
+    # are per process, so edits only apply incrementally with one worker, asgi:app or
+    # sticky routing; other workers answer 409 and the client resends the full text
+    MARKDOWN_PREVIEW_DOCUMENTS = int(os.environ.get('MARKDOWN_PREVIEW_DOCUMENTS', 128))
+    # Total size of those documents' source and HTML, and the largest single document;
+    # the oldest documents are evicted first and larger ones get a 413
+    MARKDOWN_PREVIEW_MAX_BYTES = int(os.environ.get('MARKDOWN_PREVIEW_MAX_BYTES', 64 * 1024 * 1024))
+    MARKDOWN_PREVIEW_DOCUMENT_MAX_BYTES = int(os.environ.get('MARKDOWN_PREVIEW_DOCUMENT_MAX_BYTES', 4 * 1024 * 1024))
+    # Prebuilt data snapshot written by `flask build-snapshot`; empty disables it
+    DATA_SNAPSHOT_PATH = os.environ.get('DATA_SNAPSHOT_PATH', os.path.join(basedir, 'build', 'data.snapshot'))
+    # Per-request timing, Server-Timing headers and a Prometheus /metrics endpoint
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'false').lower() in ('1', 'true', 'yes', 'on')
+    # Bearer token for the /admin endpoints (profiler); empty hides them
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+    # Longest profile /admin/profiler/start will run, in seconds
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 60))
+    # Markdown exports of at least this many characters are built by a background job
+    EXPORT_ASYNC_THRESHOLD = int(os.environ.get('EXPORT_ASYNC_THRESHOLD', 200000))
+    # Background export threads per process
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+    # Seconds an export job and its file are kept after its last update
+    EXPORT_JOB_TTL = int(os.environ.get('EXPORT_JOB_TTL', 600))
+    # redis:// URL shared by all workers for export jobs
+    EXPORT_JOBS_REDIS_URL = os.environ.get('EXPORT_JOBS_REDIS_URL', '')
+    # Keep export jobs in process memory when no Redis URL is set. Polls must reach the
+    # worker that took the job, so only enable this with one worker or asgi:app; with
+    # neither this nor a Redis URL, exports stay synchronous
+    EXPORT_JOBS_LOCAL = os.environ.get('EXPORT_JOBS_LOCAL', 'false').lower() in ('1', 'true', 'yes', 'on')
+    # Queued or running export jobs per process before submissions get a 503
+    EXPORT_JOB_MAX_PENDING = int(os.environ.get('EXPORT_JOB_MAX_PENDING', 32))
+    # Total size of finished exports kept in process memory; the oldest are evicted first
+    EXPORT_RESULT_MAX_BYTES = int(os.environ.get('EXPORT_RESULT_MAX_BYTES', 256 * 1024 * 1024))
+    # Threads and queued-job limit for CPU-heavy endpoints under asgi:app
+    ASGI_HEAVY_WORKERS = int(os.environ.get('ASGI_HEAVY_WORKERS', 4))
+    ASGI_HEAVY_QUEUE = int(os.environ.get('ASGI_HEAVY_QUEUE', 32))
+    # Threads and queued-job limit for page rendering under asgi:app
+    ASGI_PAGE_WORKERS = int(os.environ.get('ASGI_PAGE_WORKERS', 16))
+    ASGI_PAGE_QUEUE = int(os.environ.get('ASGI_PAGE_QUEUE', 256))
+    # Serve /sitemap.xml as an index of per-category sitemaps listing every unit pair
+    SITEMAP_ALL_CONVERSIONS = os.environ.get('SITEMAP_ALL_CONVERSIONS', 'false').lower() in ('1', 'true', 'yes', 'on')
+    # Public URL root used for links in the sitemap and robots.txt, whatever Host a request names
+    SITEMAP_BASE_URL = os.environ.get('SITEMAP_BASE_URL', 'https://anyunit.com/')
@@ -34,7 +34,7 @@ def app_context(app):
 
 
 @pytest.fixture
-def unit_manager(app_context):
-    """Create UnitManager instance within app context."""
-    from app.utils.unit_converter import UnitManager
-    return UnitManager()
+def registry(app_context):
+    """Return the app's UnitRegistry within an app context."""
+    from app.utils.unit_converter import get_unit_registry
+    return get_unit_registry()
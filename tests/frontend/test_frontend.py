@@ -184,6 +184,15 @@ class TestTextFileConverterStructure:
         assert 'XML' in html
         assert 'CSV' in html
 
+    def test_text_page_uploads_to_server(self, client):
+        """Test the text file page offers a file upload and converts on the server."""
+        html = client.get('/text/').data.decode('utf-8')
+        script = client.get('/static/js/text_file_converter.js').data.decode('utf-8')
+
+        assert 'id="file-input"' in html
+        assert '/text/api/convert/' in script
+        assert 'getReader()' in script
+
 
 class TestTimezoneConverterStructure:
     """Tests for timezone converter page structure."""
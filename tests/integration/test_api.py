@@ -1,7 +1,11 @@
 """Integration tests for API endpoints."""
 
-import pytest
+import io
 import json
+import threading
+import time
+
+import pytest
 
 
 class TestConvertApi:
@@ -151,6 +155,41 @@ class TestConvertApi:
         assert data['result'] == pytest.approx(1000.0)
 
 
+class TestConvertEndpointsAgree:
+    """Tests that both conversion endpoints share one implementation."""
+
+    @pytest.mark.parametrize('payload', [
+        {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 1},
+        {'category': 'temperature', 'fromUnit': 'c', 'toUnit': 'f', 'value': '-40'},
+        {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 'abc'},
+        {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft'},
+        {'category': 'length', 'fromUnit': 'm', 'toUnit': 'nope', 'value': 1},
+    ])
+    def test_same_response(self, client, payload):
+        """Test /api/convert and /convert/api/convert respond identically."""
+        first = client.post('/api/convert', data=json.dumps(payload), content_type='application/json')
+        second = client.post('/convert/api/convert', data=json.dumps(payload), content_type='application/json')
+
+        assert first.status_code == second.status_code
+        assert first.get_json() == second.get_json()
+
+
+class TestConvertLocale:
+    """Tests for locale-aware formatted results."""
+
+    def test_locale_formatting(self, client):
+        """Test the optional locale changes only the formatted string."""
+        response = client.post('/api/convert',
+            data=json.dumps({'category': 'length', 'fromUnit': 'km', 'toUnit': 'm',
+                             'value': 1.2345, 'locale': 'de'}),
+            content_type='application/json'
+        )
+
+        data = response.get_json()
+        assert data['result'] == pytest.approx(1234.5)
+        assert data['formatted'] == '1.234,5'
+
+
 class TestAviationFuelCalcApi:
     """Tests for /aviation/api/aviation/fuel-calc endpoint."""
 
@@ -302,6 +341,184 @@ class TestAviationDensityAltitudeApi:
         assert 'density_altitude' in data
 
 
+class TestAviationBatchApi:
+    """Tests for /aviation/api/aviation/batch endpoint."""
+
+    def test_columnar_results(self, client):
+        """Test list and scalar inputs broadcast into columns."""
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({
+                'calculation': 'crosswind',
+                'inputs': {'windSpeed': 20, 'windAngle': [0, 90, 'bad']}
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 3
+        assert data['results']['crosswind'][:2] == [0.0, 20.0]
+        assert data['results']['headwind'][0] == 20.0
+        assert data['results']['crosswind'][2] is None
+        assert data['errors'] == [{'index': 2, 'error': 'Inputs must be finite numbers'}]
+
+    def test_fuel_defaults(self, client):
+        """Test optional wind inputs default like the scalar endpoint."""
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({
+                'calculation': 'fuel',
+                'inputs': {'distance': [100, 200], 'indicatedAirspeed': 100,
+                           'fuelConsumption': 10, 'reserveTime': 45}
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['results']['fuel_required'] == [17.5, 27.5]
+
+    def test_missing_input(self, client):
+        """Test a missing required input is rejected."""
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({'calculation': 'density-altitude', 'inputs': {'temperature': [15]}}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert 'pressureAltitude' in response.get_json()['error']
+
+    def test_unknown_calculation(self, client):
+        """Test an unknown calculation id is rejected."""
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({'calculation': 'nope', 'inputs': {}}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+    def test_mismatched_lengths(self, client):
+        """Test columns of different lengths are rejected."""
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({'calculation': 'crosswind',
+                             'inputs': {'windSpeed': [1, 2], 'windAngle': [0, 1, 2]}}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+    def test_too_many_rows(self, app, client):
+        """Test requests over the row limit are rejected."""
+        app.config['AVIATION_BATCH_MAX_ITEMS'] = 2
+        response = client.post('/aviation/api/aviation/batch',
+            data=json.dumps({'calculation': 'crosswind',
+                             'inputs': {'windSpeed': [1, 2, 3], 'windAngle': 0}}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 413
+
+
+class TestAviationFlightPlanApi:
+    """Tests for /aviation/api/aviation/flight-plan endpoint."""
+
+    def test_legs(self, client):
+        """Test a plan of legs with per-leg winds."""
+        response = client.post('/aviation/api/aviation/flight-plan',
+            data=json.dumps({
+                'trueAirspeed': 100,
+                'fuelFlow': 10,
+                'reserveTime': 45,
+                'legs': [
+                    {'name': 'KAAA-KBBB', 'distance': 100, 'course': 0, 'windSpeed': 20, 'windDirection': 0},
+                    {'distance': 60, 'course': 90, 'fuelFlow': 8}
+                ]
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['legs']) == 2
+        assert data['legs'][0]['ground_speed'] == 80.0
+        assert data['legs'][1]['cumulative_time'] == 111.0
+        assert data['totals']['trip_fuel'] == 17.3
+        assert data['totals']['reserve_fuel'] == 6.0
+
+    def test_waypoints(self, client):
+        """Test a plan of waypoints is turned into great-circle legs."""
+        response = client.post('/aviation/api/aviation/flight-plan',
+            data=json.dumps({
+                'trueAirspeed': 120,
+                'fuelFlow': 9,
+                'waypoints': [
+                    {'name': 'A', 'lat': 50.0, 'lon': 14.0},
+                    {'name': 'B', 'lat': 50.5, 'lon': 14.0, 'windSpeed': 15, 'windDirection': 270}
+                ]
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['legs'][0]['name'] == 'A-B'
+        assert data['legs'][0]['distance'] == 30.02
+
+    def test_invalid_leg(self, client):
+        """Test an invalid leg returns an error naming the leg."""
+        response = client.post('/aviation/api/aviation/flight-plan',
+            data=json.dumps({'trueAirspeed': 100, 'fuelFlow': 10,
+                             'legs': [{'distance': 10, 'course': 400}]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert 'Leg 0' in response.get_json()['error']
+
+    def test_nan_reserve_time(self, client):
+        """Test a NaN reserve time is rejected instead of producing invalid JSON."""
+        response = client.post('/aviation/api/aviation/flight-plan',
+            data=json.dumps({'trueAirspeed': 100, 'fuelFlow': 10, 'reserveTime': 'nan',
+                             'legs': [{'distance': 10, 'course': 90}]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert 'finite' in response.get_json()['error']
+
+    def test_missing_legs(self, client):
+        """Test a plan without legs is rejected."""
+        response = client.post('/aviation/api/aviation/flight-plan',
+            data=json.dumps({'trueAirspeed': 100}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+
+class TestAviationTablesApi:
+    """Tests for /aviation/api/aviation/tables.<fmt> endpoint."""
+
+    def test_binary_tables(self, client):
+        """Test the binary lookup tables are served with caching headers."""
+        response = client.get('/aviation/api/aviation/tables.bin')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/octet-stream'
+        assert response.data[:4] == b'AVTB'
+        assert 'max-age' in response.headers['Cache-Control']
+
+        cached = client.get('/aviation/api/aviation/tables.bin',
+                            headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+
+    def test_json_tables(self, client):
+        """Test the JSON lookup tables list both grids."""
+        response = client.get('/aviation/api/aviation/tables.json')
+
+        assert response.status_code == 200
+        assert set(response.get_json()['tables']) == {'densityAltitude', 'crosswind'}
+
+
 class TestMarkdownApi:
     """Tests for markdown conversion endpoint."""
 
@@ -342,3 +559,511 @@ class TestMarkdownApi:
         )
 
         assert response.status_code == 400
+
+    def test_download_docx(self, client):
+        """Test markdown DOCX download is built in memory."""
+        response = client.post('/markdown/download/docx',
+            data={'markdown': '# Hello\n\n- item'}
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        assert 'markdown_conversion.docx' in response.headers['Content-Disposition']
+        assert response.data[:2] == b'PK'
+
+    def test_download_docx_no_markdown(self, client):
+        """Test DOCX download with no markdown provided."""
+        response = client.post('/markdown/download/docx', data={})
+
+        assert response.status_code == 400
+
+
+class TestMarkdownPreviewApi:
+    """Tests for incremental markdown preview endpoint."""
+
+    def post(self, client, payload):
+        return client.post('/markdown/preview', data=json.dumps(payload), content_type='application/json')
+
+    def test_load_and_patch(self, client):
+        """Test loading a document and patching one block."""
+        response = self.post(client, {'documentId': 'doc-1', 'markdown': '# A\n\ntext\n\n# B'})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['blocks'] == ['<h1>A</h1>', '<p>text</p>', '<h1>B</h1>']
+
+        response = self.post(client, {
+            'documentId': 'doc-1',
+            'revision': data['revision'],
+            'edit': {'start': 2, 'end': 3, 'lines': ['*text*']}
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['patch'] == {'start': 1, 'deleteCount': 1, 'html': ['<p><em>text</em></p>']}
+        assert data['blockCount'] == 3
+
+    def test_unknown_document_requests_resync(self, client):
+        """Test edits to an unknown document ask the client to resend the text."""
+        response = self.post(client, {'documentId': 'missing', 'revision': 1,
+                                      'edit': {'start': 0, 'end': 0, 'lines': []}})
+        assert response.status_code == 409
+        assert response.get_json()['resync'] is True
+
+    def test_stale_revision_requests_resync(self, client):
+        """Test edits against an old revision ask the client to resync."""
+        self.post(client, {'documentId': 'doc-2', 'markdown': 'text'})
+        response = self.post(client, {'documentId': 'doc-2', 'revision': 99,
+                                      'edit': {'start': 0, 'end': 1, 'lines': ['x']}})
+        assert response.status_code == 409
+
+    def test_document_too_large(self, app, client):
+        """Test a document over the per-document limit gets 413."""
+        app.extensions['markdown_previews'].max_document_bytes = 20
+        response = self.post(client, {'documentId': 'big', 'markdown': 'x' * 50})
+        assert response.status_code == 413
+        assert response.get_json()['success'] is False
+
+    def test_invalid_payloads(self, client):
+        """Test missing ids and malformed edits are rejected."""
+        assert self.post(client, {'markdown': 'x'}).status_code == 400
+        self.post(client, {'documentId': 'doc-3', 'markdown': 'text'})
+        assert self.post(client, {'documentId': 'doc-3', 'revision': 1,
+                                  'edit': {'start': 0, 'end': 9, 'lines': []}}).status_code == 400
+        assert self.post(client, {'documentId': 'doc-3', 'revision': 1,
+                                  'edit': {'start': 'a', 'end': 1, 'lines': []}}).status_code == 400
+
+
+class TestMarkdownExportJobsApi:
+    """Tests for background markdown export jobs."""
+
+    @pytest.fixture
+    def app(self):
+        from app import create_app
+        from tests.conftest import TestConfig
+
+        class LocalJobsConfig(TestConfig):
+            EXPORT_JOBS_LOCAL = True
+        return create_app(LocalJobsConfig)
+
+    def wait(self, client, job):
+        for _ in range(200):
+            job = client.get(job['statusUrl']).get_json()
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.01)
+        raise AssertionError('export job did not finish')
+
+    def test_small_export_stays_synchronous(self, client):
+        """Test documents under the threshold are returned directly."""
+        response = client.post('/markdown/download/html', data={'markdown': '# Hi'})
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+
+    def test_docx_job(self, client):
+        """Test a DOCX job can be polled and its file fetched."""
+        response = client.post('/markdown/download/docx', data={'markdown': '# Big\n\ntext', 'async': '1'})
+
+        assert response.status_code == 202
+        job = response.get_json()
+        assert response.headers['Location'] == job['statusUrl']
+        assert job['deduplicated'] is False
+        job = self.wait(client, job)
+        assert job['status'] == 'done'
+        assert job['progress'] == 1.0
+
+        result = client.get(job['resultUrl'])
+        assert result.status_code == 200
+        assert 'markdown_conversion.docx' in result.headers['Content-Disposition']
+        assert result.data[:2] == b'PK'
+
+    def test_threshold_and_dedupe(self, app, client):
+        """Test large documents become jobs and equal documents share one."""
+        app.config['EXPORT_ASYNC_THRESHOLD'] = 10
+        first = client.post('/markdown/download/html', data={'markdown': '# A long enough document'})
+        second = client.post('/markdown/download/html', data={'markdown': '# A long enough document'})
+        other = client.post('/markdown/download/docx', data={'markdown': '# A long enough document'})
+
+        assert first.status_code == second.status_code == other.status_code == 202
+        assert second.get_json()['jobId'] == first.get_json()['jobId']
+        assert second.get_json()['deduplicated'] is True
+        assert other.get_json()['jobId'] != first.get_json()['jobId']
+        job = self.wait(client, first.get_json())
+        assert b'<h1>A long enough document</h1>' in client.get(job['resultUrl']).data
+
+    def test_result_not_ready(self, app, client):
+        """Test fetching an unfinished job returns 409 with its status."""
+        release = threading.Event()
+        job, _ = app.extensions['export_jobs'].submit('html', 'pending', lambda progress: release.wait(5) and b'x')
+        try:
+            response = client.get(f'/markdown/jobs/{job.id}/result')
+            assert response.status_code == 409
+            assert response.get_json()['status'] in ('queued', 'running')
+        finally:
+            release.set()
+
+    def test_unknown_job(self, client):
+        """Test unknown job ids return 404."""
+        assert client.get('/markdown/jobs/missing').status_code == 404
+        assert client.get('/markdown/jobs/missing/result').status_code == 404
+
+    def test_queue_full(self, app, client):
+        """Test new jobs beyond the pending limit get a 503."""
+        queue = app.extensions['export_jobs']
+        release = threading.Event()
+        queue.max_pending = 1
+        queue.submit('html', 'blocking', lambda progress: release.wait(5) and b'x')
+        try:
+            response = client.post('/markdown/download/html', data={'markdown': '# New', 'async': '1'})
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '5'
+        finally:
+            release.set()
+
+    def test_synchronous_without_shared_backend(self):
+        """Test exports stay synchronous when jobs would not survive multi-worker polling."""
+        from app import create_app
+        from tests.conftest import TestConfig
+
+        app = create_app(TestConfig)
+        app.config['EXPORT_ASYNC_THRESHOLD'] = 1
+        client = app.test_client()
+        assert app.extensions['export_jobs'] is None
+        response = client.post('/markdown/download/docx', data={'markdown': '# Big', 'async': '1'})
+        assert response.status_code == 200
+        assert response.data[:2] == b'PK'
+        assert client.get('/markdown/jobs/abc').status_code == 404
+        assert 'const exportAsyncThreshold = 0;' in client.get('/markdown/').get_data(as_text=True)
+
+
+class TestConvertBatchApi:
+    """Tests for /api/convert/batch endpoint."""
+
+    def test_shared_pair_values(self, client):
+        """Test converting a list of values for one unit pair."""
+        response = client.post('/api/convert/batch',
+            data=json.dumps({
+                'category': 'length',
+                'fromUnit': 'm',
+                'toUnit': 'km',
+                'values': [1000, 2500, '500']
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['count'] == 3
+        assert data['results'] == pytest.approx([1.0, 2.5, 0.5])
+        assert data['formatted'] == ['1', '2.5', '0.5']
+        assert data['errors'] == []
+
+    def test_items_keep_request_order(self, client):
+        """Test mixed unit pairs are returned in request order."""
+        response = client.post('/api/convert/batch',
+            data=json.dumps({
+                'items': [
+                    {'category': 'temperature', 'fromUnit': 'c', 'toUnit': 'f', 'value': 100},
+                    {'category': 'length', 'fromUnit': 'km', 'toUnit': 'm', 'value': 1},
+                    {'category': 'temperature', 'fromUnit': 'c', 'toUnit': 'f', 'value': 0}
+                ]
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['results'] == pytest.approx([212.0, 1000.0, 32.0])
+
+    def test_per_item_errors(self, client):
+        """Test invalid items are reported without failing the batch."""
+        response = client.post('/api/convert/batch',
+            data=json.dumps({
+                'items': [
+                    {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 1},
+                    {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 'abc'},
+                    {'category': 'invalid', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 1},
+                    {'category': 'length', 'fromUnit': 'm'}
+                ]
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['results'][0] == pytest.approx(3.28084, rel=1e-4)
+        assert data['results'][1:] == [None, None, None]
+        assert [e['index'] for e in data['errors']] == [1, 2, 3]
+        assert data['errors'][0]['error'] == 'Invalid value provided'
+        assert data['errors'][1]['error'] == 'Invalid conversion'
+
+    def test_huge_int_value(self, client):
+        """Test an int too large for a float fails only its own item."""
+        response = client.post('/api/convert/batch',
+            data='{"category": "length", "fromUnit": "m", "toUnit": "km", "values": [1000, 1%s]}' % ('0' * 400),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['results'] == [1.0, None]
+        assert [e['index'] for e in data['errors']] == [1]
+
+    def test_item_cap(self, app, client):
+        """Test requests over the configured item cap are rejected."""
+        app.config['BATCH_CONVERT_MAX_ITEMS'] = 2
+        response = client.post('/api/convert/batch',
+            data=json.dumps({
+                'category': 'length',
+                'fromUnit': 'm',
+                'toUnit': 'km',
+                'values': [1, 2, 3]
+            }),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 413
+        assert response.get_json()['success'] is False
+
+    def test_missing_fields(self, client):
+        """Test batch conversion without values or items."""
+        response = client.post('/api/convert/batch',
+            data=json.dumps({'category': 'length'}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+
+
+class TestSearchApi:
+    """Tests for /api/search endpoint."""
+
+    def test_search_units(self, client):
+        """Test searching returns ranked units."""
+        response = client.get('/api/search?q=meter')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['units'][0]['name'] == 'Meter'
+        assert 'popularConversions' in data
+
+    def test_search_is_cacheable(self, app, client):
+        """Test search responses are cached and carry cache headers."""
+        response = client.get('/api/search?q=kg')
+
+        assert 'public' in response.headers['Cache-Control']
+        assert len(app.extensions['search_cache']) == 1
+        repeat = client.get('/api/search?q=kg', headers={'If-None-Match': response.headers['ETag']})
+        assert repeat.status_code == 304
+
+    def test_search_empty_query(self, client):
+        """Test an empty query returns empty results."""
+        response = client.get('/api/search')
+
+        assert response.status_code == 200
+        assert response.get_json()['units'] == []
+
+
+class TestTimezoneLookupApi:
+    """Tests for /time/api/lookup endpoint."""
+
+    def test_lookup_city(self, client):
+        """Test looking up a city by name."""
+        response = client.get('/time/api/lookup?city=tirana')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['city']['timezone'] == 'Europe/Tirane'
+        assert data['zone']['offset'] == '+01:00'
+
+    def test_lookup_offset(self, client):
+        """Test looking up cities by UTC offset."""
+        response = client.get('/time/api/lookup?offset=%2B01:00')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert any(city['name'] == 'Tirana' for city in data['cities'])
+
+    def test_lookup_unknown_city(self, client):
+        """Test unknown cities return 404."""
+        response = client.get('/time/api/lookup?city=atlantis')
+
+        assert response.status_code == 404
+        assert response.get_json()['success'] is False
+
+    def test_lookup_missing_params(self, client):
+        """Test lookup without parameters returns 400."""
+        response = client.get('/time/api/lookup')
+
+        assert response.status_code == 400
+
+
+class TestTextFileConvertApi:
+    """Tests for /text/api/convert/<conversion> endpoint."""
+
+    def test_upload_conversion(self, client):
+        """Test converting an uploaded file."""
+        response = client.post('/text/api/convert/csv-to-json',
+            data={'file': (io.BytesIO(b'id,name\n1,Jane\n'), 'data.csv')},
+            content_type='multipart/form-data'
+        )
+
+        assert response.status_code == 200
+        assert response.content_type == 'application/json'
+        assert 'converted.json' in response.headers['Content-Disposition']
+        assert json.loads(response.data) == [{'id': 1, 'name': 'Jane'}]
+
+    def test_raw_body_conversion(self, client):
+        """Test converting a raw request body."""
+        response = client.post('/text/api/convert/xml-to-csv',
+            data=b'<a><r><x>1</x></r><r><x>2</x></r></a>',
+            content_type='application/xml'
+        )
+
+        assert response.status_code == 200
+        assert response.data == b'x\n1\n2\n'
+
+    def test_invalid_input(self, client):
+        """Test invalid input returns 400 before streaming."""
+        response = client.post('/text/api/convert/json-to-csv',
+            data=b'{"broken": ',
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    def test_unstreamable_json_too_large(self, client, monkeypatch):
+        """Test JSON that must be parsed whole is refused with 413 past the size cap."""
+        from app.utils import text_converters
+        monkeypatch.setattr(text_converters, 'MAX_DOCUMENT_SIZE', 32)
+        response = client.post('/text/api/convert/json-to-xml',
+            data=json.dumps({'a': 'x' * 20, 'b': 'y' * 20}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 413
+        assert response.get_json()['success'] is False
+
+        streamed = client.post('/text/api/convert/json-to-xml',
+            data=json.dumps({'rows': [{'a': 'x' * 20}, {'a': 'y' * 20}]}),
+            content_type='application/json'
+        )
+        assert streamed.status_code == 200
+
+    def test_empty_input(self, client):
+        """Test an empty body returns 400."""
+        response = client.post('/text/api/convert/json-to-csv')
+
+        assert response.status_code == 400
+
+    def test_unknown_conversion(self, client):
+        """Test unknown conversion types return 404."""
+        response = client.post('/text/api/convert/yaml-to-json', data=b'a: 1')
+
+        assert response.status_code == 404
+
+
+class TestInstrumentation:
+    """Tests for opt-in Server-Timing headers and /metrics."""
+
+    @pytest.fixture
+    def instrumented_client(self):
+        from app import create_app
+        from tests.conftest import TestConfig
+
+        class InstrumentedConfig(TestConfig):
+            INSTRUMENTATION_ENABLED = True
+        return create_app(InstrumentedConfig).test_client()
+
+    def test_disabled_by_default(self, client):
+        """Test no header or metrics endpoint without the setting."""
+        response = client.get('/convert/length/')
+        assert 'Server-Timing' not in response.headers
+        assert client.get('/metrics').status_code == 404
+
+    def test_server_timing(self, instrumented_client):
+        """Test pages report their template and meta tag spans."""
+        response = instrumented_client.get('/convert/length/m-to-ft')
+        timing = response.headers['Server-Timing']
+        assert 'render_template;dur=' in timing
+        assert 'generate_meta_tags;dur=' in timing
+        assert 'total;dur=' in timing
+
+    def test_metrics_endpoint(self, instrumented_client):
+        """Test /metrics exposes per-endpoint latency and span histograms."""
+        instrumented_client.post('/api/convert', json={'category': 'length', 'fromUnit': 'm',
+                                                       'toUnit': 'ft', 'value': 1})
+        instrumented_client.post('/markdown/convert', json={'markdown': '# Title'})
+        response = instrumented_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        text = response.get_data(as_text=True)
+        assert 'anyunit_requests_total{endpoint="api.convert",method="POST",status="200"} 1' in text
+        assert 'anyunit_span_duration_seconds_count{span="unit_registry_load"} 1' in text
+        assert 'span="markdown_render"' in text
+
+
+class TestAdminProfilerApi:
+    """Tests for the token-protected /admin/profiler endpoints."""
+
+    TOKEN = {'Authorization': 'Bearer test-admin-token'}
+
+    @pytest.fixture
+    def admin_client(self):
+        from app import create_app
+        from tests.conftest import TestConfig
+
+        class AdminConfig(TestConfig):
+            ADMIN_TOKEN = 'test-admin-token'
+            PROFILER_MAX_SECONDS = 5
+        app = create_app(AdminConfig)
+        yield app.test_client()
+        app.extensions['stack_sampler'].stop()
+
+    def test_hidden_without_token_setting(self, client):
+        """Test the admin endpoints do not exist unless ADMIN_TOKEN is set."""
+        assert client.get('/admin/profiler').status_code == 404
+
+    def test_requires_token(self, admin_client):
+        """Test missing or wrong bearer tokens are rejected."""
+        assert admin_client.get('/admin/profiler').status_code == 401
+        response = admin_client.get('/admin/profiler', headers={'Authorization': 'Bearer wrong'})
+        assert response.status_code == 401
+
+    def test_invalid_duration(self, admin_client):
+        """Test durations beyond PROFILER_MAX_SECONDS are rejected."""
+        response = admin_client.post('/admin/profiler/start', json={'seconds': 60}, headers=self.TOKEN)
+        assert response.status_code == 400
+
+    def test_non_object_body(self, admin_client):
+        """Test JSON bodies that are not objects are rejected."""
+        for body in ([], 5, 'seconds'):
+            response = admin_client.post('/admin/profiler/start', json=body, headers=self.TOKEN)
+            assert response.status_code == 400
+            assert response.get_json()['success'] is False
+
+    def test_profile_round_trip(self, admin_client):
+        """Test a profile attributes samples to blueprints and exports collapsed stacks."""
+        response = admin_client.post('/admin/profiler/start', json={'seconds': 5, 'interval': 0.001},
+                                     headers=self.TOKEN)
+        assert response.status_code == 202
+        assert response.get_json()['state'] == 'running'
+        assert admin_client.post('/admin/profiler/start', json={'seconds': 1}, headers=self.TOKEN).status_code == 409
+
+        for i in range(20):
+            admin_client.post('/markdown/convert', json={'markdown': f'# Heading {i}\n\n' + '*text* ' * 2000})
+        status = admin_client.post('/admin/profiler/stop', headers=self.TOKEN).get_json()
+
+        assert status['state'] == 'finished'
+        assert status['samples'] > 0
+        assert status['blueprints'].get('markdown', 0) > 0
+        response = admin_client.get('/admin/profiler/profile.collapsed?blueprint=markdown', headers=self.TOKEN)
+        assert response.headers['X-Profile-State'] == 'finished'
+        line = response.get_data(as_text=True).splitlines()[0]
+        assert 'app.routes.markdown_converter:convert' in line
+        assert line.rsplit(' ', 1)[1].isdigit()
+
@@ -0,0 +1,288 @@
+"""Integration tests for the ASGI entry point."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from werkzeug.exceptions import ClientDisconnected
+from app.asgi import HEAVY, PAGE, AsgiApp, BoundedExecutor, ExecutorSaturated, RequestBody, route_policy
+
+
+async def asgi_exchange(asgi_app, method, path, body=b'', headers=(), query=b'', chunks=None):
+    """Drive one HTTP request through an ASGI app; returns every message it sent.
+
+    ``chunks`` sends the body as several ``http.request`` messages.
+    """
+    chunks = [body] if chunks is None else chunks
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'root_path': '', 'query_string': query,
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+    await asgi_app(scope, receive, send)
+    return sent
+
+
+async def asgi_request(asgi_app, method, path, **kwargs):
+    """Drive one HTTP request through an ASGI app; returns (status, headers, body)"""
+    sent = await asgi_exchange(asgi_app, method, path, **kwargs)
+    start = sent[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def request(asgi_app, method, path, **kwargs):
+    return asyncio.run(asgi_request(asgi_app, method, path, **kwargs))
+
+
+def post_json(asgi_app, path, data):
+    return request(asgi_app, 'POST', path, body=json.dumps(data).encode(),
+                   headers=[('Content-Type', 'application/json')])
+
+
+@pytest.fixture
+def asgi_app(app):
+    return AsgiApp(app)
+
+
+class TestRoutePolicy:
+    """Tests for cost-based routing."""
+
+    def test_policies(self):
+        """Test cheap, heavy and page routes are told apart."""
+        assert route_policy('/aviation/api/aviation/ground-speed') == PAGE
+        assert route_policy('/aviation/api/aviation/batch') == HEAVY
+        assert route_policy('/aviation/api/aviation/tables.json') == HEAVY
+        assert route_policy('/markdown/jobs/abc') == PAGE
+        assert route_policy('/api/search') == PAGE
+        assert route_policy('/markdown/download/docx') == HEAVY
+        assert route_policy('/text/api/convert/json-to-csv') == HEAVY
+        assert route_policy('/convert/length/m-to-ft') == PAGE
+
+
+class TestAsgiConvert:
+    """Tests for the native convert handler."""
+
+    def test_matches_flask(self, asgi_app, client):
+        """Test both convert paths return what the Flask endpoints return."""
+        bodies = [
+            {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 100},
+            {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 'abc'},
+            {'category': 'length', 'fromUnit': 'm'},
+            {'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 1234.5, 'locale': 'de'},
+        ]
+        for path in ('/api/convert', '/convert/api/convert'):
+            for body in bodies:
+                status, headers, payload = post_json(asgi_app, path, body)
+                expected = client.post(path, json=body)
+                assert status == expected.status_code
+                assert headers[b'content-type'] == b'application/json'
+                assert json.loads(payload) == expected.get_json()
+
+    def test_non_json_body(self, asgi_app):
+        """Test bodies that are not JSON are treated as missing data."""
+        status, _, payload = request(asgi_app, 'POST', '/api/convert', body=b'{"value": 1}',
+                                     headers=[('Content-Type', 'text/plain')])
+        assert status == 400
+        assert json.loads(payload)['error'] == 'No data provided'
+
+    def test_body_too_large(self, asgi_app):
+        """Test the native handler refuses oversized bodies instead of buffering them."""
+        status, _, _ = request(asgi_app, 'POST', '/api/convert', chunks=[b' ' * 40000] * 3,
+                               headers=[('Content-Type', 'application/json')])
+        assert status == 413
+
+
+class TestAsgiDispatch:
+    """Tests for requests served through Flask."""
+
+    def test_aviation(self, asgi_app, client):
+        """Test cheap aviation endpoints run through Flask off the event loop."""
+        body = {'indicatedAirspeed': 120, 'windSpeed': 20, 'windDirection': 270,
+                'heading': 360, 'temperature': 15}
+        status, _, payload = post_json(asgi_app, '/aviation/api/aviation/ground-speed', body)
+        assert status == 200
+        assert json.loads(payload) == client.post('/aviation/api/aviation/ground-speed', json=body).get_json()
+
+    def test_heavy_docx(self, asgi_app):
+        """Test DOCX export runs on the heavy executor."""
+        status, headers, payload = request(
+            asgi_app, 'POST', '/markdown/download/docx', body=b'markdown=%23+Title',
+            headers=[('Content-Type', 'application/x-www-form-urlencoded')])
+        assert status == 200
+        assert payload[:2] == b'PK'
+        assert b'attachment' in headers[b'content-disposition']
+
+    def test_page(self, asgi_app):
+        """Test pages, query strings and headers pass through to Flask."""
+        status, headers, payload = request(asgi_app, 'GET', '/convert/length/m-to-ft')
+        assert status == 200
+        assert b'text/html' in headers[b'content-type']
+        status, _, _ = request(asgi_app, 'GET', '/convert/length/m-to-ft',
+                               headers=[('If-None-Match', headers[b'etag'].decode())])
+        assert status == 304
+        status, _, payload = request(asgi_app, 'GET', '/api/search', query=b'q=meter')
+        assert status == 200 and json.loads(payload)
+
+    def test_flask_runs_off_the_loop(self, app, asgi_app):
+        """Test no Flask handler runs on the event loop thread."""
+        threads = []
+        app.add_url_rule('/_thread', '_thread', lambda: threads.append(threading.current_thread()) or 'ok')
+        status, _, _ = request(asgi_app, 'GET', '/_thread')
+        assert status == 200
+        assert threads[0] is not threading.main_thread()
+
+    def test_streamed_request_and_response(self, asgi_app):
+        """Test a chunked upload is read incrementally and the result streamed back in pieces."""
+        rows = b''.join(b'%d,name %d,%d.5\n' % (i, i, i) for i in range(20000))
+        upload = b'id,name,value\n' + rows
+        chunks = [upload[i:i + 10000] for i in range(0, len(upload), 10000)]
+        sent = asyncio.run(asgi_exchange(asgi_app, 'POST', '/text/api/convert/csv-to-json', chunks=chunks,
+                                         headers=[('Content-Type', 'text/csv')]))
+
+        assert sent[0]['status'] == 200
+        bodies = [message for message in sent[1:] if message['type'] == 'http.response.body']
+        assert len(bodies) > 2
+        assert all(message['more_body'] for message in bodies[:-1])
+        assert not bodies[-1]['more_body']
+        records = json.loads(b''.join(message['body'] for message in bodies))
+        assert len(records) == 20000
+        assert records[-1] == {'id': 19999, 'name': 'name 19999', 'value': 19999.5}
+
+    def test_max_content_length(self, app, asgi_app):
+        """Test MAX_CONTENT_LENGTH is enforced for declared and streamed bodies."""
+        app.config['MAX_CONTENT_LENGTH'] = 1000
+        status, _, _ = request(asgi_app, 'POST', '/text/api/convert/csv-to-json', body=b'a\n' * 1000,
+                               headers=[('Content-Type', 'text/csv'), ('Content-Length', '2000')])
+        assert status == 413
+        status, _, _ = request(asgi_app, 'POST', '/text/api/convert/csv-to-json', chunks=[b'a\n' * 400] * 3,
+                               headers=[('Content-Type', 'text/csv')])
+        assert status == 413
+
+    def test_saturated_executor(self, asgi_app):
+        """Test heavy work beyond the queue limit gets a 503 instead of waiting."""
+        asgi_app.heavy = BoundedExecutor(1, 1, 'test-heavy')
+        asgi_app.heavy.pending = 1
+        status, headers, _ = request(asgi_app, 'POST', '/markdown/download/docx', body=b'markdown=x',
+                                     headers=[('Content-Type', 'application/x-www-form-urlencoded')])
+        assert status == 503
+        assert headers[b'retry-after'] == b'1'
+
+    def test_convert_not_blocked_by_heavy_work(self, asgi_app):
+        """Test cheap conversions complete while the heavy executor is busy."""
+        release = threading.Event()
+
+        async def scenario():
+            asgi_app.heavy = BoundedExecutor(1, 4, 'test-heavy')
+            slow = asyncio.create_task(asgi_app.heavy.run(release.wait, 5))
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            for _ in range(50):
+                status, _, _ = await asgi_request(
+                    asgi_app, 'POST', '/api/convert',
+                    body=b'{"category": "length", "fromUnit": "m", "toUnit": "ft", "value": 1}',
+                    headers=[('Content-Type', 'application/json')])
+                assert status == 200
+            elapsed = time.perf_counter() - start
+            release.set()
+            await slow
+            return elapsed
+
+        assert asyncio.run(scenario()) < 1.0
+
+
+class TestBoundedExecutor:
+    """Tests for the bounded executor."""
+
+    def test_rejects_when_full(self):
+        """Test run raises once max_pending jobs are in flight."""
+        executor = BoundedExecutor(1, 1, 'test')
+
+        async def scenario():
+            release = threading.Event()
+            first = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(0)
+            with pytest.raises(ExecutorSaturated):
+                await executor.run(lambda: None)
+            release.set()
+            await first
+            assert executor.pending == 0
+
+        asyncio.run(scenario())
+        executor.shutdown()
+
+    def test_cancelled_job_stays_pending(self):
+        """Test a job still counts until its thread finishes after the caller is cancelled."""
+        executor = BoundedExecutor(1, 1, 'test')
+
+        async def scenario():
+            release = threading.Event()
+            first = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            with pytest.raises(ExecutorSaturated):
+                await executor.run(lambda: None)
+            release.set()
+            for _ in range(100):
+                if executor.pending == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert executor.pending == 0
+            assert await executor.run(lambda: 'ok') == 'ok'
+
+        asyncio.run(scenario())
+        executor.shutdown()
+
+    def test_lifespan(self, asgi_app):
+        """Test startup and shutdown are acknowledged."""
+        sent = []
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+class TestRequestBody:
+    """Tests for the streamed wsgi.input."""
+
+    def test_reads_after_disconnect_raise(self):
+        """Test every read after a disconnect raises instead of blocking."""
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def scenario():
+            body = RequestBody(asyncio.get_running_loop())
+            await body.pump(receive)
+
+            def read_twice():
+                errors = []
+                for read in (body.read, body.readline):
+                    try:
+                        read()
+                    except ClientDisconnected as e:
+                        errors.append(e)
+                return errors
+
+            return await asyncio.wait_for(asyncio.to_thread(read_twice), 2)
+
+        assert len(asyncio.run(scenario())) == 2
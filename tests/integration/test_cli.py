@@ -0,0 +1,71 @@
+"""Integration tests for Flask CLI commands."""
+
+import os
+
+from app.cli import output_path
+
+
+class TestOutputPath:
+    """Tests for mapping URL paths to pre-rendered files."""
+
+    def test_directory_path(self):
+        """Test paths ending in a slash map to index.html."""
+        assert output_path('out', '/convert/length/') == os.path.join('out', 'convert', 'length', 'index.html')
+
+    def test_root_path(self):
+        """Test the root path maps to index.html."""
+        assert output_path('out', '/') == os.path.join('out', 'index.html')
+
+    def test_extensionless_path(self):
+        """Test extensionless paths get an .html suffix."""
+        assert output_path('out', '/convert/length/m-to-ft') == os.path.join('out', 'convert', 'length', 'm-to-ft.html')
+
+    def test_path_with_extension(self):
+        """Test paths with an extension are written as-is."""
+        assert output_path('out', '/sitemap.xml') == os.path.join('out', 'sitemap.xml')
+
+
+class TestPrerenderCommand:
+    """Tests for the prerender command."""
+
+    def test_prerender_writes_pages(self, app, tmp_path):
+        """Test prerender renders converter, category and site pages."""
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['prerender', '--output', str(tmp_path),
+                                     '--workers', '1', '--base-url', 'https://example.com/'])
+
+        assert result.exit_code == 0, result.output
+        assert (tmp_path / 'index.html').exists()
+        assert (tmp_path / 'robots.txt').exists()
+        assert (tmp_path / 'convert' / 'length' / 'index.html').exists()
+        assert (tmp_path / 'convert' / 'temperature' / 'c-to-k.html').exists()
+        sitemap = (tmp_path / 'sitemap.xml').read_text()
+        assert 'https://example.com/convert/length' in sitemap
+
+    def test_worker_uses_command_config(self, app):
+        """Test process-pool workers are created with the running app's config."""
+        from app import cli
+        app.config['SITEMAP_ALL_CONVERSIONS'] = True
+        config = {key: value for key, value in app.config.items() if key.isupper()}
+        try:
+            cli._init_worker(config)
+            assert cli._worker_app.config['TESTING'] is True
+            assert cli._worker_app.config['SITEMAP_ALL_CONVERSIONS'] is True
+        finally:
+            cli._worker_app = None
+
+
+class TestBuildSnapshotCommand:
+    """Tests for the build-snapshot command."""
+
+    def test_writes_loadable_snapshot(self, app, tmp_path):
+        """Test build-snapshot writes a snapshot that matches the data files."""
+        from app.utils.data_snapshot import load_snapshot
+
+        path = tmp_path / 'data.snapshot'
+        result = app.test_cli_runner().invoke(args=['build-snapshot', '--output', str(path)])
+
+        assert result.exit_code == 0, result.output
+        snapshot = load_snapshot(str(path), os.path.join(app.static_folder, 'data'))
+        assert snapshot is not None
+        assert snapshot.version in result.output
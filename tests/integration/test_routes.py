@@ -1,5 +1,8 @@
 """Integration tests for page routes."""
 
+import gzip
+
+import brotli
 import pytest
 
 
@@ -49,6 +52,58 @@ class TestMainRoutes:
         assert b'<urlset' in response.data
         assert b'<url>' in response.data
 
+    def test_sitemap_gzip(self, client):
+        """Test sitemap is served precompressed with gzip."""
+        response = client.get('/sitemap.xml', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert b'<urlset' in gzip.decompress(response.data)
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    def test_sitemap_brotli(self, client):
+        """Test sitemap prefers brotli when accepted."""
+        response = client.get('/sitemap.xml', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert b'<urlset' in brotli.decompress(response.data)
+
+    def test_sitemap_conditional_get(self, client):
+        """Test sitemap answers If-None-Match with 304."""
+        response = client.get('/sitemap.xml')
+        repeat = client.get('/sitemap.xml', headers={'If-None-Match': response.headers['ETag']})
+
+        assert repeat.status_code == 304
+
+    def test_sitemap_index_shards(self, app, client):
+        """Test sitemap becomes an index of per-category sitemaps."""
+        app.config['SITEMAP_ALL_CONVERSIONS'] = True
+        response = client.get('/sitemap.xml')
+
+        assert b'<sitemapindex' in response.data
+        assert b'/sitemap-length.xml' in response.data
+        assert b'/sitemap-pages.xml' in response.data
+        shard = client.get('/sitemap-length.xml')
+        assert shard.status_code == 200
+        assert b'/convert/length/yd-to-mm' in shard.data
+
+    def test_sitemap_ignores_host_header(self, app, client):
+        """Test sitemap links and caching use SITEMAP_BASE_URL, not the Host header."""
+        app.config['SITEMAP_BASE_URL'] = 'https://canonical.example/'
+        for host in ('a.example', 'b.example', 'c.example'):
+            response = client.get('/sitemap.xml', headers={'Host': host})
+            assert b'https://canonical.example/convert/' in response.data
+            assert host.encode() not in response.data
+        assert len(app.extensions['sitemap_cache']) == 1
+        robots = client.get('/robots.txt', headers={'Host': 'a.example'})
+        assert b'Sitemap: https://canonical.example/sitemap.xml' in robots.data
+
+    def test_sitemap_unknown_shard(self, client):
+        """Test unknown sitemap shards return 404."""
+        response = client.get('/sitemap-length.xml')
+
+        assert response.status_code == 404
+
 
 class TestConverterRoutes:
     """Tests for converter blueprint routes."""
@@ -111,6 +166,53 @@ class TestConverterRoutes:
         # Should have common values table
         assert b'<table' in response.data or b'table' in response.data.lower()
 
+    def test_conversion_page_cached(self, app, client):
+        """Test conversion pages are rendered once and served from cache."""
+        first = client.get('/convert/length/m-to-km')
+        second = client.get('/convert/length/m-to-km')
+
+        assert first.status_code == 200
+        assert second.data == first.data
+        assert len(app.extensions['conversion_page_cache']) == 1
+
+    def test_conversion_tables_memoised(self, app, client):
+        """Test formatted common values tables are shared between pages."""
+        client.get('/convert/length/')
+        cached = len(app.extensions['conversion_table_cache'])
+        client.get('/convert/length/')
+
+        assert cached > 0
+        assert len(app.extensions['conversion_table_cache']) == cached
+
+    def test_conversion_page_query_bypasses_cache(self, app, client):
+        """Test conversion pages with a query string are not cached."""
+        response = client.get('/convert/length/m-to-km?value=5')
+
+        assert response.status_code == 200
+        assert b'value="5"' in response.data
+        assert len(app.extensions['conversion_page_cache']) == 0
+
+    def test_conversion_page_conditional_get(self, client):
+        """Test conversion pages honour ETag and Last-Modified."""
+        response = client.get('/convert/length/m-to-ft')
+        etag = response.headers['ETag']
+
+        assert response.headers.get('Last-Modified')
+        repeat = client.get('/convert/length/m-to-ft', headers={'If-None-Match': etag})
+        assert repeat.status_code == 304
+
+    def test_conversion_page_new_build_invalidates(self, app, client):
+        """Test a template or code change gives conversion pages a new ETag and cache entry."""
+        response = client.get('/convert/length/m-to-ft')
+        etag = response.headers['ETag']
+        build = app.extensions['build_version']
+        app.extensions['build_version'] = build._replace(version='0' * 16)
+
+        repeat = client.get('/convert/length/m-to-ft', headers={'If-None-Match': etag})
+        assert repeat.status_code == 200
+        assert repeat.headers['ETag'] != etag
+        assert len(app.extensions['conversion_page_cache']) == 2
+
     def test_category_normalization(self, client):
         """Test category name normalization (redirect)."""
         response = client.get('/convert/LENGTH/', follow_redirects=True)
@@ -162,6 +264,24 @@ class TestTimezoneRoutes:
 
         assert response.status_code == 200
 
+    def test_timezone_page_cached(self, app, client):
+        """Test the rendered timezone page is cached."""
+        first = client.get('/time/')
+        second = client.get('/time/')
+
+        assert second.data == first.data
+        assert len(app.extensions['timezone_page_cache']) == 1
+        assert 'timezone_index' in app.extensions
+
+    def test_timezone_page_not_cached_on_load_failure(self, app, client, monkeypatch):
+        """Test a page rendered from the empty fallback data is not cached."""
+        from app.routes import timezone
+        from app.utils.timezones import TimezoneIndex
+        monkeypatch.setattr(timezone, 'get_timezone_index', lambda: TimezoneIndex({}))
+
+        assert client.get('/time/').status_code == 200
+        assert len(app.extensions['timezone_page_cache']) == 0
+
 
 class TestTextFilesRoutes:
     """Tests for text files blueprint routes."""
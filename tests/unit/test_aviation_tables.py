@@ -0,0 +1,81 @@
+"""Unit tests for aviation_tables.py module."""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+from app.utils.aviation_calculations import calculate_crosswind, calculate_density_altitude
+from app.utils.aviation_tables import (
+    export_tables_binary,
+    export_tables_json,
+    get_tables,
+    lookup_crosswind,
+    lookup_density_altitude,
+)
+from app.utils.aviation_vectorized import calculate_crosswind_batch, calculate_density_altitude_batch
+
+
+class TestLookupAgreement:
+    """Tests that interpolated results agree with the direct calculators."""
+
+    def test_density_altitude_within_tolerance(self):
+        """Test random in-range inputs match calculate_density_altitude."""
+        grid = get_tables()['densityAltitude']
+        rng = np.random.default_rng(7)
+        altitude = rng.uniform(0, 45000, 5000)
+        temperature = rng.uniform(-60, 60, 5000)
+        table = grid.interpolate(altitude, temperature)['density_altitude']
+        direct = calculate_density_altitude_batch(altitude, temperature, decimals=None)['density_altitude']
+        assert np.abs(table - direct).max() <= grid.tolerance
+
+    def test_crosswind_within_tolerance(self):
+        """Test random in-range inputs match calculate_crosswind."""
+        grid = get_tables()['crosswind']
+        rng = np.random.default_rng(7)
+        speed = rng.uniform(0, 100, 5000)
+        angle = rng.uniform(0, 360, 5000)
+        table = grid.interpolate(speed, angle)
+        direct = calculate_crosswind_batch(speed, angle, decimals=None)
+        for channel in ('crosswind', 'headwind'):
+            assert np.abs(table[channel] - direct[channel]).max() <= grid.tolerance
+
+    def test_scalar_lookups(self):
+        """Test scalar lookups agree with the scalar calculators."""
+        assert lookup_density_altitude(5000, 30) == pytest.approx(
+            calculate_density_altitude(5000, 30)['density_altitude'], abs=0.01)
+        result = lookup_crosswind(20, 390)
+        expected = calculate_crosswind(20, 30)
+        assert result['crosswind'] == pytest.approx(expected['crosswind'], abs=0.01)
+        assert result['headwind'] == pytest.approx(expected['headwind'], abs=0.01)
+
+    def test_out_of_range(self):
+        """Test inputs outside the grid return None."""
+        assert lookup_density_altitude(50000, 15) is None
+        assert lookup_density_altitude(1000, 70) is None
+        assert lookup_crosswind(150, 10) is None
+
+
+class TestExport:
+    """Tests for exported table assets."""
+
+    def test_binary_layout(self):
+        """Test the binary asset header and float32 blocks round-trip."""
+        data = export_tables_binary()
+        assert data[:4] == b'AVTB'
+        header_length = struct.unpack('<I', data[4:8])[0]
+        assert (8 + header_length) % 4 == 0
+        header = json.loads(data[8:8 + header_length])
+        base = 8 + header_length
+        for name, grid in get_tables().items():
+            entry = header['tables'][name]
+            values = np.frombuffer(data, dtype='<f4', count=entry['length'] // 4,
+                                   offset=base + entry['offset'])
+            assert values.reshape(grid.values.shape) == pytest.approx(grid.values, abs=0.01)
+
+    def test_json_matches_grid(self):
+        """Test the JSON asset describes the same grid."""
+        document = json.loads(export_tables_json())
+        entry = document['tables']['densityAltitude']
+        assert entry['x'] == {'name': 'pressureAltitude', 'start': 0, 'step': 500, 'count': 91}
+        assert len(entry['values']) == 91 * 121
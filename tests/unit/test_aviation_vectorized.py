@@ -0,0 +1,116 @@
+"""Unit tests for aviation_vectorized.py module."""
+
+import itertools
+
+import numpy as np
+import pytest
+from app.utils.aviation_calculations import (
+    calculate_crosswind,
+    calculate_density_altitude,
+    calculate_fuel_requirements,
+    calculate_ground_speed,
+)
+from app.utils.aviation_vectorized import (
+    as_float_array,
+    calculate_crosswind_batch,
+    calculate_density_altitude_batch,
+    calculate_fuel_requirements_batch,
+    calculate_ground_speed_batch,
+)
+
+
+def rows(result, keys):
+    """Turn columnar results into per-row dicts of the given keys."""
+    return [dict(zip(keys, values)) for values in zip(*(result[k].tolist() for k in keys))]
+
+
+class TestAsFloatArray:
+    """Tests for input coercion."""
+
+    def test_unparseable_entries_become_nan(self):
+        """Test strings, None and booleans map to NaN."""
+        values = as_float_array([1, '2.5', None, 'abc', True])
+        assert values[:2].tolist() == [1.0, 2.5]
+        assert np.isnan(values[2:]).all()
+
+    def test_scalar(self):
+        """Test scalars stay scalars."""
+        assert as_float_array('3') == 3.0
+
+
+class TestMatchesScalarCalculators:
+    """Tests that batch results equal the scalar calculators row by row."""
+
+    def test_fuel_requirements(self):
+        """Test a wind/heading sweep matches calculate_fuel_requirements."""
+        combos = list(itertools.product([0, 15, 40], [0, 90, 225, 360], [0, 45, 180, 270]))
+        wind, direction, heading = (list(c) for c in zip(*combos))
+        result = calculate_fuel_requirements_batch(120, 110, 9.5, wind, direction, heading, 30)
+        keys = ['ground_speed', 'flight_time', 'fuel_required', 'reserve_fuel']
+        for row, (w, d, h) in zip(rows(result, keys), combos):
+            expected = calculate_fuel_requirements(120, 110, 9.5, w, d, h, 30)
+            assert row == pytest.approx(expected, abs=0.011)
+
+    def test_ground_speed(self):
+        """Test an altitude/temperature/heading sweep matches calculate_ground_speed."""
+        combos = list(itertools.product([0, 5000, 12000], [-20, 15, 35], [0, 135, 300]))
+        altitude, temperature, heading = (np.array(c) for c in zip(*combos))
+        result = calculate_ground_speed_batch(140, 25, 200, heading, temperature, altitude)
+        keys = ['ground_speed', 'density_altitude', 'headwind_component', 'crosswind_component']
+        for row, (a, t, h) in zip(rows(result, keys), combos):
+            expected = calculate_ground_speed(140, 25, 200, h, t, a)
+            assert row == pytest.approx(expected, abs=0.011)
+
+    def test_density_altitude(self):
+        """Test density altitude over a grid."""
+        result = calculate_density_altitude_batch([0, 5000, 30000], [15, 30, -45])
+        expected = [calculate_density_altitude(a, t)['density_altitude']
+                    for a, t in [(0, 15), (5000, 30), (30000, -45)]]
+        assert result['density_altitude'].tolist() == pytest.approx(expected)
+
+    def test_crosswind(self):
+        """Test crosswind components over angles."""
+        angles = [0, 30, 90, 180, 270]
+        result = calculate_crosswind_batch(20, angles)
+        for i, angle in enumerate(angles):
+            expected = calculate_crosswind(20, angle)
+            assert result['crosswind'][i] == pytest.approx(expected['crosswind'], abs=0.011)
+            assert result['headwind'][i] == pytest.approx(expected['headwind'], abs=0.011)
+
+
+class TestMaskValidation:
+    """Tests for per-row validation masks."""
+
+    def test_invalid_rows_are_reported_not_raised(self):
+        """Test each bad row gets the scalar calculator's message and NaN outputs."""
+        result = calculate_fuel_requirements_batch([100, -5, 100, 100], 100, 10,
+                                                   [0, 0, -1, 0], 0, [0, 0, 0, 400], 45)
+        assert result['error'].tolist() == [
+            None,
+            'Distance must be greater than zero',
+            'Wind speed cannot be negative',
+            'Heading must be between 0 and 360 degrees',
+        ]
+        assert result['ground_speed'][0] == 100.0
+        assert np.isnan(result['ground_speed'][1:]).all()
+
+    def test_first_failing_rule_wins(self):
+        """Test rows failing several rules report the first one, like the scalar version."""
+        result = calculate_ground_speed_batch(0, -1, 0, 0, 15)
+        assert result['error'][0] == 'Indicated airspeed must be greater than zero'
+
+    def test_nonfinite_inputs(self):
+        """Test NaN and unparseable inputs are rejected."""
+        result = calculate_density_altitude_batch([1000, 'x'], [15, 15])
+        assert result['error'].tolist() == [None, 'Inputs must be finite numbers']
+
+    def test_mismatched_lengths(self):
+        """Test columns of different lengths raise ValueError."""
+        with pytest.raises(ValueError):
+            calculate_crosswind_batch([1, 2, 3], [0, 90])
+
+    def test_unrounded(self):
+        """Test decimals=None skips rounding."""
+        result = calculate_crosswind_batch(10, 30, decimals=None)
+        assert result['crosswind'][0] == pytest.approx(5.0, abs=1e-12)
+        assert result['headwind'][0] == pytest.approx(10 * np.cos(np.radians(30)))
@@ -0,0 +1,104 @@
+"""Unit tests for the benchmark harness and suite."""
+
+import json
+
+import pytest
+
+from benchmarks.harness import check_regressions, check_thresholds, percentiles
+from benchmarks.suite import BENCHMARKS, DEFAULT_THRESHOLDS, main, markdown_document, run
+from benchmarks.unit_engine import LegacyConverter
+from benchmarks.unit_engine import run as run_unit_engine
+
+
+def result(p50, p95=None, ops=1000.0):
+    return {'count': 10, 'p50_us': p50, 'p95_us': p95 or p50, 'p99_us': p95 or p50,
+            'max_us': p95 or p50, 'ops_per_sec': ops}
+
+
+class TestHarness:
+    """Tests for percentile summaries and pass/fail checks."""
+
+    def test_percentiles(self):
+        """Test percentiles are reported in microseconds with throughput."""
+        summary = percentiles([i / 1e6 for i in range(1, 101)])
+        assert summary['count'] == 100
+        assert summary['p50_us'] == 51
+        assert summary['p99_us'] == 100
+        assert summary['ops_per_sec'] > 0
+
+    def test_thresholds(self):
+        """Test maxima, minimum throughput and benchmarks that did not run."""
+        results = {'a': result(5, p95=50, ops=10.0), 'b': result(1)}
+        thresholds = {'a': {'p95_us': 40, 'min_ops_per_sec': 20}, 'b': {'p95_us': 2}, 'c': {'p95_us': 1}}
+        failures = check_thresholds(results, thresholds)
+        assert len(failures) == 2
+        assert all(failure.startswith('a:') for failure in failures)
+
+    def test_regressions(self):
+        """Test only slowdowns beyond the allowed ratio fail."""
+        baseline = {'a': result(10), 'b': result(10)}
+        failures = check_regressions({'a': result(12), 'b': result(14), 'new': result(1)}, baseline, 0.25)
+        assert failures == ['b: p50_us 10 -> 14 (+40%)']
+
+    def test_default_thresholds_name_real_benchmarks(self):
+        """Test every threshold refers to a registered benchmark."""
+        with open(DEFAULT_THRESHOLDS, encoding='utf-8') as f:
+            assert set(json.load(f)) <= set(BENCHMARKS)
+
+
+class TestSuite:
+    """Tests for the benchmark suite itself."""
+
+    def test_covers_required_areas(self):
+        """Test the suite registers the utility, Markdown and HTTP benchmarks."""
+        for name in ('unit.convert_value', 'formatting.format_number', 'converter.generate_conversion_table',
+                     'converter.get_related_conversions', 'seo.generate_meta_tags', 'aviation.crosswind',
+                     'markdown.render_100kb', 'http.api_convert', 'http.category_page',
+                     'http.conversion_page', 'http.sitemap'):
+            assert name in BENCHMARKS
+
+    def test_markdown_documents_are_seeded(self):
+        """Test generated documents depend only on the seed and size."""
+        import random
+        first = markdown_document(random.Random('1:x'), 2000)
+        assert first == markdown_document(random.Random('1:x'), 2000)
+        assert len(first) >= 2000
+
+    def test_small_run(self):
+        """Test a filtered run reports every selected benchmark."""
+        names = {'unit.convert_value', 'converter.get_related_conversions', 'http.sitemap'}
+        report = run(20, seed=7, names=names)
+        assert set(report['results']) == names
+        assert report['seed'] == 7
+
+    def test_main_fails_on_threshold(self, tmp_path, capsys):
+        """Test the command exits non-zero when a threshold is broken."""
+        thresholds = tmp_path / 'thresholds.json'
+        thresholds.write_text(json.dumps({'aviation.crosswind': {'p95_us': 0}}))
+        output = tmp_path / 'report.json'
+        code = main(['--iterations', '20', '--filter', 'aviation.crosswind',
+                     '--thresholds', str(thresholds), '--output', str(output)])
+        assert code == 1
+        assert json.loads(output.read_text())['failures']
+
+
+class TestUnitEngineBenchmark:
+    """Tests for the before/after unit engine benchmark."""
+
+    def test_legacy_matches_engine(self, registry):
+        """Test the baseline converter gives the same answers as the engine."""
+        legacy = LegacyConverter(registry._units_data)
+        for args in (('length', 'km', 'mi', 3), ('temperature', 'c', 'f', 100), ('length', 'm', 'kg', 1)):
+            expected = registry.convert_value(*args)
+            if expected is None:
+                assert legacy.convert_value(*args) is None
+            else:
+                assert legacy.convert_value(*args) == pytest.approx(expected)
+
+    def test_small_run(self):
+        """Test a short run reports speedups for factor and temperature pairs."""
+        report = run_unit_engine(200, seed=1, repeat=1)
+        assert set(report['results']) == {'factor', 'temperature'}
+        for result in report['results'].values():
+            assert result['before_ns'] > 0
+            assert result['convert_values_speedup'] > 0
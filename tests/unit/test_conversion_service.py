@@ -0,0 +1,38 @@
+"""Unit tests for conversion_service.py module."""
+
+import pytest
+from app.utils.conversion_service import convert_request
+
+
+class TestConvertRequest:
+    """Tests for conversion request validation and results."""
+
+    def test_success(self, registry):
+        """Test a valid request returns result and formatted value."""
+        payload, status = convert_request(
+            {'category': 'length', 'fromUnit': 'km', 'toUnit': 'm', 'value': '1.5'}, registry)
+        assert status == 200
+        assert payload == {'success': True, 'result': pytest.approx(1500.0), 'formatted': '1500'}
+
+    def test_locale(self, registry):
+        """Test an optional locale formats the result with its separators."""
+        payload, status = convert_request(
+            {'category': 'length', 'fromUnit': 'km', 'toUnit': 'm', 'value': 12.5, 'locale': 'de'}, registry)
+        assert status == 200
+        assert payload['formatted'] == '12.500'
+
+    @pytest.mark.parametrize('data, error', [
+        (None, 'No data provided'),
+        ([1, 2], 'No data provided'),
+        ({'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft'}, 'Missing required fields'),
+        ({'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 'abc'}, 'Invalid value provided'),
+        ({'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 'nan'}, 'Invalid value provided'),
+        ({'category': 'length', 'fromUnit': 'm', 'toUnit': 'ft', 'value': 10 ** 400}, 'Invalid value provided'),
+        ({'category': 'length', 'fromUnit': 'm', 'toUnit': 'xx', 'value': 1}, 'Invalid conversion'),
+        ({'category': ['length'], 'fromUnit': 'm', 'toUnit': 'ft', 'value': 1}, 'Invalid conversion'),
+    ])
+    def test_errors(self, registry, data, error):
+        """Test each validation failure maps to its error message."""
+        payload, status = convert_request(data, registry)
+        assert status == 400
+        assert payload == {'success': False, 'error': error}
@@ -0,0 +1,112 @@
+"""Unit tests for the prebuilt data snapshot."""
+
+import os
+import shutil
+
+import pytest
+from app.routes.timezone import get_timezone_index
+from app.utils.data_snapshot import (
+    SNAPSHOT_MAGIC, build_snapshot, get_snapshot, load_snapshot, reset_snapshot_cache, write_snapshot
+)
+from app.utils.search_index import UnitSearchIndex
+from app.utils.unit_converter import ConversionEngine, create_unit_registry
+
+
+@pytest.fixture
+def data_dir(app, tmp_path):
+    """A private copy of static/data that tests may edit."""
+    target = tmp_path / 'data'
+    shutil.copytree(os.path.join(app.static_folder, 'data'), target)
+    return str(target)
+
+
+@pytest.fixture
+def snapshot_path(data_dir, tmp_path):
+    path = str(tmp_path / 'data.snapshot')
+    write_snapshot(build_snapshot(data_dir), path)
+    return path
+
+
+@pytest.fixture
+def snapshot_app(app, tmp_path):
+    """The app configured to use a freshly built snapshot of the real data."""
+    snapshot_path = str(tmp_path / 'app.snapshot')
+    write_snapshot(build_snapshot(os.path.join(app.static_folder, 'data')), snapshot_path)
+    app.config['DATA_SNAPSHOT_PATH'] = snapshot_path
+    reset_snapshot_cache()
+    with app.app_context():
+        yield app
+    reset_snapshot_cache()
+
+
+class TestBuildSnapshot:
+    """Tests for compiling and loading snapshots."""
+
+    def test_matches_json_loaders(self, registry, data_dir):
+        """Test the snapshot holds the same data and compiled pairs as the JSON path."""
+        snapshot = build_snapshot(data_dir)
+        assert snapshot.units_data == registry._units_data
+        assert snapshot.engine.pairs == ConversionEngine(registry._units_data).pairs
+        assert snapshot.data_version == registry.data_version
+        assert set(snapshot.detailed_tables) == {
+            'length', 'weight', 'temperature', 'volume', 'speed', 'pressure', 'energy', 'power'
+        }
+        assert snapshot.detailed_tables['length'] == registry.get_detailed_conversion_tables('length')
+        assert snapshot.timezone_index.lookup_city('Tokyo') is not None
+
+    def test_round_trip(self, data_dir, snapshot_path):
+        """Test a written snapshot loads back with the same version and indexes."""
+        snapshot = load_snapshot(snapshot_path, data_dir)
+        assert snapshot is not None
+        assert snapshot.version == build_snapshot(data_dir).version
+        assert set(snapshot.mtimes) == set(snapshot.sources)
+        expected = UnitSearchIndex(snapshot.units_data).search('meter', limit=5)
+        assert snapshot.search_index.search('meter', limit=5) == expected
+
+    def test_file_format(self, snapshot_path):
+        """Test snapshots start with the magic and format version."""
+        with open(snapshot_path, 'rb') as f:
+            assert f.read(4) == SNAPSHOT_MAGIC
+
+    def test_stale_source_rejected(self, data_dir, snapshot_path):
+        """Test editing any source file invalidates the snapshot."""
+        with open(os.path.join(data_dir, 'timezones.json'), 'a', encoding='utf-8') as f:
+            f.write('\n')
+        assert load_snapshot(snapshot_path, data_dir) is None
+
+    def test_code_change_rejected(self, data_dir, snapshot_path, monkeypatch):
+        """Test a snapshot built by different code is ignored."""
+        from app.utils import data_snapshot
+        monkeypatch.setattr(data_snapshot, 'code_fingerprint', lambda: b'0' * 16)
+        assert load_snapshot(snapshot_path, data_dir) is None
+
+    def test_missing_or_corrupt(self, data_dir, tmp_path, snapshot_path):
+        """Test unusable snapshot files fall back to None."""
+        assert load_snapshot(str(tmp_path / 'missing'), data_dir) is None
+        with open(snapshot_path, 'r+b') as f:
+            f.write(b'XXXX')
+        assert load_snapshot(snapshot_path, data_dir) is None
+
+
+class TestSnapshotLoading:
+    """Tests for the app loading data from the snapshot."""
+
+    def test_registry_uses_snapshot(self, snapshot_app):
+        """Test the unit registry takes its engine and index from the snapshot."""
+        snapshot = get_snapshot()
+        registry = create_unit_registry(snapshot_app)
+        assert registry._engine is snapshot.engine
+        assert registry.search_index is snapshot.search_index
+        assert registry.get_detailed_conversion_tables('length') is snapshot.detailed_tables['length']
+        assert registry.data_version == snapshot.data_version
+        assert registry.convert_value('length', 'km', 'm', 2) == 2000
+
+    def test_timezone_index_uses_snapshot(self, snapshot_app):
+        """Test the timezone routes use the snapshot's index."""
+        assert get_timezone_index() is get_snapshot().timezone_index
+
+    def test_disabled(self, app):
+        """Test an empty DATA_SNAPSHOT_PATH disables the snapshot."""
+        app.config['DATA_SNAPSHOT_PATH'] = ''
+        with app.app_context():
+            assert get_snapshot() is None
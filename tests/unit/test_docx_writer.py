@@ -0,0 +1,93 @@
+"""Unit tests for docx_writer.py module."""
+
+import markdown
+from app.utils.docx_writer import html_to_docx
+from docx import Document
+
+
+def render(md_text):
+    """Render markdown the way the markdown blueprint does and load the DOCX."""
+    html = markdown.markdown(md_text, extensions=['extra', 'codehilite', 'tables'])
+    return Document(html_to_docx(html))
+
+
+class TestHtmlToDocx:
+    """Tests for the in-process Markdown DOCX writer."""
+
+    def test_returns_rewound_docx_stream(self):
+        """Test output is an in-memory DOCX positioned at the start."""
+        output = html_to_docx('<p>Hello</p>')
+        assert output.tell() == 0
+        assert output.read(2) == b'PK'
+
+    def test_empty_html(self):
+        """Test empty input produces a valid, empty document."""
+        document = Document(html_to_docx(''))
+        assert [p.text for p in document.paragraphs] == []
+
+    def test_headings_and_paragraphs_keep_order(self):
+        """Test headings and paragraphs are written in document order."""
+        document = render('# Title\n\nIntro text.\n\n## Section\n\nBody.')
+        paragraphs = [(p.style.name, p.text) for p in document.paragraphs]
+        assert paragraphs == [
+            ('Heading 1', 'Title'),
+            ('Normal', 'Intro text.'),
+            ('Heading 2', 'Section'),
+            ('Normal', 'Body.'),
+        ]
+
+    def test_inline_formatting(self):
+        """Test bold, italic and code spans become formatted runs."""
+        document = render('Plain **bold** *italic* `code`')
+        runs = {run.text: run for run in document.paragraphs[0].runs}
+        assert runs['bold'].bold is True
+        assert runs['italic'].italic is True
+        assert runs['code'].font.name == 'Courier New'
+
+    def test_nested_lists(self):
+        """Test nested bullet and numbered lists use level styles."""
+        document = render('- one\n    1. inner\n- two')
+        styles = [(p.style.name, p.text) for p in document.paragraphs]
+        assert styles == [
+            ('List Bullet', 'one'),
+            ('List Number 2', 'inner'),
+            ('List Bullet', 'two'),
+        ]
+
+    def test_loose_list_has_no_leading_space(self):
+        """Test items of a loose list do not start with the newline before their paragraph."""
+        document = render('- one\n\n- two')
+        assert [p.text for p in document.paragraphs] == ['one', 'two']
+        assert [run.text for run in document.paragraphs[0].runs] == ['one']
+
+    def test_definition_list(self):
+        """Test each term is a bold paragraph and each definition an indented one."""
+        document = render('Term\n:   Def\n\nT2\n:   D2')
+        paragraphs = [(p.style.name, p.text) for p in document.paragraphs]
+        assert paragraphs == [
+            ('Normal', 'Term'),
+            ('List Continue', 'Def'),
+            ('Normal', 'T2'),
+            ('List Continue', 'D2'),
+        ]
+        assert all(run.bold for run in document.paragraphs[0].runs)
+
+    def test_fenced_code_block(self):
+        """Test fenced code keeps its lines in a monospace paragraph."""
+        document = render('```\nx = 1\ny = 2\n```')
+        code = document.paragraphs[0]
+        assert code.text == 'x = 1\ny = 2'
+        assert code.runs[0].font.name == 'Courier New'
+
+    def test_blockquote(self):
+        """Test blockquotes use the Quote style."""
+        document = render('> quoted text')
+        assert document.paragraphs[0].style.name == 'Quote'
+        assert document.paragraphs[0].text == 'quoted text'
+
+    def test_table(self):
+        """Test tables are written with bold header cells."""
+        document = render('| A | B |\n|---|---|\n| 1 | 2 |')
+        table = document.tables[0]
+        assert [[cell.text for cell in row.cells] for row in table.rows] == [['A', 'B'], ['1', '2']]
+        assert table.cell(0, 0).paragraphs[0].runs[0].bold is True
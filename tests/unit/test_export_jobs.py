@@ -0,0 +1,182 @@
+"""Unit tests for background export jobs."""
+
+import sys
+import threading
+import time
+
+import pytest
+from app.utils import export_jobs
+from app.utils.export_jobs import (
+    DONE, FAILED, QUEUED, ExportQueue, Job, MemoryBackend, QueueFull, RedisBackend, content_hash,
+    create_export_queue
+)
+
+
+def wait(queue, job_id):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job.state in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('job did not finish')
+
+
+@pytest.fixture
+def queue():
+    queue = ExportQueue(MemoryBackend(), workers=2, ttl=60)
+    yield queue
+    queue.shutdown()
+
+
+class TestExportQueue:
+    """Tests for ExportQueue on the memory backend."""
+
+    def test_progress_and_result(self, queue):
+        """Test progress updates are visible while a job runs."""
+        halfway, release = threading.Event(), threading.Event()
+
+        def build(progress):
+            progress(0.5)
+            halfway.set()
+            release.wait(5)
+            return b'data'
+
+        job, created = queue.submit('docx', 'text', build)
+        assert created
+        assert job.state == QUEUED
+        assert halfway.wait(5)
+        assert queue.get(job.id).progress == 0.5
+        release.set()
+
+        finished = wait(queue, job.id)
+        assert finished.state == DONE
+        assert finished.progress == 1.0
+        assert finished.finished_at is not None
+        assert queue.result(job.id) == b'data'
+
+    def test_dedupe_by_content_hash(self, queue):
+        """Test equal format and text share one job and build once."""
+        calls = []
+
+        def build(progress):
+            calls.append(1)
+            return b'data'
+
+        first, _ = queue.submit('html', 'same', build)
+        wait(queue, first.id)
+        second, created = queue.submit('html', 'same', build)
+        other, other_created = queue.submit('docx', 'same', build)
+        wait(queue, other.id)
+
+        assert not created and second.id == first.id
+        assert other_created and other.id != first.id
+        assert len(calls) == 2
+
+    def test_failure(self, queue):
+        """Test a failed build is reported and retried on the next submit."""
+        def build(progress):
+            raise ValueError('bad document')
+
+        job, _ = queue.submit('docx', 'text', build)
+        failed = wait(queue, job.id)
+        assert failed.state == FAILED
+        assert failed.error == 'bad document'
+        assert queue.result(job.id) is None
+
+        retry, created = queue.submit('docx', 'text', lambda progress: b'ok')
+        assert created and retry.id != job.id
+
+    def test_ttl_expiry(self, queue, monkeypatch):
+        """Test jobs, results and the dedupe entry expire after the TTL."""
+        job, _ = queue.submit('html', 'text', lambda progress: b'data')
+        wait(queue, job.id)
+        now = time.monotonic()
+        monkeypatch.setattr(export_jobs.time, 'monotonic', lambda: now + 61)
+
+        assert queue.get(job.id) is None
+        assert queue.result(job.id) is None
+        _, created = queue.submit('html', 'text', lambda progress: b'data')
+        assert created
+
+
+    def test_pending_limit(self):
+        """Test new jobs past max_pending raise QueueFull, while equal jobs are still returned."""
+        queue = ExportQueue(MemoryBackend(), workers=1, ttl=60, max_pending=1)
+        release = threading.Event()
+        try:
+            job, _ = queue.submit('html', 'slow', lambda progress: release.wait(5) and b'x')
+            with pytest.raises(QueueFull):
+                queue.submit('html', 'other', lambda progress: b'y')
+            same, created = queue.submit('html', 'slow', lambda progress: b'z')
+            assert not created and same.id == job.id
+            release.set()
+            wait(queue, job.id)
+            assert queue.pending == 0
+            queue.submit('html', 'other', lambda progress: b'y')
+        finally:
+            release.set()
+            queue.shutdown()
+
+
+class TestMemoryBackend:
+    """Tests for the in-memory result budget."""
+
+    def store(self, backend, name, data):
+        job, _ = backend.claim(Job(name, 'html', content_hash('html', name)), 60)
+        job.state = DONE
+        backend.save_result(job, data, 60)
+        return job
+
+    def test_evicts_oldest_results(self):
+        """Test results beyond max_bytes evict the oldest jobs first."""
+        backend = MemoryBackend(max_bytes=10)
+        self.store(backend, 'a', b'1234')
+        self.store(backend, 'b', b'1234')
+        self.store(backend, 'c', b'1234')
+        assert backend.get('a') is None
+        assert backend.find(content_hash('html', 'a')) is None
+        assert backend.result('b') == b'1234'
+        assert backend.result('c') == b'1234'
+
+    def test_oversized_result_fails(self):
+        """Test a result larger than the whole budget fails its job."""
+        backend = MemoryBackend(max_bytes=10)
+        job = self.store(backend, 'big', b'x' * 11)
+        assert backend.get(job.id).state == FAILED
+        assert backend.result(job.id) is None
+
+
+class TestJob:
+    """Tests for Job serialisation and hashing."""
+
+    def test_round_trip(self):
+        """Test a job survives the JSON form used by RedisBackend."""
+        job = Job('abc', 'docx', content_hash('docx', 'text'), progress=0.25)
+        loaded = Job.loads(job.dumps())
+        assert loaded.to_dict() == job.to_dict()
+        assert loaded.content_hash == job.content_hash
+
+    def test_hash_includes_format(self):
+        """Test the same text in different formats hashes differently."""
+        assert content_hash('html', 'x') != content_hash('docx', 'x')
+
+
+class TestCreateExportQueue:
+    """Tests for backend selection."""
+
+    def test_disabled_by_default(self):
+        """Test exports stay synchronous without Redis or EXPORT_JOBS_LOCAL."""
+        assert create_export_queue({}) is None
+
+    def test_local(self):
+        """Test EXPORT_JOBS_LOCAL keeps jobs in memory."""
+        queue = create_export_queue({'EXPORT_JOBS_LOCAL': True, 'EXPORT_JOB_TTL': 5, 'EXPORT_RESULT_MAX_BYTES': 99})
+        assert isinstance(queue.backend, MemoryBackend)
+        assert queue.ttl == 5
+        assert queue.backend.max_bytes == 99
+
+    def test_redis_requires_package(self, monkeypatch):
+        """Test a Redis URL without the redis package fails clearly."""
+        monkeypatch.setitem(sys.modules, 'redis', None)
+        with pytest.raises(RuntimeError, match='redis package'):
+            RedisBackend('redis://localhost:6379/0')
@@ -0,0 +1,141 @@
+"""Unit tests for flight_plan.py module."""
+
+import pytest
+from app.utils.flight_plan import (
+    _relative_wind,
+    calculate_flight_plan,
+    legs_from_waypoints,
+    solve_wind_triangle,
+)
+
+
+class TestSolveWindTriangle:
+    """Tests for the per-leg wind triangle."""
+
+    def test_no_wind(self):
+        """Test calm wind leaves heading and speed unchanged."""
+        result = solve_wind_triangle(100, 90, 0, 0)
+        assert result['ground_speed'] == pytest.approx(100)
+        assert result['heading'] == pytest.approx(90)
+        assert result['wind_correction_angle'] == pytest.approx(0)
+
+    def test_direct_headwind_and_tailwind(self):
+        """Test winds along the course change only ground speed."""
+        assert solve_wind_triangle(100, 0, 20, 0)['ground_speed'] == pytest.approx(80)
+        assert solve_wind_triangle(100, 0, 20, 180)['ground_speed'] == pytest.approx(120)
+
+    def test_crosswind_correction(self):
+        """Test a right crosswind turns the heading into the wind."""
+        result = solve_wind_triangle(100, 0, 50, 90)
+        assert result['wind_correction_angle'] == pytest.approx(30)
+        assert result['heading'] == pytest.approx(30)
+        assert result['ground_speed'] == pytest.approx(86.6025, rel=1e-4)
+
+    def test_untrackable(self):
+        """Test crosswinds stronger than the airspeed are rejected."""
+        with pytest.raises(ValueError, match='untrackable'):
+            solve_wind_triangle(50, 0, 60, 90)
+
+    def test_trig_is_cached_per_wind_and_course(self):
+        """Test repeated (wind, course) pairs reuse cached trig values."""
+        _relative_wind.cache_clear()
+        for _ in range(10):
+            solve_wind_triangle(120, 45, 15, 300)
+        info = _relative_wind.cache_info()
+        assert info.misses == 1
+        assert info.hits == 9
+
+
+class TestCalculateFlightPlan:
+    """Tests for multi-leg flight plans."""
+
+    def test_cumulative_totals(self):
+        """Test time and fuel accumulate across legs with their own winds."""
+        result = calculate_flight_plan([
+            {'distance': 100, 'course': 0, 'wind_speed': 20, 'wind_direction': 0, 'name': 'A-B'},
+            {'distance': 120, 'course': 180, 'wind_speed': 20, 'wind_direction': 0, 'fuel_flow': 12},
+        ], true_airspeed=100, fuel_flow=10, reserve_time=30)
+
+        first, second = result['legs']
+        assert first['ground_speed'] == pytest.approx(80)
+        assert first['time'] == pytest.approx(75)
+        assert first['fuel'] == pytest.approx(12.5)
+        assert second['ground_speed'] == pytest.approx(120)
+        assert second['cumulative_time'] == pytest.approx(135)
+        assert second['cumulative_fuel'] == pytest.approx(24.5)
+        assert first['name'] == 'A-B'
+
+        totals = result['totals']
+        assert totals['distance'] == 220
+        assert totals['trip_fuel'] == pytest.approx(24.5)
+        # Reserve burns at the last leg's fuel flow
+        assert totals['reserve_fuel'] == pytest.approx(6)
+        assert totals['total_fuel'] == pytest.approx(30.5)
+
+    def test_contingency_taxi_and_fuel_on_board(self):
+        """Test optional fuel components and remaining fuel."""
+        result = calculate_flight_plan(
+            [{'distance': 100, 'course': 90}, {'distance': 100, 'course': 90}],
+            true_airspeed=100, fuel_flow=10, reserve_time=45,
+            contingency_percent=10, taxi_fuel=1, fuel_on_board=40
+        )
+        assert [leg['fuel_remaining'] for leg in result['legs']] == [29, 19]
+        totals = result['totals']
+        assert totals['contingency_fuel'] == pytest.approx(2)
+        assert totals['total_fuel'] == pytest.approx(1 + 20 + 2 + 7.5)
+        assert totals['extra_fuel'] == pytest.approx(9.5)
+        assert totals['sufficient_fuel'] is True
+
+    def test_missing_defaults(self):
+        """Test legs without airspeed and no plan default are rejected."""
+        with pytest.raises(ValueError, match='Leg 0: true_airspeed is required'):
+            calculate_flight_plan([{'distance': 10, 'course': 0}], fuel_flow=8)
+
+    def test_invalid_leg_reports_index(self):
+        """Test validation errors name the offending leg."""
+        legs = [{'distance': 10, 'course': 0}, {'distance': -1, 'course': 0}]
+        with pytest.raises(ValueError, match='Leg 1: distance'):
+            calculate_flight_plan(legs, true_airspeed=100, fuel_flow=8)
+
+    def test_nonfinite_plan_values(self):
+        """Test NaN and infinite plan values are rejected."""
+        legs = [{'distance': 10, 'course': 0}]
+        with pytest.raises(ValueError, match='Reserve time must be a finite number'):
+            calculate_flight_plan(legs, true_airspeed=100, fuel_flow=8, reserve_time=float('nan'))
+        with pytest.raises(ValueError, match='Contingency percentage must be a finite number'):
+            calculate_flight_plan(legs, true_airspeed=100, fuel_flow=8, contingency_percent=float('inf'))
+
+    def test_empty_plan(self):
+        """Test a plan needs at least one leg."""
+        with pytest.raises(ValueError):
+            calculate_flight_plan([], true_airspeed=100, fuel_flow=8)
+
+    def test_hundreds_of_legs(self):
+        """Test long plans accumulate exactly."""
+        legs = [{'distance': 10, 'course': (i * 10) % 360, 'wind_speed': 0} for i in range(500)]
+        result = calculate_flight_plan(legs, true_airspeed=100, fuel_flow=6)
+        assert len(result['legs']) == 500
+        assert result['totals']['time'] == pytest.approx(3000)
+        assert result['totals']['trip_fuel'] == pytest.approx(300)
+
+
+class TestLegsFromWaypoints:
+    """Tests for building legs from waypoints."""
+
+    def test_great_circle_distance_and_course(self):
+        """Test one degree of latitude due north is 60 nm on course 000."""
+        legs = legs_from_waypoints([
+            {'name': 'A', 'lat': 0, 'lon': 0},
+            {'name': 'B', 'lat': 1, 'lon': 0, 'wind_speed': 10, 'wind_direction': 90},
+            {'name': 'C', 'lat': 1, 'lon': 1},
+        ])
+        assert legs[0]['distance'] == pytest.approx(60.04, abs=0.01)
+        assert legs[0]['course'] == pytest.approx(0)
+        assert legs[0]['wind_speed'] == 10
+        assert legs[0]['name'] == 'A-B'
+        assert legs[1]['course'] == pytest.approx(90, abs=0.01)
+
+    def test_missing_coordinates(self):
+        """Test waypoints without coordinates are rejected."""
+        with pytest.raises(ValueError, match='Waypoint 1'):
+            legs_from_waypoints([{'lat': 0, 'lon': 0}, {'lat': 1}])
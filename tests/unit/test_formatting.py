@@ -0,0 +1,83 @@
+"""Unit tests for formatting.py module."""
+
+import random
+
+import pytest
+from app.utils.formatting import format_number, locale_separators, localize_number
+
+
+def reference_format(value):
+    """The original formatter, kept as the reference for the fast path."""
+    try:
+        if value is None:
+            return "0"
+        if isinstance(value, str):
+            value = float(value)
+        if abs(value) >= 1e6 or (abs(value) < 1e-6 and abs(value) > 0):
+            return f"{value:.6e}"
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    except (ValueError, TypeError):
+        return "0"
+
+
+class TestFormatNumber:
+    """Tests for format_number."""
+
+    def test_trailing_zeros_removed(self):
+        """Test regular numbers drop trailing zeros."""
+        assert format_number(2.5) == '2.5'
+        assert format_number(100.0) == '100'
+        assert format_number(0) == '0'
+        assert format_number(3.280839895) == '3.28084'
+
+    def test_scientific_notation(self):
+        """Test very large and very small magnitudes use scientific notation."""
+        assert format_number(1234567.0) == '1.234567e+06'
+        assert format_number(0.0000001) == '1.000000e-07'
+
+    def test_strings_and_none(self):
+        """Test numeric strings are parsed and bad input formats as zero."""
+        assert format_number('3.50') == '3.5'
+        assert format_number(None) == '0'
+        assert format_number('abc') == '0'
+
+    def test_fast_path_matches_reference(self):
+        """Test the fast path formats exactly like the original formatter."""
+        rng = random.Random(42)
+        values = [0, 0.0, -0.0, 1, -1, 999999, 1e6, 1e-6, 9.99e-7, 999999.9999999,
+                  float('nan'), float('inf'), True, '12.5']
+        for _ in range(20000):
+            exponent = rng.randint(-8, 7)
+            values.append(rng.uniform(-1, 1) * 10 ** exponent)
+            values.append(float(rng.randint(-10 ** 7, 10 ** 7)))
+            values.append(rng.randint(-10 ** 7, 10 ** 7))
+        for value in values:
+            assert format_number(value) == reference_format(value), value
+
+
+class TestLocaleFormatting:
+    """Tests for locale-aware output."""
+
+    @pytest.mark.parametrize('value, locale, expected', [
+        (1234.5, 'en', '1,234.5'),
+        (1234.5, 'de', '1.234,5'),
+        (-1234567 / 10, 'fr', '-123\u202f456,7'),
+        (999999, 'ru', '999\u00a0999'),
+        (12.25, 'pt_BR', '12,25'),
+        (123, 'de', '123'),
+        (12345.678, 'de-CH', '12’345.678'),
+        (1234567.0, 'de', '1,234567e+06'),
+        (1234.5, 'xx', '1,234.5'),
+    ])
+    def test_separators(self, value, locale, expected):
+        """Test decimal and group separators per locale."""
+        assert format_number(value, locale) == expected
+
+    def test_region_falls_back_to_language(self):
+        """Test an unknown region uses its language's separators."""
+        assert locale_separators('de-AT') == locale_separators('de')
+
+    def test_nonfinite(self):
+        """Test inf and nan pass through localisation unchanged."""
+        assert localize_number('inf', 'de') == 'inf'
+        assert localize_number('nan', 'de') == 'nan'
@@ -0,0 +1,64 @@
+"""Unit tests for the instrumentation layer."""
+
+import pytest
+from app.utils import instrumentation
+from app.utils.instrumentation import Histogram, Metrics, server_timing_header, span, traced
+
+
+class TestHistogram:
+    """Tests for cumulative bucket counting."""
+
+    def test_cumulative_buckets(self):
+        """Test observations land in the first bucket that fits."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [(0.1, 1), (1.0, 3)]
+        assert histogram.count == 4
+        assert histogram.total == pytest.approx(6.05)
+
+
+class TestMetrics:
+    """Tests for the Prometheus text output."""
+
+    def test_render(self):
+        """Test request and span metrics are rendered with labels."""
+        metrics = Metrics(buckets=(0.1,))
+        metrics.observe_request('api.convert', 'POST', 200, 0.05)
+        metrics.observe_request('api.convert', 'POST', 400, 0.2)
+        metrics.observe_span('render_template', 0.01)
+        text = metrics.render()
+        assert '# TYPE anyunit_request_duration_seconds histogram' in text
+        assert 'anyunit_request_duration_seconds_bucket{endpoint="api.convert",method="POST",le="0.1"} 1' in text
+        assert 'anyunit_request_duration_seconds_count{endpoint="api.convert",method="POST"} 2' in text
+        assert 'anyunit_requests_total{endpoint="api.convert",method="POST",status="400"} 1' in text
+        assert 'anyunit_span_duration_seconds_bucket{span="render_template",le="+Inf"} 1' in text
+        assert text.endswith('\n')
+
+    def test_label_escaping(self):
+        """Test quotes and backslashes in labels are escaped."""
+        metrics = Metrics()
+        metrics.observe_span('a"b\\c', 0.01)
+        assert 'span="a\\"b\\\\c"' in metrics.render()
+
+
+class TestSpans:
+    """Tests for spans and the Server-Timing header."""
+
+    def test_disabled_span_is_shared_noop(self, monkeypatch):
+        """Test spans cost nothing until instrumentation is enabled."""
+        monkeypatch.setattr(instrumentation, '_enabled', False)
+        assert span('a') is span('b')
+
+    def test_traced_passes_through(self, monkeypatch):
+        """Test traced functions return their result either way."""
+        double = traced('double')(lambda x: x * 2)
+        monkeypatch.setattr(instrumentation, '_enabled', False)
+        assert double(2) == 4
+        monkeypatch.setattr(instrumentation, '_enabled', True)
+        assert double(3) == 6  # no app context: timing is dropped
+
+    def test_server_timing_header(self):
+        """Test span names are made into tokens and durations are in ms."""
+        header = server_timing_header({'markdown render': 0.0015, 'total': 0.01})
+        assert header == 'markdown_render;dur=1.50, total;dur=10.00'
@@ -0,0 +1,176 @@
+"""Unit tests for markdown_preview.py module."""
+
+import re
+
+import pytest
+from app.utils.markdown_preview import (
+    DocumentTooLarge, PreviewDocument, PreviewStore, RevisionMismatch, split_blocks
+)
+from app.utils.markdown_renderer import MarkdownRenderer
+
+SAMPLE = """# Title
+
+First paragraph
+continues here.
+
+- one
+- two
+
+- three
+    indented continuation
+
+> quote one
+
+> quote two
+
+```python
+a = 1
+
+b = 2
+```
+
+Term
+: definition
+
+| A | B |
+|---|---|
+| 1 | 2 |
+
+    indented code
+
+Last *paragraph*."""
+
+
+def normalize(html):
+    """Ignore blank-line differences between top-level elements."""
+    return re.sub(r'\n+', '\n', html)
+
+
+@pytest.fixture
+def renderer():
+    return MarkdownRenderer()
+
+
+class TestSplitBlocks:
+    """Tests for splitting source into top-level blocks."""
+
+    def test_blocks_render_like_the_whole_document(self, renderer):
+        """Test rendering blocks separately matches a full render."""
+        blocks = split_blocks(SAMPLE.split('\n'))
+        joined = '\n'.join(renderer.pool.convert(block) for block in blocks)
+        assert normalize(joined) == normalize(renderer.pool.convert(SAMPLE))
+
+    def test_block_boundaries(self):
+        """Test lists, quotes and fenced code are kept whole."""
+        blocks = split_blocks(SAMPLE.split('\n'))
+        assert blocks[0] == '# Title'
+        assert blocks[2].startswith('- one') and blocks[2].endswith('indented continuation')
+        assert blocks[3] == '> quote one\n\n> quote two'
+        assert blocks[4] == '```python\na = 1\n\nb = 2\n```'
+        assert blocks[5] == 'Term\n: definition'
+
+    def test_document_wide_constructs_use_one_block(self):
+        """Test reference links and footnotes fall back to a single block."""
+        text = 'See [docs][1].\n\nMore text[^n].\n\n[1]: https://example.com\n[^n]: note'
+        assert split_blocks(text.split('\n')) == [text]
+
+    def test_empty_document(self):
+        """Test blank input has no blocks."""
+        assert split_blocks(['', '  ']) == []
+
+
+class TestPreviewDocument:
+    """Tests for incremental block re-rendering."""
+
+    def test_edit_rerenders_only_changed_block(self, renderer):
+        """Test an edit inside one block returns a one-block patch."""
+        document = PreviewDocument(renderer)
+        loaded = document.load('# A\n\npara\n\n# B')
+        assert loaded['revision'] == 1
+        assert loaded['blocks'] == ['<h1>A</h1>', '<p>para</p>', '<h1>B</h1>']
+
+        result = document.apply(1, 2, 3, ['para **bold**'])
+        assert result['revision'] == 2
+        assert result['blockCount'] == 3
+        assert result['patch'] == {'start': 1, 'deleteCount': 1, 'html': ['<p>para <strong>bold</strong></p>']}
+
+    def test_inserting_blocks(self, renderer):
+        """Test inserting new blocks deletes nothing."""
+        document = PreviewDocument(renderer)
+        document.load('# A\n\n# B')
+        result = document.apply(1, 1, 1, ['', 'new'])
+        assert result['patch'] == {'start': 1, 'deleteCount': 0, 'html': ['<p>new</p>']}
+        assert document.html == ['<h1>A</h1>', '<p>new</p>', '<h1>B</h1>']
+
+    def test_patches_track_full_render(self, renderer):
+        """Test a series of edits keeps the block HTML equal to a full render."""
+        document = PreviewDocument(renderer)
+        document.load(SAMPLE)
+        lines = SAMPLE.split('\n')
+        edits = [(0, 1, ['# New title']), (5, 5, ['- zero']), (16, 20, []), (3, 3, ['', '***', ''])]
+        for start, end, new_lines in edits:
+            document.apply(document.revision, start, end, new_lines)
+            lines[start:end] = new_lines
+        expected = renderer.pool.convert('\n'.join(lines))
+        assert normalize('\n'.join(document.html)) == normalize(expected)
+
+    def test_stale_revision(self, renderer):
+        """Test edits against an old revision are rejected."""
+        document = PreviewDocument(renderer)
+        document.load('text')
+        with pytest.raises(RevisionMismatch):
+            document.apply(0, 0, 1, ['other'])
+
+    def test_invalid_range(self, renderer):
+        """Test edit ranges outside the document are rejected."""
+        document = PreviewDocument(renderer)
+        document.load('text')
+        with pytest.raises(ValueError):
+            document.apply(1, 0, 5, [])
+        assert document.revision == 1
+
+    def test_failed_render_leaves_document_unchanged(self, renderer, monkeypatch):
+        """Test an edit whose rendering fails changes neither lines nor revision."""
+        document = PreviewDocument(renderer)
+        document.load('# A\n\npara')
+
+        def fail(block):
+            raise RuntimeError('render failed')
+        monkeypatch.setattr(renderer.pool, 'convert', fail)
+        with pytest.raises(RuntimeError):
+            document.apply(1, 2, 3, ['changed'])
+        assert document.lines == ['# A', '', 'para']
+        assert document.revision == 1
+        assert document.html == ['<h1>A</h1>', '<p>para</p>']
+
+    def test_size_limit(self, renderer):
+        """Test loads and edits past max_size are rejected and leave the document as it was."""
+        document = PreviewDocument(renderer, max_size=40)
+        document.load('# A')
+        assert document.size == len('# A') + 1 + len('<h1>A</h1>')
+        with pytest.raises(DocumentTooLarge):
+            document.apply(1, 0, 1, ['# ' + 'x' * 30])
+        assert document.lines == ['# A'] and document.revision == 1
+        with pytest.raises(DocumentTooLarge):
+            document.load('y' * 50)
+
+
+class TestPreviewStore:
+    """Tests for the bounded document store."""
+
+    def test_open_reuses_documents(self, renderer):
+        """Test the same id returns the same document."""
+        store = PreviewStore(renderer, maxsize=1)
+        assert store.open('a') is store.open('a')
+        store.open('b')
+        assert store.get('a') is None
+
+    def test_total_size_bound(self, renderer):
+        """Test documents are evicted once their total size exceeds max_bytes."""
+        store = PreviewStore(renderer, maxsize=10, max_bytes=100)
+        store.load('a', 'x' * 30)
+        store.load('b', 'y' * 30)
+        assert store.get('a') is None
+        assert store.get('b') is not None
+        assert store.apply('b', 1, 0, 1, ['short'])['revision'] == 2
+        assert store.apply('a', 1, 0, 1, ['short']) is None
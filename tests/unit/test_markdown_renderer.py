@@ -0,0 +1,87 @@
+"""Unit tests for markdown_renderer.py module."""
+
+import threading
+
+import markdown
+from app.utils.markdown_renderer import MARKDOWN_EXTENSIONS, MarkdownPool, MarkdownRenderer
+
+
+class TestMarkdownPool:
+    """Tests for pooled Markdown instances."""
+
+    def test_matches_markdown_markdown(self):
+        """Test pooled output is identical to a fresh markdown.markdown call."""
+        pool = MarkdownPool()
+        text = '# Title\n\n| A | B |\n|---|---|\n| 1 | 2 |\n\n```python\nx = 1\n```\n\nNote[^1]\n\n[^1]: footnote'
+        expected = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+        assert pool.convert(text) == expected
+        assert pool.convert(text) == expected
+
+    def test_instances_are_reused_and_reset(self):
+        """Test an instance is reused and state does not leak between documents."""
+        pool = MarkdownPool(size=1)
+        with pool.acquire() as first:
+            first.convert('Text[^a]\n\n[^a]: one')
+        with pool.acquire() as second:
+            html = second.convert('Plain text')
+        assert first is second
+        assert 'footnote' not in html
+
+    def test_concurrent_use(self):
+        """Test concurrent conversions each get their own instance."""
+        pool = MarkdownPool(size=2)
+        results = {}
+
+        def worker(i):
+            results[i] = pool.convert(f'# Doc {i}\n\n' + 'word ' * 200)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i, html in results.items():
+            assert html.startswith(f'<h1>Doc {i}</h1>')
+
+
+class TestMarkdownRenderer:
+    """Tests for the content-hash HTML cache."""
+
+    def test_identical_documents_render_once(self):
+        """Test an unchanged document is served from the cache."""
+        renderer = MarkdownRenderer(cache_size=4)
+        calls = []
+        convert = renderer.pool.convert
+        renderer.pool.convert = lambda text: calls.append(text) or convert(text)
+
+        first = renderer.render('**bold**')
+        second = renderer.render('**bold**')
+        renderer.render('*italic*')
+
+        assert first == second == '<p><strong>bold</strong></p>'
+        assert calls == ['**bold**', '*italic*']
+
+    def test_cache_is_bounded(self):
+        """Test the cache evicts least recently used documents."""
+        renderer = MarkdownRenderer(cache_size=2)
+        for text in ('a', 'b', 'c'):
+            renderer.render(text)
+        assert len(renderer.cache) == 2
+        assert renderer.content_key('a') not in renderer.cache
+
+    def test_cache_byte_budget(self):
+        """Test large documents are evicted by total size, and oversized ones are not cached."""
+        renderer = MarkdownRenderer(cache_size=10)
+        size = renderer.cache.sizeof(renderer.render('x' * 1000))
+        renderer.cache.clear()
+        renderer.cache.max_bytes = size * 2
+
+        for text in ('a' * 1000, 'b' * 1000, 'c' * 1000):
+            renderer.render(text)
+        assert len(renderer.cache) == 2
+        assert renderer.content_key('a' * 1000) not in renderer.cache
+        assert renderer.cache.nbytes <= renderer.cache.max_bytes
+
+        renderer.render('d' * 5000)
+        assert renderer.content_key('d' * 5000) not in renderer.cache
+        assert len(renderer.cache) == 2
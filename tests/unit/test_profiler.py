@@ -0,0 +1,99 @@
+"""Unit tests for the sampling profiler."""
+
+import signal
+import threading
+import time
+
+import pytest
+from app.utils.profiler import UNATTRIBUTED, SamplerBusy, StackSampler
+
+
+def busy(seconds):
+    end = time.monotonic() + seconds
+    total = 0
+    while time.monotonic() < end:
+        total += sum(range(200))
+    return total
+
+
+def wait_for(sampler, timeout=5):
+    end = time.monotonic() + timeout
+    while sampler.running and time.monotonic() < end:
+        busy(0.01)
+
+
+class TestStackSampler:
+    """Tests for sampling, attribution and collapsed output."""
+
+    @pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason='needs setitimer')
+    def test_signal_mode(self):
+        """Test SIGPROF sampling records the busy main thread and restores the handler."""
+        previous = signal.getsignal(signal.SIGPROF)
+        sampler = StackSampler({__name__: 'tests'})
+        sampler.start(0.3, interval=0.002)
+        assert sampler.mode == 'signal'
+        wait_for(sampler)
+
+        summary = sampler.summary()
+        assert summary['state'] == 'finished'
+        assert summary['samples'] > 0
+        assert summary['blueprints'].get('tests', 0) > 0
+        assert f'{__name__}:busy' in sampler.collapsed()
+        assert signal.getsignal(signal.SIGPROF) == previous
+
+    @pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason='needs setitimer')
+    def test_signal_mode_disarms_when_idle(self):
+        """Test the itimer is disarmed at the deadline even if no CPU is used."""
+        previous = signal.getsignal(signal.SIGPROF)
+        sampler = StackSampler()
+        try:
+            sampler.start(0.1, interval=0.01, mode='signal')
+            time.sleep(0.3)
+            assert not sampler._running
+            assert signal.getitimer(signal.ITIMER_PROF) == (0.0, 0.0)
+
+            # The handler left behind by the timer thread does not block a new run
+            sampler.start(0.1, interval=0.01, mode='signal')
+            wait_for(sampler)
+        finally:
+            sampler.stop()
+            signal.signal(signal.SIGPROF, previous)
+        assert sampler._previous_handler == previous
+
+    def test_thread_mode(self):
+        """Test the sampler thread records other threads' stacks."""
+        worker = threading.Thread(target=busy, args=(0.5,))
+        worker.start()
+        sampler = StackSampler({__name__: 'tests'})
+        sampler.start(0.2, interval=0.005, mode='thread')
+        time.sleep(0.3)
+        worker.join()
+
+        assert not sampler.running
+        assert sampler.summary()['samples'] > 0
+        assert f'{__name__}:busy' in sampler.collapsed('tests')
+
+    def test_busy(self):
+        """Test a second run cannot start while one is in progress."""
+        sampler = StackSampler()
+        sampler.start(5, mode='thread')
+        try:
+            with pytest.raises(SamplerBusy):
+                sampler.start(1, mode='thread')
+        finally:
+            sampler.stop()
+        assert sampler.summary()['state'] == 'finished'
+
+    def test_collapsed_format(self):
+        """Test stacks are outermost-first, semicolon-joined, with counts."""
+        sampler = StackSampler({'app.routes.converter': 'converter'})
+        sampler.stacks[('a:main', 'app.routes.converter:convert', 'b:leaf')] = 3
+        sampler.stacks[('a:main', 'c:idle')] = 2
+        assert sampler.collapsed() == 'a:main;app.routes.converter:convert;b:leaf 3\na:main;c:idle 2\n'
+        assert sampler.collapsed('converter') == 'a:main;app.routes.converter:convert;b:leaf 3\n'
+        assert sampler._blueprint_for(('a:main', 'c:idle')) == UNATTRIBUTED
+
+    def test_invalid_mode(self):
+        """Test unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            StackSampler().start(1, mode='perf')
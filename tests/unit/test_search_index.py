@@ -0,0 +1,67 @@
+"""Unit tests for search_index.py module."""
+
+import pytest
+from app.utils.search_index import UnitSearchIndex, conversion_path
+
+
+@pytest.fixture
+def index(registry):
+    """Search index built from units.json."""
+    return UnitSearchIndex(registry._units_data)
+
+
+class TestConversionPath:
+    """Tests for conversion_path function."""
+
+    def test_path(self):
+        """Test conversion page path format."""
+        assert conversion_path('length', 'm', 'ft') == '/convert/length/m-to-ft'
+
+
+class TestUnitSearchIndex:
+    """Tests for UnitSearchIndex.search."""
+
+    def test_exact_name(self, index):
+        """Test an exact unit name ranks that unit first."""
+        results = index.search('Celsius')
+        assert results['units'][0]['id'] == 'c'
+        assert results['units'][0]['category_id'] == 'temperature'
+
+    def test_symbol(self, index):
+        """Test searching by unit symbol."""
+        results = index.search('kg')
+        assert results['units'][0]['name'] == 'Kilogram'
+
+    def test_prefix(self, index):
+        """Test a prefix matches units starting with it."""
+        names = [u['name'] for u in index.search('kilo')['units']]
+        assert 'Kilometer' in names
+        assert 'Kilogram' in names
+
+    def test_category_title(self, index):
+        """Test a category title returns units in that category."""
+        results = index.search('temperature')
+        assert {u['category_id'] for u in results['units']} == {'temperature'}
+
+    def test_fuzzy_match(self, index):
+        """Test misspellings are matched through trigrams."""
+        results = index.search('farenheit')
+        assert results['units'][0]['id'] == 'f'
+
+    def test_results_include_urls(self, index):
+        """Test units and popular conversions carry conversion-page URLs."""
+        results = index.search('celsius')
+        assert results['units'][0]['url'].startswith('/convert/temperature/c-to-')
+        assert {'title': 'Celsius to Fahrenheit', 'url': '/convert/temperature/c-to-f'} in results['popularConversions']
+
+    def test_limit(self, index):
+        """Test the number of units is capped by limit."""
+        assert len(index.search('k', limit=3)['units']) == 3
+
+    def test_empty_query(self, index):
+        """Test an empty query returns no results."""
+        assert index.search('  ') == {'units': [], 'popularConversions': []}
+
+    def test_no_match(self, index):
+        """Test an unrelated query returns no units."""
+        assert index.search('zzzzqqq')['units'] == []
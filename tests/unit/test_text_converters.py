@@ -0,0 +1,207 @@
+"""Unit tests for text_converters.py module."""
+
+import io
+import json
+
+import pytest
+from app.utils import text_converters
+from app.utils.text_converters import (
+    CONVERTERS,
+    ConversionError,
+    JsonArrayReader,
+    element_to_json,
+    read_text,
+)
+from lxml import etree
+
+
+def run(conversion, data):
+    """Run a converter over bytes and join its output."""
+    converter = CONVERTERS[conversion][0]
+    return ''.join(converter(io.BytesIO(data)))
+
+
+class TestJsonArrayReader:
+    """Tests for incremental JSON array reading."""
+
+    def test_items_across_chunk_boundaries(self):
+        """Test items split across tiny chunks are decoded intact."""
+        data = {'rows': [{'id': i, 'value': i * 1.25, 'name': f'é"{i}'} for i in range(50)]}
+        raw = json.dumps(data).encode('utf-8')
+        reader = JsonArrayReader(read_text(io.BytesIO(raw), chunk_size=3))
+        assert list(reader) == data['rows']
+        assert reader.root_key == 'rows'
+
+    def test_top_level_array(self):
+        """Test a top-level array has no root key."""
+        reader = JsonArrayReader(read_text(io.BytesIO(b' [1, 2, 3] ')))
+        assert list(reader) == [1, 2, 3]
+        assert reader.root_key is None
+
+    def test_truncated_array(self):
+        """Test an unterminated array raises ConversionError."""
+        with pytest.raises(ConversionError):
+            list(JsonArrayReader(read_text(io.BytesIO(b'[1, 2'))))
+
+    def test_syntax_error_stops_reading(self, monkeypatch):
+        """Test a syntax error is reported without buffering the rest of the file."""
+        monkeypatch.setattr(text_converters, 'MAX_ITEM_SIZE', 100)
+        chunks_read = []
+
+        def chunks():
+            yield '[{"a": 1,, "b": 2}, '
+            for i in range(1000):
+                chunks_read.append(i)
+                yield '{"padding": "' + 'x' * 50 + '"}, '
+
+        with pytest.raises(ConversionError, match='Invalid JSON'):
+            list(JsonArrayReader(chunks()))
+        assert len(chunks_read) < 10
+
+
+    def test_large_item_decoded_few_times(self, monkeypatch):
+        """Test an item spanning many chunks is not re-decoded after every chunk."""
+        calls = []
+        decoder = JsonArrayReader._decoder
+
+        class CountingDecoder:
+            def raw_decode(self, s, idx=0):
+                calls.append(idx)
+                return decoder.raw_decode(s, idx)
+
+        monkeypatch.setattr(JsonArrayReader, '_decoder', CountingDecoder())
+        raw = json.dumps([{'blob': 'x' * 200000}, 1]).encode('utf-8')
+        reader = JsonArrayReader(read_text(io.BytesIO(raw), chunk_size=1000))
+        assert [len(item['blob']) if isinstance(item, dict) else item for item in reader] == [200000, 1]
+        assert len(calls) < 20
+
+
+class TestElementToJson:
+    """Tests for element_to_json function."""
+
+    def test_text_only_element(self):
+        """Test a text-only element becomes its text."""
+        assert element_to_json(etree.fromstring('<a> hi </a>')) == 'hi'
+
+    def test_attributes_and_repeated_children(self):
+        """Test attributes are prefixed and repeated children become lists."""
+        element = etree.fromstring('<a id="1"><b>x</b><b>y</b><c/></a>')
+        assert element_to_json(element) == {'@id': '1', 'b': ['x', 'y'], 'c': ''}
+
+    def test_deep_nesting(self):
+        """Test nesting beyond the recursion limit is converted without recursing."""
+        depth = 5000
+        element = etree.fromstring('<a>' * depth + 'x' + '</a>' * depth, etree.XMLParser(huge_tree=True))
+        value = element_to_json(element)
+        for _ in range(depth - 1):
+            value = value['a']
+        assert value == 'x'
+
+
+class TestJsonConversions:
+    """Tests for JSON input conversions."""
+
+    def test_json_to_csv(self):
+        """Test JSON records become CSV rows with every column."""
+        data = b'{"employees": [{"id": 1, "name": "Doe, J"}, {"id": 2, "active": true}]}'
+        assert run('json-to-csv', data) == 'id,name,active\n1,"Doe, J",\n2,,true\n'
+
+    def test_json_to_csv_single_object(self):
+        """Test a lone object becomes a single row."""
+        assert run('json-to-csv', b'{"a": 1, "b": [1]}') == 'a,b\n1,[1]\n'
+
+    def test_json_to_csv_non_streamable_object(self):
+        """Test keys of nested items read before streaming stops are not columns."""
+        assert run('json-to-csv', b'{"a": [{"x": 1}], "b": 2}') == 'a,b\n"[{""x"": 1}]",2\n'
+
+    def test_json_to_csv_scalar(self):
+        """Test a scalar document is rejected."""
+        with pytest.raises(ConversionError):
+            run('json-to-csv', b'42')
+
+    def test_json_to_xml(self):
+        """Test a wrapped array becomes one element per item."""
+        data = b'{"employees": [{"id": 1}, {"id": 2}]}'
+        assert run('json-to-xml', data) == ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                                            '<employees><employee><id>1</id></employee>'
+                                            '<employee><id>2</id></employee></employees>')
+
+    def test_json_to_xml_escapes_and_names(self):
+        """Test text is escaped and keys are made valid element names."""
+        output = run('json-to-xml', b'{"first name": "<A&B>"}')
+        assert '<first_name>&lt;A&amp;B&gt;</first_name>' in output
+
+    def test_invalid_json(self):
+        """Test invalid JSON raises ConversionError."""
+        with pytest.raises(ConversionError):
+            run('json-to-xml', b'{"a": ')
+
+
+class TestCsvConversions:
+    """Tests for CSV input conversions."""
+
+    def test_csv_to_json(self):
+        """Test CSV rows become typed JSON objects."""
+        output = run('csv-to-json', b'id,name,score\n1,"Doe, J",2.5\n\n2,Jane\n')
+        assert json.loads(output) == [
+            {'id': 1, 'name': 'Doe, J', 'score': 2.5},
+            {'id': 2, 'name': 'Jane', 'score': ''}
+        ]
+
+    def test_csv_to_json_header_only(self):
+        """Test CSV without data rows is rejected."""
+        with pytest.raises(ConversionError):
+            run('csv-to-json', b'id,name\n')
+
+    def test_csv_to_xml(self):
+        """Test CSV rows are wrapped in a rows element."""
+        output = run('csv-to-xml', b'id,name\n1,Jane\n')
+        assert output.endswith('<rows><row><id>1</id><name>Jane</name></row></rows>')
+
+
+class TestXmlConversions:
+    """Tests for XML input conversions."""
+
+    XML = (b'<?xml version="1.0"?><employees dept="x">'
+           b'<employee><id>1</id><name>John</name></employee>'
+           b'<employee><id>2</id><name>Jane</name></employee>'
+           b'<boss><name>Ann</name></boss></employees>')
+
+    def test_xml_to_json(self):
+        """Test the streamed JSON matches the browser converter's shape."""
+        assert json.loads(run('xml-to-json', self.XML)) == {
+            'employees': {
+                '@dept': 'x',
+                'employee': [{'id': '1', 'name': 'John'}, {'id': '2', 'name': 'Jane'}],
+                'boss': {'name': 'Ann'}
+            }
+        }
+
+    def test_xml_to_json_interleaved_tags(self):
+        """Test a tag repeated after a different sibling becomes one array, not duplicate keys."""
+        output = run('xml-to-json', b'<r><a>1</a><b>2</b><a>3</a><c>4</c><b>5</b></r>')
+        assert json.loads(output, object_pairs_hook=lambda pairs: pairs) == [
+            ('r', [('a', ['1', '3']), ('b', ['2', '5']), ('c', '4')])
+        ]
+
+    def test_xml_to_json_deep_nesting(self):
+        """Test deep documents convert, and ones too deep to serialise raise ConversionError."""
+        depth = 2000
+        output = run('xml-to-json', b'<r><a>' + b'<b>' * depth + b'</b>' * depth + b'</a></r>')
+        assert output.count('"b"') == depth
+        depth = 50000
+        with pytest.raises(ConversionError, match='nested too deeply'):
+            run('xml-to-json', b'<r><a>' + b'<b>' * depth + b'</b>' * depth + b'</a></r>')
+
+    def test_xml_to_json_text_root(self):
+        """Test a root without children."""
+        assert json.loads(run('xml-to-json', b'<a>hi</a>')) == {'a': 'hi'}
+
+    def test_xml_to_csv(self):
+        """Test the root's children become CSV rows."""
+        assert run('xml-to-csv', self.XML) == 'id,name\n1,John\n2,Jane\n,Ann\n'
+
+    def test_invalid_xml(self):
+        """Test malformed XML raises ConversionError."""
+        with pytest.raises(ConversionError):
+            run('xml-to-json', b'<a><b></a>')
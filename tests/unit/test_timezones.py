@@ -0,0 +1,62 @@
+"""Unit tests for timezones.py module."""
+
+import pytest
+from app.utils.timezones import TimezoneIndex, normalize_city
+
+
+@pytest.fixture
+def index():
+    """Small timezone index."""
+    return TimezoneIndex({
+        'timezones': [
+            {'name': 'UTC+01:00', 'offset': '+01:00', 'cities': ['Paris', 'Tirana']},
+            {'name': 'UTC-05:00', 'offset': '-05:00', 'cities': ['Bogotá']}
+        ],
+        'cities_data': {
+            'paris': {'name': 'Paris', 'timezone': 'Europe/Paris', 'offset': '+01:00'},
+            'tirana': {'name': 'Tirana', 'timezone': 'Europe/Tirane', 'offset': '+01:00'},
+            'bogota': {'name': 'Bogotá', 'timezone': 'America/Bogota', 'offset': '-05:00'}
+        }
+    })
+
+
+class TestNormalizeCity:
+    """Tests for normalize_city function."""
+
+    def test_case_and_accents(self):
+        """Test case and accents are ignored."""
+        assert normalize_city('  BOGOTÁ ') == 'bogota'
+
+    def test_hyphens_and_spaces(self):
+        """Test hyphens and repeated spaces are collapsed."""
+        assert normalize_city('Port-au-Prince') == normalize_city('port au  prince')
+
+
+class TestTimezoneIndex:
+    """Tests for TimezoneIndex lookups."""
+
+    def test_lookup_exact(self, index):
+        """Test exact city lookup."""
+        assert index.lookup_city('paris')['timezone'] == 'Europe/Paris'
+
+    def test_lookup_accent_insensitive(self, index):
+        """Test lookup ignores accents."""
+        assert index.lookup_city('Bogota')['name'] == 'Bogotá'
+
+    def test_lookup_prefix(self, index):
+        """Test lookup falls back to a prefix match."""
+        assert index.lookup_city('tir')['name'] == 'Tirana'
+        assert index.lookup_city('p')['name'] == 'Paris'
+        assert index.lookup_city('zz') is None
+        assert index.lookup_city('tiranaa') is None
+
+    def test_lookup_missing(self, index):
+        """Test unknown cities return None."""
+        assert index.lookup_city('atlantis') is None
+        assert index.lookup_city('') is None
+
+    def test_offset_index(self, index):
+        """Test cities and zones are indexed by UTC offset."""
+        assert index.zone_for_offset('+01:00')['name'] == 'UTC+01:00'
+        assert {c['name'] for c in index.cities_for_offset('+01:00')} == {'Paris', 'Tirana'}
+        assert index.cities_for_offset('+14:00') == []
@@ -1,38 +1,41 @@
 """Unit tests for unit_converter.py module."""
 
+import array
+
+import numpy as np
 import pytest
-from app.utils.unit_converter import UnitManager
+from app.utils.unit_converter import UnitRegistry, get_unit_registry
 
 
-class TestUnitManagerSingleton:
-    """Tests for UnitManager singleton pattern."""
+class TestGetUnitRegistry:
+    """Tests for the get_unit_registry accessor."""
 
     def test_singleton_instance(self, app_context):
-        """Test that UnitManager returns the same instance."""
-        manager1 = UnitManager()
-        manager2 = UnitManager()
+        """Test that get_unit_registry returns the same instance."""
+        manager1 = get_unit_registry()
+        manager2 = get_unit_registry()
         assert manager1 is manager2
 
-    def test_units_data_loaded(self, unit_manager):
+    def test_units_data_loaded(self, registry):
         """Test that units data is loaded."""
-        assert unit_manager._units_data is not None
-        assert 'categories' in unit_manager._units_data
+        assert registry._units_data is not None
+        assert 'categories' in registry._units_data
 
 
 class TestGetCategories:
     """Tests for get_categories method."""
 
-    def test_returns_all_categories(self, unit_manager):
+    def test_returns_all_categories(self, registry):
         """Test that all categories are returned."""
-        categories = unit_manager.get_categories()
+        categories = registry.get_categories()
         expected_categories = ['length', 'weight', 'temperature', 'volume',
                                'speed', 'pressure', 'energy', 'power']
         for cat in expected_categories:
             assert cat in categories
 
-    def test_category_has_required_fields(self, unit_manager):
+    def test_category_has_required_fields(self, registry):
         """Test that each category has title, description, and icon."""
-        categories = unit_manager.get_categories()
+        categories = registry.get_categories()
         for cat_id, cat_data in categories.items():
             assert 'title' in cat_data
             assert 'description' in cat_data
@@ -42,177 +45,182 @@ class TestGetCategories:
 class TestGetCategory:
     """Tests for get_category method."""
 
-    def test_get_existing_category(self, unit_manager):
+    def test_get_existing_category(self, registry):
         """Test getting an existing category."""
-        category = unit_manager.get_category('length')
+        category = registry.get_category('length')
         assert category is not None
         assert category['title'] == 'Length'
         assert 'units' in category
 
-    def test_get_nonexistent_category(self, unit_manager):
+    def test_get_nonexistent_category(self, registry):
         """Test getting a non-existent category."""
-        category = unit_manager.get_category('nonexistent')
+        category = registry.get_category('nonexistent')
         assert category is None
 
 
 class TestGetUnitInfo:
     """Tests for get_unit_info method."""
 
-    def test_get_existing_unit(self, unit_manager):
+    def test_get_existing_unit(self, registry):
         """Test getting info for an existing unit."""
-        unit_info = unit_manager.get_unit_info('length', 'm')
+        unit_info = registry.get_unit_info('length', 'm')
         assert unit_info is not None
         assert unit_info['name'] == 'Meter'
         assert unit_info['symbol'] == 'm'
         assert unit_info['factor'] == 1
 
-    def test_get_nonexistent_unit(self, unit_manager):
+    def test_get_nonexistent_unit(self, registry):
         """Test getting info for a non-existent unit."""
-        unit_info = unit_manager.get_unit_info('length', 'nonexistent')
+        unit_info = registry.get_unit_info('length', 'nonexistent')
         assert unit_info is None
 
-    def test_get_unit_from_nonexistent_category(self, unit_manager):
+    def test_get_unit_from_nonexistent_category(self, registry):
         """Test getting unit from non-existent category."""
-        unit_info = unit_manager.get_unit_info('nonexistent', 'm')
+        unit_info = registry.get_unit_info('nonexistent', 'm')
         assert unit_info is None
 
 
 class TestGetConversionFactor:
     """Tests for get_conversion_factor method."""
 
-    def test_same_unit_factor(self, unit_manager):
+    def test_same_unit_factor(self, registry):
         """Test conversion factor for same unit is 1."""
-        factor = unit_manager.get_conversion_factor('length', 'm', 'm')
+        factor = registry.get_conversion_factor('length', 'm', 'm')
         assert factor == 1.0
 
-    def test_meter_to_kilometer(self, unit_manager):
+    def test_meter_to_kilometer(self, registry):
         """Test conversion factor from meter to kilometer."""
-        factor = unit_manager.get_conversion_factor('length', 'm', 'km')
+        factor = registry.get_conversion_factor('length', 'm', 'km')
         assert factor == pytest.approx(0.001)
 
-    def test_kilometer_to_meter(self, unit_manager):
+    def test_kilometer_to_meter(self, registry):
         """Test conversion factor from kilometer to meter."""
-        factor = unit_manager.get_conversion_factor('length', 'km', 'm')
+        factor = registry.get_conversion_factor('length', 'km', 'm')
         assert factor == pytest.approx(1000)
 
-    def test_temperature_returns_none(self, unit_manager):
+    def test_temperature_returns_none(self, registry):
         """Test that temperature conversion factor returns None."""
-        factor = unit_manager.get_conversion_factor('temperature', 'c', 'f')
+        factor = registry.get_conversion_factor('temperature', 'c', 'f')
+        assert factor is None
+
+    def test_temperature_same_unit_returns_none(self, registry):
+        """Test that a temperature unit has no factor even to itself."""
+        factor = registry.get_conversion_factor('temperature', 'k', 'k')
         assert factor is None
 
-    def test_invalid_category(self, unit_manager):
+    def test_invalid_category(self, registry):
         """Test conversion factor for invalid category."""
-        factor = unit_manager.get_conversion_factor('nonexistent', 'm', 'km')
+        factor = registry.get_conversion_factor('nonexistent', 'm', 'km')
         assert factor is None
 
-    def test_invalid_units(self, unit_manager):
+    def test_invalid_units(self, registry):
         """Test conversion factor for invalid units."""
-        factor = unit_manager.get_conversion_factor('length', 'invalid', 'km')
+        factor = registry.get_conversion_factor('length', 'invalid', 'km')
         assert factor is None
 
 
 class TestConvertValue:
     """Tests for convert_value method."""
 
-    def test_length_conversion_meter_to_foot(self, unit_manager):
+    def test_length_conversion_meter_to_foot(self, registry):
         """Test length conversion from meter to foot."""
-        result = unit_manager.convert_value('length', 'm', 'ft', 1)
+        result = registry.convert_value('length', 'm', 'ft', 1)
         # 1 meter = 3.28084 feet
         assert result == pytest.approx(3.28084, rel=1e-4)
 
-    def test_length_conversion_kilometer_to_mile(self, unit_manager):
+    def test_length_conversion_kilometer_to_mile(self, registry):
         """Test length conversion from kilometer to mile."""
-        result = unit_manager.convert_value('length', 'km', 'mi', 1)
+        result = registry.convert_value('length', 'km', 'mi', 1)
         # 1 kilometer = 0.621371 miles
         assert result == pytest.approx(0.621371, rel=1e-4)
 
-    def test_weight_conversion_kg_to_lb(self, unit_manager):
+    def test_weight_conversion_kg_to_lb(self, registry):
         """Test weight conversion from kilogram to pound."""
-        result = unit_manager.convert_value('weight', 'kg', 'lb', 1)
+        result = registry.convert_value('weight', 'kg', 'lb', 1)
         # 1 kg = 2.20462 pounds
         assert result == pytest.approx(2.20462, rel=1e-4)
 
-    def test_conversion_with_string_value(self, unit_manager):
+    def test_conversion_with_string_value(self, registry):
         """Test conversion with string value."""
-        result = unit_manager.convert_value('length', 'm', 'km', '1000')
+        result = registry.convert_value('length', 'm', 'km', '1000')
         assert result == pytest.approx(1.0)
 
-    def test_conversion_with_invalid_value(self, unit_manager):
+    def test_conversion_with_invalid_value(self, registry):
         """Test conversion with invalid value."""
-        result = unit_manager.convert_value('length', 'm', 'km', 'invalid')
+        result = registry.convert_value('length', 'm', 'km', 'invalid')
         assert result is None
 
-    def test_conversion_with_none_value(self, unit_manager):
+    def test_conversion_with_none_value(self, registry):
         """Test conversion with None value."""
-        result = unit_manager.convert_value('length', 'm', 'km', None)
+        result = registry.convert_value('length', 'm', 'km', None)
         assert result is None
 
-    def test_conversion_zero_value(self, unit_manager):
+    def test_conversion_zero_value(self, registry):
         """Test conversion with zero value."""
-        result = unit_manager.convert_value('length', 'm', 'km', 0)
+        result = registry.convert_value('length', 'm', 'km', 0)
         assert result == 0.0
 
-    def test_conversion_negative_value(self, unit_manager):
+    def test_conversion_negative_value(self, registry):
         """Test conversion with negative value."""
-        result = unit_manager.convert_value('length', 'm', 'km', -1000)
+        result = registry.convert_value('length', 'm', 'km', -1000)
         assert result == pytest.approx(-1.0)
 
 
 class TestTemperatureConversion:
     """Tests for temperature conversions."""
 
-    def test_celsius_to_fahrenheit_freezing(self, unit_manager):
+    def test_celsius_to_fahrenheit_freezing(self, registry):
         """Test Celsius to Fahrenheit at freezing point."""
-        result = unit_manager.convert_value('temperature', 'c', 'f', 0)
+        result = registry.convert_value('temperature', 'c', 'f', 0)
         assert result == pytest.approx(32.0)
 
-    def test_celsius_to_fahrenheit_boiling(self, unit_manager):
+    def test_celsius_to_fahrenheit_boiling(self, registry):
         """Test Celsius to Fahrenheit at boiling point."""
-        result = unit_manager.convert_value('temperature', 'c', 'f', 100)
+        result = registry.convert_value('temperature', 'c', 'f', 100)
         assert result == pytest.approx(212.0)
 
-    def test_fahrenheit_to_celsius_freezing(self, unit_manager):
+    def test_fahrenheit_to_celsius_freezing(self, registry):
         """Test Fahrenheit to Celsius at freezing point."""
-        result = unit_manager.convert_value('temperature', 'f', 'c', 32)
+        result = registry.convert_value('temperature', 'f', 'c', 32)
         assert result == pytest.approx(0.0)
 
-    def test_fahrenheit_to_celsius_boiling(self, unit_manager):
+    def test_fahrenheit_to_celsius_boiling(self, registry):
         """Test Fahrenheit to Celsius at boiling point."""
-        result = unit_manager.convert_value('temperature', 'f', 'c', 212)
+        result = registry.convert_value('temperature', 'f', 'c', 212)
         assert result == pytest.approx(100.0)
 
-    def test_celsius_to_kelvin(self, unit_manager):
+    def test_celsius_to_kelvin(self, registry):
         """Test Celsius to Kelvin conversion."""
-        result = unit_manager.convert_value('temperature', 'c', 'k', 0)
+        result = registry.convert_value('temperature', 'c', 'k', 0)
         assert result == pytest.approx(273.15)
 
-    def test_kelvin_to_celsius(self, unit_manager):
+    def test_kelvin_to_celsius(self, registry):
         """Test Kelvin to Celsius conversion."""
-        result = unit_manager.convert_value('temperature', 'k', 'c', 273.15)
+        result = registry.convert_value('temperature', 'k', 'c', 273.15)
         assert result == pytest.approx(0.0)
 
-    def test_fahrenheit_to_kelvin(self, unit_manager):
+    def test_fahrenheit_to_kelvin(self, registry):
         """Test Fahrenheit to Kelvin conversion."""
-        result = unit_manager.convert_value('temperature', 'f', 'k', 32)
+        result = registry.convert_value('temperature', 'f', 'k', 32)
         assert result == pytest.approx(273.15)
 
-    def test_kelvin_to_fahrenheit(self, unit_manager):
+    def test_kelvin_to_fahrenheit(self, registry):
         """Test Kelvin to Fahrenheit conversion."""
-        result = unit_manager.convert_value('temperature', 'k', 'f', 273.15)
+        result = registry.convert_value('temperature', 'k', 'f', 273.15)
         assert result == pytest.approx(32.0)
 
-    def test_negative_temperature(self, unit_manager):
+    def test_negative_temperature(self, registry):
         """Test negative temperature conversion."""
-        result = unit_manager.convert_value('temperature', 'c', 'f', -40)
+        result = registry.convert_value('temperature', 'c', 'f', -40)
         assert result == pytest.approx(-40.0)  # -40°C = -40°F
 
 
 class TestVolumeConversion:
     """Tests for volume conversions."""
 
-    def test_liter_to_gallon(self, unit_manager):
+    def test_liter_to_gallon(self, registry):
         """Test liter to gallon conversion."""
-        result = unit_manager.convert_value('volume', 'l', 'gal', 1)
+        result = registry.convert_value('volume', 'l', 'gal', 1)
         # 1 liter ≈ 0.264172 gallons
         assert result == pytest.approx(0.264172, rel=1e-3)
 
@@ -220,15 +228,15 @@ class TestVolumeConversion:
 class TestSpeedConversion:
     """Tests for speed conversions."""
 
-    def test_kph_to_mph(self, unit_manager):
+    def test_kph_to_mph(self, registry):
         """Test km/h to mph conversion."""
-        result = unit_manager.convert_value('speed', 'kph', 'mph', 100)
+        result = registry.convert_value('speed', 'kph', 'mph', 100)
         # 100 km/h ≈ 62.137 mph
         assert result == pytest.approx(62.137, rel=1e-3)
 
-    def test_mps_to_knots(self, unit_manager):
+    def test_mps_to_knots(self, registry):
         """Test m/s to knots conversion."""
-        result = unit_manager.convert_value('speed', 'mps', 'knot', 1)
+        result = registry.convert_value('speed', 'mps', 'knot', 1)
         # 1 m/s ≈ 1.94384 knots
         assert result == pytest.approx(1.94384, rel=1e-3)
 
@@ -236,9 +244,9 @@ class TestSpeedConversion:
 class TestPressureConversion:
     """Tests for pressure conversions."""
 
-    def test_bar_to_psi(self, unit_manager):
+    def test_bar_to_psi(self, registry):
         """Test bar to psi conversion."""
-        result = unit_manager.convert_value('pressure', 'bar', 'psi', 1)
+        result = registry.convert_value('pressure', 'bar', 'psi', 1)
         # 1 bar ≈ 14.5038 psi
         assert result == pytest.approx(14.5038, rel=1e-3)
 
@@ -246,9 +254,9 @@ class TestPressureConversion:
 class TestEnergyConversion:
     """Tests for energy conversions."""
 
-    def test_joule_to_calorie(self, unit_manager):
+    def test_joule_to_calorie(self, registry):
         """Test joule to calorie conversion."""
-        result = unit_manager.convert_value('energy', 'j', 'cal', 1)
+        result = registry.convert_value('energy', 'j', 'cal', 1)
         # 1 joule ≈ 0.239006 calories
         assert result == pytest.approx(0.239006, rel=1e-3)
 
@@ -256,8 +264,146 @@ class TestEnergyConversion:
 class TestPowerConversion:
     """Tests for power conversions."""
 
-    def test_watt_to_horsepower(self, unit_manager):
+    def test_watt_to_horsepower(self, registry):
         """Test watt to horsepower conversion."""
-        result = unit_manager.convert_value('power', 'w', 'hp', 746)
+        result = registry.convert_value('power', 'w', 'hp', 746)
         # 746 watts ≈ 1 horsepower
         assert result == pytest.approx(1.0, rel=1e-2)
+
+
+class TestUnitRegistry:
+    """Tests for the app-bound, standalone-capable unit registry."""
+
+    def test_attached_by_create_app(self, app):
+        """Test create_app builds the registry before any request."""
+        registry = app.extensions['unit_registry']
+        assert isinstance(registry, UnitRegistry)
+        with app.app_context():
+            assert get_unit_registry() is registry
+
+    def test_from_path_without_app(self, app):
+        """Test from_path works in plain Python, outside any app context."""
+        data_dir = app.extensions['unit_registry'].data_dir
+        registry = UnitRegistry.from_path(data_dir)
+        assert registry.convert_value('length', 'km', 'm', 1.5) == 1500
+        assert registry.data_version == app.extensions['unit_registry'].data_version
+        assert registry.search_index.search('meter', limit=1)
+
+    def test_detailed_tables_loaded_eagerly(self, app):
+        """Test from_path loads every detailed table up front."""
+        registry = UnitRegistry.from_path(app.extensions['unit_registry'].data_dir)
+        assert 'length' in registry._detailed_tables
+        assert registry.get_detailed_conversion_tables('length')
+
+    def test_apps_have_separate_registries(self, app):
+        """Test each app gets its own registry."""
+        from app import create_app
+        other = create_app()
+        assert other.extensions['unit_registry'] is not app.extensions['unit_registry']
+
+
+class TestConversionEngine:
+    """Tests for the compiled conversion engine."""
+
+    def test_every_unit_is_compiled(self, registry):
+        """Test that every unit in units.json converts to itself."""
+        engine = registry._engine
+        for cat_id, category in registry._units_data['categories'].items():
+            for unit_id in category['units']:
+                assert engine.get_pair(cat_id, unit_id, unit_id) is not None
+
+    def test_cross_category_pair_is_none(self, registry):
+        """Test that units from different categories do not convert."""
+        assert registry._engine.get_pair('length', 'm', 'kg') is None
+
+    def test_temperature_pair_is_affine(self, registry):
+        """Test that Celsius to Fahrenheit compiles to scale 9/5, offset 32."""
+        scale, offset = registry._engine.get_pair('temperature', 'c', 'f')
+        assert scale == pytest.approx(1.8)
+        assert offset == pytest.approx(32.0)
+
+    def test_temperature_same_unit(self, registry):
+        """Test that converting a temperature to itself is the identity."""
+        result = registry.convert_value('temperature', 'k', 'k', 300)
+        assert result == pytest.approx(300.0)
+
+
+class TestConvertArray:
+    """Tests for convert_array method."""
+
+    def test_length_array(self, registry):
+        """Test converting a NumPy array of lengths."""
+        result = registry.convert_array('length', 'km', 'm', np.array([1.0, 2.5, 0]))
+        assert result.tolist() == pytest.approx([1000.0, 2500.0, 0.0])
+
+    def test_temperature_array(self, registry):
+        """Test converting a NumPy array of temperatures."""
+        result = registry.convert_array('temperature', 'c', 'f', np.array([-40, 0, 100]))
+        assert result.tolist() == pytest.approx([-40.0, 32.0, 212.0])
+
+    def test_buffer_protocol_input(self, registry):
+        """Test converting a buffer-protocol object."""
+        result = registry.convert_array('weight', 'kg', 'g', array.array('d', [1.0, 2.0]))
+        assert result.tolist() == pytest.approx([1000.0, 2000.0])
+
+    def test_output_dtype(self, registry):
+        """Test the output dtype is configurable."""
+        result = registry.convert_array('length', 'm', 'km', [1000], dtype='float32')
+        assert result.dtype == np.float32
+
+    def test_non_float_dtype_rejected(self, registry):
+        """Test integer output dtypes are rejected."""
+        with pytest.raises(ValueError):
+            registry.convert_array('length', 'm', 'km', [1000], dtype='int64')
+
+    def test_nonfinite_propagate(self, registry):
+        """Test NaN and inf pass through by default."""
+        result = registry.convert_array('length', 'm', 'km', [np.nan, np.inf])
+        assert np.isnan(result[0])
+        assert np.isposinf(result[1])
+
+    def test_nonfinite_nan(self, registry):
+        """Test inf is mapped to NaN in 'nan' mode."""
+        result = registry.convert_array('length', 'm', 'km', [1.0, np.inf], nonfinite='nan')
+        assert result[0] == pytest.approx(0.001)
+        assert np.isnan(result[1])
+
+    def test_nonfinite_raise(self, registry):
+        """Test NaN raises in 'raise' mode."""
+        with pytest.raises(ValueError):
+            registry.convert_array('length', 'm', 'km', [np.nan], nonfinite='raise')
+
+    def test_invalid_conversion(self, registry):
+        """Test invalid unit pairs return None."""
+        assert registry.convert_array('length', 'm', 'kg', [1.0]) is None
+
+
+class TestDetailedConversionTables:
+    """Tests for the detailed conversion table cache."""
+
+    def test_tables_loaded(self, registry):
+        """Test that detailed tables load for a known category."""
+        tables = registry.get_detailed_conversion_tables('length')
+        assert isinstance(tables, list)
+        assert len(tables) > 0
+        assert 'conversions' in tables[0]
+
+    def test_tables_cached(self, registry):
+        """Test that repeated calls return the cached object."""
+        first = registry.get_detailed_conversion_tables('length')
+        second = registry.get_detailed_conversion_tables('length')
+        assert first is second
+
+    def test_missing_file_returns_empty(self, registry):
+        """Test that a missing table file is cached as an empty list."""
+        assert registry.get_detailed_conversion_tables('nonexistent') == []
+        assert registry._detailed_tables['nonexistent'][2] == []
+
+    def test_reload_hook(self, registry):
+        """Test that the reload hook drops cached tables."""
+        first = registry.get_detailed_conversion_tables('weight')
+        get_unit_registry().reload_detailed_tables('weight')
+        assert 'weight' not in registry._detailed_tables
+        second = registry.get_detailed_conversion_tables('weight')
+        assert first is not second
+        assert first == second